@@ -0,0 +1 @@
+"""Benchmarks del motor y del gerente de búsqueda (runner independiente)."""
@@ -0,0 +1,224 @@
+"""
+Runner de benchmarks con cargas sintéticas de inquilinos grandes.
+
+Mide la latencia de las primitivas del motor (`_merge_intervals`,
+`calcular_interseccion`, `restar_intervalos`, `encontrar_slots`) y del gerente
+`gestionar_busqueda_disponibilidad` a varias escalas, y escribe los resultados
+en JSON para comparar corridas entre cambios.
+
+Uso:
+
+    python -m benchmarks.run_benchmarks                 # escalas completas
+    python -m benchmarks.run_benchmarks --rapido        # escalas reducidas
+    python -m benchmarks.run_benchmarks --salida bench_output.json --repeticiones 7
+
+Las cargas son deterministas (semilla fija): dos corridas sobre el mismo
+código miden exactamente los mismos datos.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from telensor_engine import mock_state
+from telensor_engine.api.adapter import gestionar_busqueda_disponibilidad
+from telensor_engine.engine.engine import (
+    _merge_intervals,
+    calcular_interseccion,
+    encontrar_slots,
+    restar_intervalos,
+)
+from telensor_engine.main import SolicitudDisponibilidad
+
+
+ESCALAS_EMPLEADOS = [10, 100, 1000]
+ESCALAS_OCUPACIONES = [10**2, 10**3, 10**4, 10**5]
+ESCALAS_EMPLEADOS_RAPIDO = [10, 100]
+ESCALAS_OCUPACIONES_RAPIDO = [10**2, 10**3]
+
+SEMILLA = 20251106
+DIA_BASE = datetime(2025, 11, 6, tzinfo=timezone.utc)
+HORIZONTE_DIAS = 7
+SERVICIO = {
+    "id": "SVC_BENCH",
+    "duracion": 30,
+    "buffer_previo": 10,
+    "buffer_posterior": 5,
+    "horario_atencion": [480, 1200],
+}
+
+
+def _medir(fn: Callable[[], Any], repeticiones: int) -> Dict[str, float]:
+    """Ejecuta `fn` `repeticiones` veces y resume los tiempos en milisegundos."""
+    tiempos: List[float] = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        fn()
+        tiempos.append((time.perf_counter() - t0) * 1000.0)
+    return {
+        "min_ms": round(min(tiempos), 4),
+        "mediana_ms": round(statistics.median(tiempos), 4),
+        "max_ms": round(max(tiempos), 4),
+        "repeticiones": repeticiones,
+    }
+
+
+# Cargas sintéticas
+
+
+def _ocupaciones_minutos(rng: random.Random, n: int, span: int) -> List[List[int]]:
+    """`n` ocupaciones aleatorias (sin ordenar, con solapes) en `[0, span)`."""
+    res = []
+    for _ in range(n):
+        s = rng.randrange(0, span)
+        res.append([s, s + rng.randrange(5, 120)])
+    return res
+
+
+def _carga_inquilino(rng: random.Random, n_empleados: int, n_ocupaciones: int):
+    """Horarios y ocupaciones (datetime) de un inquilino sobre el horizonte."""
+    horarios = [
+        {
+            "empleado_id": f"E{i:05d}",
+            "horario_trabajo": [rng.choice([420, 480, 540]), rng.choice([1020, 1080, 1140])],
+            "servicios_asignados": [SERVICIO["id"]],
+        }
+        for i in range(n_empleados)
+    ]
+    span = HORIZONTE_DIAS * 1440
+    ocupaciones = []
+    for _ in range(n_ocupaciones):
+        s = rng.randrange(0, span)
+        inicio = DIA_BASE + timedelta(minutes=s)
+        ocupaciones.append(
+            {
+                "empleado_id": f"E{rng.randrange(n_empleados):05d}",
+                "inicio": inicio,
+                "fin": inicio + timedelta(minutes=rng.randrange(15, 120)),
+            }
+        )
+    return horarios, ocupaciones
+
+
+# Casos
+
+
+def bench_motor(escalas_ocupaciones: List[int], repeticiones: int) -> List[Dict[str, Any]]:
+    rng = random.Random(SEMILLA)
+    resultados = []
+    for n in escalas_ocupaciones:
+        # Densidad constante (una ocupación cada ~3 h) para que siempre queden libres que empaquetar
+        span = max(HORIZONTE_DIAS * 1440, n * 180)
+        ocupados = _ocupaciones_minutos(rng, n, span)
+        otros = _ocupaciones_minutos(rng, n, span)
+        base = [[d * 1440 + 480, d * 1440 + 1200] for d in range(span // 1440)]
+        libres = restar_intervalos(base, ocupados)
+        casos = {
+            "_merge_intervals": lambda: _merge_intervals(ocupados),
+            "calcular_interseccion": lambda: calcular_interseccion(ocupados, otros),
+            "restar_intervalos": lambda: restar_intervalos(base, ocupados),
+            "encontrar_slots": lambda: encontrar_slots([0, span], libres, 45, 10, 5),
+        }
+        for nombre, fn in casos.items():
+            resultados.append({"caso": nombre, "ocupaciones": n, **_medir(fn, repeticiones)})
+    return resultados
+
+
+def bench_gerente(
+    escalas_empleados: List[int],
+    escalas_ocupaciones: List[int],
+    repeticiones: int,
+) -> List[Dict[str, Any]]:
+    resultados = []
+    solicitud = SolicitudDisponibilidad(
+        servicio_id=SERVICIO["id"],
+        fecha_inicio_utc=DIA_BASE,
+        fecha_fin_utc=DIA_BASE + timedelta(days=HORIZONTE_DIAS),
+    )
+    for n_emp in escalas_empleados:
+        for n_occ in escalas_ocupaciones:
+            rng = random.Random(SEMILLA + n_emp * 7 + n_occ)
+            horarios, ocupaciones = _carga_inquilino(rng, n_emp, n_occ)
+
+            def buscar():
+                return gestionar_busqueda_disponibilidad(
+                    solicitud,
+                    get_servicio_fn=lambda _sid: dict(SERVICIO),
+                    get_horarios_empleados_fn=lambda *_a, **_k: horarios,
+                    get_ocupaciones_fn=lambda *_a: ocupaciones,
+                )
+
+            n_slots = len(buscar())  # calentamiento + tamaño de salida
+            resultados.append(
+                {
+                    "caso": "gestionar_busqueda_disponibilidad",
+                    "empleados": n_emp,
+                    "ocupaciones": n_occ,
+                    "slots": n_slots,
+                    **_medir(buscar, repeticiones),
+                }
+            )
+    return resultados
+
+
+def _commit_actual() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks del motor de disponibilidad")
+    parser.add_argument("--salida", default="bench_output.json", help="archivo JSON de resultados")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--rapido", action="store_true", help="escalas reducidas (humo/CI)")
+    args = parser.parse_args(argv)
+
+    emp = ESCALAS_EMPLEADOS_RAPIDO if args.rapido else ESCALAS_EMPLEADOS
+    occ = ESCALAS_OCUPACIONES_RAPIDO if args.rapido else ESCALAS_OCUPACIONES
+
+    # Los logs INFO del gerente distorsionan la medición
+    logging.getLogger().setLevel(logging.WARNING)
+    # El gerente consulta también el estado en memoria; partir siempre vacío
+    mock_state.reset_state()
+    resultados = bench_motor(occ, args.repeticiones) + bench_gerente(emp, occ, args.repeticiones)
+
+    payload = {
+        "metadatos": {
+            "fecha_utc": datetime.now(timezone.utc).isoformat(),
+            "commit": _commit_actual(),
+            "python": sys.version.split()[0],
+            "plataforma": platform.platform(),
+            "semilla": SEMILLA,
+            "horizonte_dias": HORIZONTE_DIAS,
+        },
+        "resultados": resultados,
+    }
+    Path(args.salida).write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    for r in resultados:
+        escala = f"emp={r['empleados']} " if "empleados" in r else ""
+        print(f"{r['caso']:<36} {escala}occ={r['ocupaciones']:<7} mediana={r['mediana_ms']:.3f} ms")
+    print(f"Resultados en {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,43 +1,55 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple, Callable
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Callable
 
+import asyncio
 import pendulum
 import logging
+import time
 
 from telensor_engine.engine.engine import (
     calcular_interseccion,
     restar_intervalos,
     encontrar_slots,
+    intersectar_multiples,
 )
+from telensor_engine.engine.bitmap import MapaMinutos, preferir_bitmap
+from telensor_engine.engine.interval_set import IntervalSet
+from telensor_engine.engine.load_table import TablaCargas
+from telensor_engine.engine.batch import (
+    calcular_interseccion_lote,
+    concatenar_lotes,
+    encontrar_slots_lote,
+    lote_desde_listas,
+    replicar_lote,
+    restar_intervalos_lote,
+)
+from telensor_engine.epoch_minutes import minutos_epoch, rango_en_eje
 from telensor_engine.fixtures import load_scenario
+from telensor_engine.schedules import compilar_horario_semanal
 from telensor_engine import mock_state as mock_state
+from telensor_engine.providers import LoteOcupaciones, ProveedorDatos, ProveedorSincrono
 from telensor_engine.mock_db import (
     get_servicio as default_get_servicio,
     get_horarios_empleados as default_get_horarios_empleados,
 )
 
+# Máximo de días que puede abarcar una búsqueda de disponibilidad
+MAX_HORIZONTE_DIAS = 31
+
+# Reintentos de la cascada de bloqueos ante conflictos de versión por reserva
+MAX_REINTENTOS_CASCADA = 3
+
 
 def _to_minute_range(base_midnight, inicio: Any, fin: Any) -> List[int]:
     """
     Convierte un par (inicio, fin) que puede venir como datetime o ISO string
     a un intervalo [min_inicio, min_fin) en minutos absolutos del eje continuo
     cuyo origen es `base_midnight` (inicio del día en UTC).
+
+    Usa la capa entera de minutos epoch (sin pendulum en el camino caliente).
     """
-    ini_dt = (
-        pendulum.instance(inicio).in_timezone("UTC")
-        if isinstance(inicio, datetime)
-        else pendulum.parse(str(inicio)).in_timezone("UTC")
-    )
-    fin_dt = (
-        pendulum.instance(fin).in_timezone("UTC")
-        if isinstance(fin, datetime)
-        else pendulum.parse(str(fin)).in_timezone("UTC")
-    )
-    s_min = int((ini_dt - base_midnight).total_seconds() // 60)
-    e_min = int((fin_dt - base_midnight).total_seconds() // 60)
-    return [s_min, e_min]
+    return rango_en_eje(minutos_epoch(base_midnight), inicio, fin)
 
 
 def build_total_blockings(
@@ -51,6 +63,7 @@ def build_total_blockings(
     servicio_id: Optional[str] = None,
     get_ocupaciones_fn: Optional[Callable[[List[str], Any, Any], List[Dict[str, Any]]]] = None,
     excepciones_inline: Optional[List[Dict[str, Any]]] = None,
+    equipo_ids: Optional[List[str]] = None,
 ) -> Tuple[Dict[str, List[List[int]]], Dict[str, List[List[int]]], List[List[int]]]:
     """
     Agrega una lista unificada de bloqueos (ocupaciones + excepciones) por empleado,
@@ -62,6 +75,8 @@ def build_total_blockings(
     - escenario: diccionario del fixture de pruebas (puede ser None).
     - empleados_ids: IDs a considerar.
     - equipo_id: ID de equipo a considerar (opcional).
+    - equipo_ids: IDs de equipo adicionales; permite resolver en un solo barrido
+      los bloqueos de todos los equipos candidatos de una solicitud.
     - servicio_id: ID del servicio solicitado (opcional, para excepciones con scope=service).
 
     Retorna:
@@ -75,6 +90,8 @@ def build_total_blockings(
     """
     bloqueos_empleado: Dict[str, List[List[int]]] = {eid: [] for eid in empleados_ids}
     bloqueos_equipo: Dict[str, List[List[int]]] = {}
+    for eq in ([equipo_id] if equipo_id else []) + list(equipo_ids or []):
+        bloqueos_equipo.setdefault(eq, [])
     bloqueos_globales: List[List[int]] = []
 
     # 1) Ocupaciones de empleados
@@ -97,14 +114,12 @@ def build_total_blockings(
         rng = _to_minute_range(base_midnight, oc["inicio"], oc["fin"])
         bloqueos_empleado[eid].append(rng)
 
-    # 2) Ocupaciones de equipo (si hay escenario y equipo)
-    if equipo_id:
-        bloqueos_equipo[equipo_id] = []
-        if escenario and isinstance(escenario.get("ocupaciones_equipo"), list):
-            for occ in escenario["ocupaciones_equipo"]:
-                if occ.get("equipo_id") == equipo_id:
-                    rng = _to_minute_range(base_midnight, occ["inicio"], occ["fin"])
-                    bloqueos_equipo[equipo_id].append(rng)
+    # 2) Ocupaciones de equipo (si hay escenario y equipos), un solo recorrido para todos
+    if bloqueos_equipo and escenario and isinstance(escenario.get("ocupaciones_equipo"), list):
+        for occ in escenario["ocupaciones_equipo"]:
+            eq = occ.get("equipo_id")
+            if eq in bloqueos_equipo:
+                bloqueos_equipo[eq].append(_to_minute_range(base_midnight, occ["inicio"], occ["fin"]))
 
     # 3) Excepciones (business/employee/equipment/service)
     exc_list: List[Dict[str, Any]] = []
@@ -124,8 +139,8 @@ def build_total_blockings(
                 bloqueos_empleado[tgt].append(rng)
         elif scope == "equipment":
             tgt = exc.get("equipo_id")
-            if equipo_id and tgt == equipo_id:
-                bloqueos_equipo.setdefault(equipo_id, []).append(rng)
+            if tgt in bloqueos_equipo:
+                bloqueos_equipo[tgt].append(rng)
         elif scope == "service":
             tgt = exc.get("servicio_id")
             if servicio_id and tgt == servicio_id:
@@ -135,47 +150,49 @@ def build_total_blockings(
     # 4) Reservas en memoria (anti-colisión): se consideran como bloqueos.
     #    Esto garantiza que las disponibilidades reflejen inmediatamente las
     #    reservas creadas durante las pruebas E2E.
-    reservas = mock_state.get_reservas_en_rango(inicio_dt, fin_dt)
-    for r in reservas:
-        # Bloqueo por empleado
-        if r.empleado_id in bloqueos_empleado:
-            rng = _to_minute_range(base_midnight, r.inicio_slot, r.fin_slot)
-            bloqueos_empleado[r.empleado_id].append(rng)
-        # Bloqueo por equipo (si aplica)
-        if equipo_id and r.equipo_id == equipo_id:
-            rng = _to_minute_range(base_midnight, r.inicio_slot, r.fin_slot)
-            bloqueos_equipo.setdefault(equipo_id, []).append(rng)
+    #    Consultas por recurso sobre el índice de ocupación (sin recorrer todas las reservas).
+    for eid in bloqueos_empleado:
+        for r in mock_state.get_reservas_recurso_en_rango(empleado_id=eid, inicio_dt=inicio_dt, fin_dt=fin_dt):
+            bloqueos_empleado[eid].append(_to_minute_range(base_midnight, r.inicio_slot, r.fin_slot))
+    for eq in bloqueos_equipo:
+        for r in mock_state.get_reservas_recurso_en_rango(equipo_id=eq, inicio_dt=inicio_dt, fin_dt=fin_dt):
+            bloqueos_equipo[eq].append(_to_minute_range(base_midnight, r.inicio_slot, r.fin_slot))
 
     # 5) Bloqueos operativos persistidos en memoria (MOCK_BLOQUEOS)
-    #    Alcances soportados: business, employee, equipment, service
-    for b in list(getattr(mock_state, "MOCK_BLOQUEOS", [])):
-        bi = b.get("inicio_utc")
-        bf = b.get("fin_utc")
-        # Filtrar por intersección temporal con la búsqueda actual
-        if not (inicio_dt < bf and fin_dt > bi):
-            continue
-        scope = str(b.get("scope", "")).lower()
-        rng = _to_minute_range(base_midnight, bi, bf)
-        if scope == "business":
-            bloqueos_globales.append(rng)
-        elif scope == "employee":
-            ids = set(b.get("empleado_ids", []) or [])
-            # Si no se especifican IDs, afectar a todos los empleados considerados
-            if not ids:
-                for eid in empleados_ids:
-                    bloqueos_empleado.setdefault(eid, []).append(rng)
-            else:
-                for eid in empleados_ids:
-                    if eid in ids:
-                        bloqueos_empleado.setdefault(eid, []).append(rng)
-        elif scope == "equipment":
-            ids = set(b.get("equipo_ids", []) or [])
-            if equipo_id and (not ids or equipo_id in ids):
-                bloqueos_equipo.setdefault(equipo_id, []).append(rng)
-        elif scope == "service":
-            ids = set(b.get("servicio_ids", []) or [])
-            if servicio_id and (not ids or servicio_id in ids):
-                bloqueos_globales.append(rng)
+    #    Alcances soportados: business, employee, equipment, service.
+    #    El índice por alcance devuelve solo los que se solapan con la búsqueda y
+    #    nombran a alguno de los recursos considerados (o a ninguno: aplican a todos).
+    alcances = mock_state.get_bloqueos_por_alcance(
+        inicio_dt,
+        fin_dt,
+        empleado_ids=empleados_ids,
+        equipo_ids=list(bloqueos_equipo),
+        servicio_ids=[servicio_id] if servicio_id else None,
+    )
+    rangos: Dict[str, List[int]] = {}
+
+    def _rango_bloqueo(b: Dict[str, Any]) -> List[int]:
+        # Un bloqueo que nombra varios recursos se convierte una sola vez
+        rng = rangos.get(b["id"])
+        if rng is None:
+            rng = rangos[b["id"]] = _to_minute_range(base_midnight, b.get("inicio_utc"), b.get("fin_utc"))
+        return rng
+
+    for b in alcances["business"].get(None, []):
+        bloqueos_globales.append(_rango_bloqueo(b))
+    for objetivo, lista in alcances["employee"].items():
+        # Sin IDs: afectar a todos los empleados considerados
+        destinos = empleados_ids if objetivo is None else [objetivo]
+        for b in lista:
+            for eid in destinos:
+                bloqueos_empleado.setdefault(eid, []).append(_rango_bloqueo(b))
+    for objetivo, lista in alcances["equipment"].items():
+        destinos = list(bloqueos_equipo) if objetivo is None else [objetivo]
+        for b in lista:
+            for eq in destinos:
+                bloqueos_equipo[eq].append(_rango_bloqueo(b))
+    for lista in alcances["service"].values():
+        bloqueos_globales.extend(_rango_bloqueo(b) for b in lista)
 
     return bloqueos_empleado, bloqueos_equipo, bloqueos_globales
 
@@ -197,6 +214,253 @@ def _sumar_minutos_interseccion(intervalos: List[List[int]], ventana: List[int])
     return total
 
 
+def _offsets_de_dias(fin_min: int) -> List[int]:
+    """Offsets (múltiplos de 1440) de cada día cubierto por el eje [0, fin_min).
+
+    El origen del eje es la medianoche del día de inicio, por lo que un
+    horizonte de N días produce `[0, 1440, ..., (N-1)*1440]`.
+    """
+    dias = max(1, (fin_min - 1) // 1440 + 1)
+    return [d * 1440 for d in range(dias)]
+
+
+def _expandir_diario(ini: int, fin: int, day_offsets: List[int]) -> List[List[int]]:
+    """Replica una ventana diaria [ini, fin) en minutos del día sobre cada offset."""
+    return [[ini + d, fin + d] for d in day_offsets]
+
+
+# Índice de equipo de un candidato compacto sin equipo asignado
+_SIN_EQUIPO = -1
+
+
+def _materializar_slots(
+    base_midnight,
+    candidatos: List[Tuple[int, int, int, int]],
+    empleados_ids: List[str],
+    equipos_ids: List[str],
+) -> List[Dict[str, Any]]:
+    """Convierte candidatos compactos `(inicio_min, fin_min, idx_empleado, idx_equipo)`
+    en los dicts de salida, ordenados por inicio.
+
+    Es el único punto donde se crean datetimes: solo para los slots seleccionados.
+    """
+    salida: List[Dict[str, Any]] = []
+    for ini, fin, i_emp, i_eq in sorted(candidatos, key=lambda c: c[0]):
+        salida.append(
+            {
+                "inicio_slot": base_midnight.add(minutes=ini),
+                "fin_slot": base_midnight.add(minutes=fin),
+                "empleado_id_asignado": empleados_ids[i_emp],
+                "equipo_id_asignado": None if i_eq == _SIN_EQUIPO else equipos_ids[i_eq],
+            }
+        )
+    return salida
+
+
+def _intervalos_trabajo(h: Dict[str, Any], fecha_base: Any, day_offsets: List[int]) -> Any:
+    """Intervalos absolutos de trabajo de un empleado sobre el horizonte.
+
+    Si el empleado declara `horario_semanal`, se usa la plantilla compilada
+    (cacheada entre solicitudes); si no, se replica `horario_trabajo` por día.
+    """
+    plantilla = h.get("horario_semanal")
+    if plantilla:
+        return compilar_horario_semanal(plantilla, fecha_base, len(day_offsets))
+    trabajo_ini, trabajo_fin = h["horario_trabajo"]
+    return _expandir_diario(trabajo_ini, trabajo_fin, day_offsets)
+
+
+def _inicios_pool_lote(
+    horarios: List[Dict[str, Any]],
+    *,
+    fecha_base: Any,
+    day_offsets: List[int],
+    bloqueos_por_empleado: Dict[str, List[List[int]]],
+    bloqueos_globales: List[List[int]],
+    ventana_base: List[int],
+    start_constraint_windows: List[List[int]],
+    servicio_windows_abs: List[List[int]],
+    duracion_total_slot: int,
+    buffer_previo: int,
+    buffer_posterior: int,
+    equipos_por_empleado: Optional[Dict[str, List[str]]] = None,
+    operativo_por_equipo: Optional[Dict[str, List[List[int]]]] = None,
+    bloqueos_por_equipo: Optional[Dict[str, List[List[int]]]] = None,
+) -> List[Tuple[str, Optional[str], int]]:
+    """Calcula los inicios "pre" de todo el pool con el motor por lotes.
+
+    Equivale a encadenar `restar_intervalos` → `calcular_interseccion` →
+    `encontrar_slots` dueño por dueño, pero en una pasada vectorizada.
+    `servicio_windows_abs` solo debe venir informado bajo la política full_slot.
+
+    Sin `equipos_por_empleado`, cada empleado es un dueño. Con él, cada par
+    (empleado, equipo compatible) es un dueño cuyos libres se recortan además
+    al horario operativo del equipo y descuentan sus bloqueos; los empleados
+    sin equipos no aportan dueños.
+
+    Retorna ternas `(empleado_id, equipo_id, inicio_pre)` (`equipo_id` None sin equipos).
+    """
+    if not horarios:
+        return []
+    ids = [h["empleado_id"] for h in horarios]
+    if equipos_por_empleado is None:
+        pares: List[Tuple[int, Optional[str]]] = [(i, None) for i in range(len(ids))]
+    else:
+        pares = [(i, eq) for i, eid in enumerate(ids) for eq in equipos_por_empleado.get(eid, [])]
+    if not pares:
+        return []
+    duenos = range(len(pares))
+
+    # La expansión del horario es por empleado, aunque aporte varios dueños
+    trabajo_por_empleado: Dict[int, Any] = {}
+    for i, _ in pares:
+        if i not in trabajo_por_empleado:
+            trabajo_por_empleado[i] = _intervalos_trabajo(horarios[i], fecha_base, day_offsets)
+    trabajo = lote_desde_listas({o: trabajo_por_empleado[i] for o, (i, _) in enumerate(pares)})
+
+    def _bloqueos_de(i: int, eq: Optional[str]) -> List[List[int]]:
+        propios = bloqueos_por_empleado.get(ids[i], []) or []
+        if eq is None:
+            return propios
+        return propios + ((bloqueos_por_equipo or {}).get(eq, []) or [])
+
+    bloqueos = concatenar_lotes(
+        lote_desde_listas({o: _bloqueos_de(i, eq) for o, (i, eq) in enumerate(pares)}),
+        replicar_lote(bloqueos_globales or [], duenos),
+    )
+    libres = restar_intervalos_lote(trabajo, bloqueos)
+    libres = calcular_interseccion_lote(libres, replicar_lote([ventana_base], duenos))
+    if servicio_windows_abs:
+        libres = calcular_interseccion_lote(libres, replicar_lote(servicio_windows_abs, duenos))
+    if equipos_por_empleado is not None:
+        operativos = lote_desde_listas({o: (operativo_por_equipo or {})[eq] for o, (_, eq) in enumerate(pares)})
+        libres = calcular_interseccion_lote(libres, operativos)
+
+    res: List[Tuple[str, Optional[str], int]] = []
+    for eff_ini, eff_fin in start_constraint_windows:
+        slot_duenos, inicios = encontrar_slots_lote(
+            [eff_ini, eff_fin],
+            libres,
+            duracion_total_slot,
+            buffer_previo,
+            buffer_posterior,
+        )
+        res.extend((ids[pares[o][0]], pares[o][1], ini) for o, ini in zip(slot_duenos.tolist(), inicios.tolist()))
+    return res
+
+
+def _resolver_conjunto(
+    motor: Any,
+    *,
+    inicio_min: int,
+    fin_min: int,
+    bloqueos_por_empleado: Dict[str, List[List[int]]],
+    bloqueos_globales: List[List[int]],
+) -> Callable[[List[List[int]]], Any]:
+    """Devuelve el constructor de conjuntos de intervalos para la búsqueda.
+
+    - "intervalos": `IntervalSet` (listas normalizadas, mezclas lineales).
+    - "bitmap": `MapaMinutos` con marco en la ventana base [inicio_min, fin_min);
+      como todos los libres se recortan a esa ventana, el resultado es idéntico.
+    - "auto" o None: bitmap solo si la densidad de bloqueos por empleado lo amerita.
+    """
+    valor = str(getattr(motor, "value", motor) or "auto").lower()
+    if valor not in ("intervalos", "bitmap", "auto"):
+        raise ValueError(f"Motor de intervalos desconocido: {valor}")
+    if valor == "auto":
+        total = sum(len(v) for v in bloqueos_por_empleado.values()) + len(bloqueos_globales or [])
+        densidad = total / max(1, len(bloqueos_por_empleado))
+        valor = "bitmap" if preferir_bitmap(densidad, fin_min - inicio_min) else "intervalos"
+    if valor == "bitmap":
+        longitud = fin_min - inicio_min
+        return lambda intervalos: MapaMinutos.desde_intervalos(intervalos, inicio_min, longitud)
+    return IntervalSet.normalizar
+
+
+def _filtrar_horarios(
+    solicitud: Any,
+    escenario: Optional[Dict[str, Any]],
+    base_midnight,
+    get_horarios_empleados_fn: Optional[Callable[..., List[Dict[str, Any]]]],
+) -> List[Dict[str, Any]]:
+    """Empleados candidatos de la solicitud (escenario o mock_db) según sus filtros.
+
+    - Escenario con asignaciones: filtrado estricto por `servicios_asignados` y,
+      si viene `equipo_id`, por `equipos_asignados`.
+    - Sin escenario: delega los filtros de servicio y equipo en `get_horarios_empleados`.
+    - Si viene `empleado_id`, solo ese empleado.
+    """
+    get_horarios_empleados = get_horarios_empleados_fn or default_get_horarios_empleados
+    if escenario and "empleados" in escenario:
+        horarios = escenario["empleados"]
+        # Si el escenario define asignaciones por empleado, aplicar filtrado estricto
+        serv_key_present = any("servicios_asignados" in h for h in horarios)
+        eq_key_present = any("equipos_asignados" in h for h in horarios)
+        if serv_key_present and solicitud.servicio_id:
+            horarios = [h for h in horarios if solicitud.servicio_id in h.get("servicios_asignados", [])]
+        # Filtrado por equipo: `equipo_id` único
+        if eq_key_present:
+            equipo_id_req = getattr(solicitud, "equipo_id", None)
+            if equipo_id_req:
+                # Mantener empleados que tengan asignado el equipo solicitado
+                horarios = [h for h in horarios if equipo_id_req in h.get("equipos_asignados", [])]
+    else:
+        # Pasar filtros de servicio y equipo (equipo_id único) para asegurar empleados válidos
+        horarios = get_horarios_empleados(
+            base_midnight,
+            servicio_id=solicitud.servicio_id,
+            equipo_id=getattr(solicitud, "equipo_id", None),
+        )
+    if getattr(solicitud, "empleado_id", None):
+        horarios = [h for h in horarios if h.get("empleado_id") == solicitud.empleado_id]
+    return horarios
+
+
+def _ventanas_inicio(
+    escenario: Optional[Dict[str, Any]],
+    servicio_id: Optional[str],
+    day_offsets: List[int],
+    inicio_min: int,
+    fin_min: int,
+) -> Tuple[List[List[int]], List[List[int]], List[List[int]]]:
+    """Ventanas de atención que restringen el INICIO del servicio.
+
+    Retorna `(start_constraint_windows, negocio_windows_abs, servicio_windows_abs)`:
+    base ∩ negocio ∩ servicio, y las ventanas de negocio y servicio expandidas por día.
+    """
+    start_constraint_windows: List[List[int]] = [[inicio_min, fin_min]]
+    negocio_windows_abs: List[List[int]] = []
+    if escenario and isinstance(escenario.get("horario_atencion_negocio"), list):
+        negocio_ini, negocio_fin = escenario["horario_atencion_negocio"]
+        negocio_windows_abs = _expandir_diario(negocio_ini, negocio_fin, day_offsets)
+        start_constraint_windows = calcular_interseccion(start_constraint_windows, negocio_windows_abs)
+
+    servicio_windows_abs: List[List[int]] = []
+    if escenario and "servicios" in escenario:
+        svc = escenario["servicios"].get(servicio_id)
+        if svc and isinstance(svc.get("horario_atencion"), list):
+            svc_att = svc["horario_atencion"]
+            servicio_windows_abs = _expandir_diario(svc_att[0], svc_att[1], day_offsets)
+            start_constraint_windows = calcular_interseccion(start_constraint_windows, servicio_windows_abs)
+    return start_constraint_windows, negocio_windows_abs, servicio_windows_abs
+
+
+def _operativo_equipo(
+    escenario: Optional[Dict[str, Any]],
+    equipo_id: str,
+    day_offsets: List[int],
+    inicio_min: int,
+    fin_min: int,
+) -> List[List[int]]:
+    """Horario operativo del equipo expandido por día; sin definición, la ventana base."""
+    if escenario and "equipos" in escenario:
+        eq_match = next((e for e in escenario["equipos"] if e.get("equipo_id") == equipo_id), None)
+        if eq_match and isinstance(eq_match.get("horario_operativo"), list):
+            op_ini, op_fin = eq_match["horario_operativo"]
+            return _expandir_diario(op_ini, op_fin, day_offsets)
+    return [[inicio_min, fin_min]]
+
+
 def seleccionar_equipo_por_politica(
     candidatos_eq: List[str],
     servicio: Dict[str, Any],
@@ -209,6 +473,8 @@ def seleccionar_equipo_por_politica(
     ventana_base: List[int],
     escenario: Optional[Dict[str, Any]] = None,
     get_ocupaciones_fn: Optional[Callable[[List[str], Any, Any], List[Dict[str, Any]]]] = None,
+    bloqueos_por_equipo: Optional[Dict[str, List[List[int]]]] = None,
+    tabla_cargas: Optional[TablaCargas] = None,
 ) -> Optional[str]:
     """
     Selecciona un equipo entre varios candidatos según la política declarada
@@ -219,6 +485,10 @@ def seleccionar_equipo_por_politica(
     - least_loaded: selecciona el equipo con menos minutos ocupados en el
       **día completo** (0-1440 relativo a `base_midnight`), usando `build_total_blockings` y
       `_sumar_minutos_interseccion`. Desempate lexicográfico.
+      Si se pasa `tabla_cargas` (sumas prefijas por equipo de la solicitud) la
+      selección es una consulta; si se pasa `bloqueos_por_equipo` (instantánea
+      de la solicitud), se usa directamente y solo se recalculan los equipos
+      ausentes en ella.
 
     Retorna el `equipo_id` elegido o None si la lista está vacía.
     """
@@ -238,17 +508,25 @@ def seleccionar_equipo_por_politica(
         # Medición de carga en el día completo relativo a `base_midnight`
         ventana_dia = [0, 24 * 60]
         cargas: List[Tuple[int, str]] = []
-        for eq_id in candidatos_eq:
-            _, bloqueos_eq, _ = build_total_blockings(
+        if tabla_cargas is not None and all(eq in tabla_cargas for eq in candidatos_eq):
+            cargas = [(tabla_cargas.carga(eq, ventana_dia[0], ventana_dia[1]), eq) for eq in candidatos_eq]
+            return min(cargas)[1]
+        faltantes = [eq for eq in candidatos_eq if bloqueos_por_equipo is None or eq not in bloqueos_por_equipo]
+        bloqueos_eq: Dict[str, List[List[int]]] = dict(bloqueos_por_equipo or {})
+        if faltantes:
+            _, calculados, _ = build_total_blockings(
                 base_midnight=base_midnight,
                 inicio_dt=inicio_dt,
                 fin_dt=fin_dt,
                 escenario=escenario,
                 empleados_ids=empleados_ids,
-                equipo_id=eq_id,
+                equipo_id=None,
                 servicio_id=servicio_id,
                 get_ocupaciones_fn=get_ocupaciones_fn,
+                equipo_ids=faltantes,
             )
+            bloqueos_eq.update(calculados)
+        for eq_id in candidatos_eq:
             carga = _sumar_minutos_interseccion(bloqueos_eq.get(eq_id, []), ventana_dia)
             cargas.append((carga, eq_id))
         cargas.sort(key=lambda x: (x[0], x[1]))
@@ -345,8 +623,9 @@ def gestionar_busqueda_disponibilidad(
     fin_dt = pendulum.instance(solicitud.fecha_fin_utc).in_timezone("UTC")
     base_midnight = inicio_dt.start_of("day")
 
-    inicio_min = int((inicio_dt - base_midnight).total_seconds() // 60)
-    fin_min = int((fin_dt - base_midnight).total_seconds() // 60)
+    origen_epoch = minutos_epoch(base_midnight)
+    inicio_min = minutos_epoch(inicio_dt) - origen_epoch
+    fin_min = minutos_epoch(fin_dt) - origen_epoch
     if fin_min <= inicio_min:
         logging.warning("Gerente: ventana base inválida: [%d,%d]", inicio_min, fin_min)
         return []
@@ -377,33 +656,9 @@ def gestionar_busqueda_disponibilidad(
         raise ValueError("Equipo no compatible para el servicio")
 
     # Horarios de empleados
-    get_horarios_empleados = get_horarios_empleados_fn or default_get_horarios_empleados
-    if escenario and "empleados" in escenario:
-        horarios = escenario["empleados"]
-        # Si el escenario define asignaciones por empleado, aplicar filtrado estricto
-        serv_key_present = any("servicios_asignados" in h for h in horarios)
-        eq_key_present = any("equipos_asignados" in h for h in horarios)
-        if serv_key_present and solicitud.servicio_id:
-            horarios = [h for h in horarios if solicitud.servicio_id in h.get("servicios_asignados", [])]
-        # Filtrado por equipo: `equipo_id` único
-        if eq_key_present:
-            equipo_id_req = getattr(solicitud, "equipo_id", None)
-            if equipo_id_req:
-                # Mantener empleados que tengan asignado el equipo solicitado
-                horarios = [h for h in horarios if equipo_id_req in h.get("equipos_asignados", [])]
-        if not horarios:
-            return []
-    else:
-        # Pasar filtros de servicio y equipo (equipo_id único) para asegurar empleados válidos
-        horarios = get_horarios_empleados(
-            base_midnight,
-            servicio_id=solicitud.servicio_id,
-            equipo_id=getattr(solicitud, "equipo_id", None),
-        )
-    if getattr(solicitud, "empleado_id", None):
-        horarios = [h for h in horarios if h.get("empleado_id") == solicitud.empleado_id]
-        if not horarios:
-            return []
+    horarios = _filtrar_horarios(solicitud, escenario, base_midnight, get_horarios_empleados_fn)
+    if not horarios:
+        return []
 
     # Excluir explícitamente al empleado bloqueado para cascada
     if excluir_empleado_id:
@@ -414,43 +669,53 @@ def gestionar_busqueda_disponibilidad(
     empleados_ids = [h["empleado_id"] for h in horarios]
 
     # Agregación de bloqueos (ocupaciones + excepciones)
-    # Calculamos bloqueos base por empleado y globales una sola vez (sin equipo)
-    bloqueos_por_empleado_base, _, bloqueos_globales_base = build_total_blockings(
+    # Instantánea por solicitud: empleados, todos los equipos candidatos y globales
+    # se resuelven en un solo barrido y se comparten entre todas las ramas.
+    bloqueos_por_empleado_base, bloqueos_por_equipo_base, bloqueos_globales_base = build_total_blockings(
         base_midnight=base_midnight,
         inicio_dt=inicio_dt,
         fin_dt=fin_dt,
         escenario=escenario,
         empleados_ids=empleados_ids,
-        equipo_id=None,
+        equipo_id=getattr(solicitud, "equipo_id", None),
         servicio_id=solicitud.servicio_id,
         get_ocupaciones_fn=get_ocupaciones_fn,
+        equipo_ids=svc_compatibles,
     )
 
     # Offsets de día (manejar cruce de medianoche)
-    cruza_noche = fin_min > 1440
-    day_offsets = [0] + ([1440] if cruza_noche else [])
+    # Un offset por cada día que toca la ventana [inicio_min, fin_min) (horizonte arbitrario)
+    day_offsets = _offsets_de_dias(fin_min)
+    fecha_base = base_midnight.date()
+    if len(day_offsets) > MAX_HORIZONTE_DIAS:
+        raise ValueError(f"Horizonte de búsqueda excede el máximo de {MAX_HORIZONTE_DIAS} días")
 
     # Ventanas de atención (restricción de INICIO)
-    start_constraint_windows: List[List[int]] = [[inicio_min, fin_min]]
-    negocio_windows_abs: List[List[int]] = []
-    if escenario and isinstance(escenario.get("horario_atencion_negocio"), list):
-        negocio_ini, negocio_fin = escenario["horario_atencion_negocio"]
-        negocio_windows_abs = [[negocio_ini + d, negocio_fin + d] for d in day_offsets]
-        start_constraint_windows = calcular_interseccion(start_constraint_windows, negocio_windows_abs)
-
-    servicio_windows_abs: List[List[int]] = []
-    if escenario and "servicios" in escenario:
-        svc = escenario["servicios"].get(solicitud.servicio_id)
-        if svc and isinstance(svc.get("horario_atencion"), list):
-            svc_att = svc["horario_atencion"]
-            servicio_windows_abs = [[svc_att[0] + d, svc_att[1] + d] for d in day_offsets]
-            start_constraint_windows = calcular_interseccion(start_constraint_windows, servicio_windows_abs)
+    start_constraint_windows, negocio_windows_abs, servicio_windows_abs = _ventanas_inicio(
+        escenario, solicitud.servicio_id, day_offsets, inicio_min, fin_min
+    )
 
     if not start_constraint_windows:
         return []
 
+    # Ventanas fijas de la búsqueda como conjuntos normalizados: las cadenas
+    # resta → intersección por empleado/equipo operan sin reordenar.
+    ventana_base_set = IntervalSet([[inicio_min, fin_min]])
+    servicio_windows_set = IntervalSet(servicio_windows_abs)
+
+    # Backend de intervalos (por solicitud o automático por densidad)
+    conjunto = _resolver_conjunto(
+        getattr(solicitud, "motor_intervalos", None),
+        inicio_min=inicio_min,
+        fin_min=fin_min,
+        bloqueos_por_empleado=bloqueos_por_empleado_base,
+        bloqueos_globales=bloqueos_globales_base,
+    )
+
     # Determinar política de servicio (admite Enum o string)
     policy_value = getattr(solicitud.service_window_policy, "value", solicitud.service_window_policy)
+    # Con full_slot, la ventana del servicio también recorta los libres a empaquetar
+    ventanas_pack = [servicio_windows_set] if policy_value == "full_slot" and servicio_windows_abs else []
 
     logging.info(
         "Gerente: policy=%s; start=%s, negocio=%s, servicio=%s, base=[%d,%d]",
@@ -462,53 +727,45 @@ def gestionar_busqueda_disponibilidad(
         fin_min,
     )
 
-    resultados: List[Dict[str, Any]] = []
+    # Candidatos compactos (inicio_min, fin_min, idx_empleado, idx_equipo) hasta la
+    # selección; los datetimes se crean solo para los slots elegidos.
+    resultados: List[Tuple[int, int, int, int]] = []
 
     # Camino equipo único: aplicar restricciones y bloqueos del equipo solicitado
     equipo_id_req = getattr(solicitud, "equipo_id", None)
+    equipos_ids = list(dict.fromkeys(list(svc_compatibles) + ([equipo_id_req] if equipo_id_req else [])))
+    idx_equipo = {eq: i for i, eq in enumerate(equipos_ids)}
+    idx_empleado = {eid: i for i, eid in enumerate(empleados_ids)}
+    # Tablas de carga de la solicitud (sumas prefijas sobre la instantánea de bloqueos)
+    tabla_empleados = TablaCargas(bloqueos_por_empleado_base)
+    tabla_equipos = TablaCargas(bloqueos_por_equipo_base)
+    cargas_empleado: Dict[int, int] = {}
+
+    def _carga(i_emp: int) -> int:
+        # Minutos ocupados del empleado dentro de la ventana base (memo por solicitud)
+        carga = cargas_empleado.get(i_emp)
+        if carga is None:
+            carga = tabla_empleados.carga(empleados_ids[i_emp], inicio_min, fin_min)
+            cargas_empleado[i_emp] = carga
+        return carga
     if equipo_id_req:
         # Configuración operativa del equipo solicitado
-        equipo_operativo_abs: List[List[int]] = []
-        if escenario and "equipos" in escenario:
-            eq_list = escenario["equipos"]
-            eq_match = next((e for e in eq_list if e.get("equipo_id") == equipo_id_req), None)
-            if eq_match and isinstance(eq_match.get("horario_operativo"), list):
-                op_ini, op_fin = eq_match["horario_operativo"]
-                equipo_operativo_abs = [[op_ini + d, op_fin + d] for d in day_offsets]
-        if not equipo_operativo_abs:
-            equipo_operativo_abs = [[inicio_min, fin_min]]
-
-        # Bloqueos específicos del equipo solicitado
-        _, bloqueos_por_equipo_cur, _ = build_total_blockings(
-            base_midnight=base_midnight,
-            inicio_dt=inicio_dt,
-            fin_dt=fin_dt,
-            escenario=escenario,
-            empleados_ids=empleados_ids,
-            equipo_id=equipo_id_req,
-            servicio_id=solicitud.servicio_id,
-            get_ocupaciones_fn=get_ocupaciones_fn,
-        )
+        equipo_operativo_abs = _operativo_equipo(escenario, equipo_id_req, day_offsets, inicio_min, fin_min)
 
         for h in horarios:
             empleado_id = h["empleado_id"]
-            trabajo_ini, trabajo_fin = h["horario_trabajo"]
-            intervalos_trabajo_abs = [[trabajo_ini + d, trabajo_fin + d] for d in day_offsets]
+            intervalos_trabajo_abs = conjunto(_intervalos_trabajo(h, fecha_base, day_offsets))
 
             bloqueos_emp = (bloqueos_por_empleado_base.get(empleado_id, []) or []) + (bloqueos_globales_base or [])
-            libres_empleado = restar_intervalos(intervalos_trabajo_abs, bloqueos_emp)
-
-            bloqueos_eq = (bloqueos_por_equipo_cur.get(equipo_id_req, []) or []) + (bloqueos_globales_base or [])
-            libres_equipo = restar_intervalos(equipo_operativo_abs, bloqueos_eq)
+            bloqueos_eq = (bloqueos_por_equipo_base.get(equipo_id_req, []) or []) + (bloqueos_globales_base or [])
 
-            libres_emp_en_base = calcular_interseccion(libres_empleado, [[inicio_min, fin_min]])
-            libres_comunes_base = calcular_interseccion(libres_emp_en_base, libres_equipo)
+            # trabajo ∩ base ∩ equipo (∩ servicio en full_slot) − bloqueos, en un solo barrido
+            libres_para_pack = intersectar_multiples(
+                [intervalos_trabajo_abs, ventana_base_set, conjunto(equipo_operativo_abs)] + ventanas_pack,
+                restar=[bloqueos_emp, bloqueos_eq],
+            )
 
             for eff_ini, eff_fin in start_constraint_windows:
-                libres_para_pack = libres_comunes_base
-                if policy_value == "full_slot" and servicio_windows_abs:
-                    libres_para_pack = calcular_interseccion(libres_para_pack, servicio_windows_abs)
-
                 inicios_pre = encontrar_slots(
                     [eff_ini, eff_fin],
                     libres_para_pack,
@@ -517,52 +774,38 @@ def gestionar_busqueda_disponibilidad(
                     buffer_posterior,
                 )
 
-                for inicio_pre in inicios_pre:
-                    inicio_dt_abs = base_midnight.add(minutes=inicio_pre)
-                    fin_dt_abs = inicio_dt_abs.add(minutes=duracion_total_slot)
-                    resultados.append(
-                        {
-                            "inicio_slot": inicio_dt_abs,
-                            "fin_slot": fin_dt_abs,
-                            "empleado_id_asignado": empleado_id,
-                            "equipo_id_asignado": equipo_id_req,
-                        }
-                    )
+                i_emp, i_eq = idx_empleado[empleado_id], idx_equipo[equipo_id_req]
+                resultados.extend((ini, ini + duracion_total_slot, i_emp, i_eq) for ini in inicios_pre)
 
         # Balanceo: para cada (inicio, fin, equipo), elegir el empleado menos cargado ese día
-        grupos: Dict[Tuple[str, str, Optional[str]], List[Dict[str, Any]]] = {}
-        for r in resultados:
-            k = (r["inicio_slot"].isoformat(), r["fin_slot"].isoformat(), r.get("equipo_id_asignado"))
-            grupos.setdefault(k, []).append(r)
+        grupos: Dict[Tuple[int, int, int], List[Tuple[int, int, int, int]]] = {}
+        for c in resultados:
+            grupos.setdefault((c[0], c[1], c[3]), []).append(c)
 
-        seleccionados: List[Dict[str, Any]] = []
-        for (ini_iso, fin_iso, eq_id), lst in grupos.items():
+        seleccionados: List[Tuple[int, int, int, int]] = []
+        for lst in grupos.values():
             # Usar la ventana base solicitada para medir carga en lugar del día completo.
             # Esto favorece al menos cargado dentro del rango de búsqueda efectivo
             # y evita que slots consecutivos asignen al mismo empleado si causan solapes.
-            ventana_base = [inicio_min, fin_min]
-
             mejor = None
             mejor_carga = None
             for cand in lst:
-                eid = cand.get("empleado_id_asignado")
-                carga = _sumar_minutos_interseccion(bloqueos_por_empleado_base.get(eid, []), ventana_base)
+                carga = _carga(cand[2])
                 if mejor is None or carga < mejor_carga:
                     mejor = cand
                     mejor_carga = carga
                 elif carga == mejor_carga:
                     # Tie-breaker determinista: preferir el menor empleado_id lexicográfico
-                    if str(eid) < str(mejor.get("empleado_id_asignado")):
+                    if str(empleados_ids[cand[2]]) < str(empleados_ids[mejor[2]]):
                         mejor = cand
                         mejor_carga = carga
             seleccionados.append(mejor)
 
-        seleccionados.sort(key=lambda s: s["inicio_slot"])  # ordenar por inicio
-        return seleccionados
+        return _materializar_slots(base_midnight, seleccionados, empleados_ids, equipos_ids)
 
     # Camino empleado específico sin equipo: probar todos los equipos compatibles del empleado
     if getattr(solicitud, "empleado_id", None) and not equipo_id_req:
-        resultados_interseccion: List[Dict[str, Any]] = []
+        resultados_interseccion: List[Tuple[int, int, int, int]] = []
         for h in horarios:
             empleado_id = h["empleado_id"]
             equipos_match = obtener_equipos_compatibles_para_empleado(servicio, h)
@@ -578,20 +821,14 @@ def gestionar_busqueda_disponibilidad(
                     # Omitimos este empleado
                     continue
                 # Fallback solo si el servicio NO requiere equipo
-                trabajo_ini, trabajo_fin = h["horario_trabajo"]
-                intervalos_trabajo_abs = [[trabajo_ini + d, trabajo_fin + d] for d in day_offsets]
+                intervalos_trabajo_abs = conjunto(_intervalos_trabajo(h, fecha_base, day_offsets))
 
                 bloqueos_emp = (bloqueos_por_empleado_base.get(empleado_id, []) or []) + (bloqueos_globales_base or [])
                 libres_empleado = restar_intervalos(intervalos_trabajo_abs, bloqueos_emp)
 
-                libres_emp_en_base = calcular_interseccion(libres_empleado, [[inicio_min, fin_min]])
-                libres_comunes_base = libres_emp_en_base
+                libres_para_pack = intersectar_multiples([libres_empleado, ventana_base_set] + ventanas_pack)
 
                 for eff_ini, eff_fin in start_constraint_windows:
-                    libres_para_pack = libres_comunes_base
-                    if policy_value == "full_slot" and servicio_windows_abs:
-                        libres_para_pack = calcular_interseccion(libres_para_pack, servicio_windows_abs)
-
                     inicios_pre = encontrar_slots(
                         [eff_ini, eff_fin],
                         libres_para_pack,
@@ -600,62 +837,32 @@ def gestionar_busqueda_disponibilidad(
                         buffer_posterior,
                     )
 
-                    for inicio_pre in inicios_pre:
-                        inicio_dt_abs = base_midnight.add(minutes=inicio_pre)
-                        fin_dt_abs = inicio_dt_abs.add(minutes=duracion_total_slot)
-                        resultados_interseccion.append(
-                            {
-                                "inicio_slot": inicio_dt_abs,
-                                "fin_slot": fin_dt_abs,
-                                "empleado_id_asignado": empleado_id,
-                                "equipo_id_asignado": None,
-                            }
-                        )
+                    i_emp = idx_empleado[empleado_id]
+                    resultados_interseccion.extend(
+                        (ini, ini + duracion_total_slot, i_emp, _SIN_EQUIPO) for ini in inicios_pre
+                    )
                 # Pasamos al siguiente empleado
                 continue
 
             # Probar todos los equipos compatibles del empleado para no omitir horarios por orden
-            trabajo_ini, trabajo_fin = h["horario_trabajo"]
-            intervalos_trabajo_abs = [[trabajo_ini + d, trabajo_fin + d] for d in day_offsets]
+            intervalos_trabajo_abs = conjunto(_intervalos_trabajo(h, fecha_base, day_offsets))
 
             bloqueos_emp = (bloqueos_por_empleado_base.get(empleado_id, []) or []) + (bloqueos_globales_base or [])
             libres_empleado = restar_intervalos(intervalos_trabajo_abs, bloqueos_emp)
-            libres_emp_en_base = calcular_interseccion(libres_empleado, [[inicio_min, fin_min]])
+            libres_emp_en_base = calcular_interseccion(libres_empleado, ventana_base_set)
 
             for eq_id in equipos_match:
-                equipo_operativo_abs: List[List[int]] = []
-                if escenario and "equipos" in escenario:
-                    eq_list = escenario["equipos"]
-                    eq_match = next((e for e in eq_list if e.get("equipo_id") == eq_id), None)
-                    if eq_match and isinstance(eq_match.get("horario_operativo"), list):
-                        op_ini, op_fin = eq_match["horario_operativo"]
-                        equipo_operativo_abs = [[op_ini + d, op_fin + d] for d in day_offsets]
-                if not equipo_operativo_abs:
-                    equipo_operativo_abs = [[inicio_min, fin_min]]
-
-                # Bloqueos específicos del equipo actual
-                _, bloqueos_por_equipo_cur, _ = build_total_blockings(
-                    base_midnight=base_midnight,
-                    inicio_dt=inicio_dt,
-                    fin_dt=fin_dt,
-                    escenario=escenario,
-                    empleados_ids=empleados_ids,
-                    equipo_id=eq_id,
-                    servicio_id=solicitud.servicio_id,
-                    get_ocupaciones_fn=get_ocupaciones_fn,
-                )
+                equipo_operativo_abs = _operativo_equipo(escenario, eq_id, day_offsets, inicio_min, fin_min)
 
-                bloqueos_eq = (bloqueos_por_equipo_cur.get(eq_id, []) or []) + (bloqueos_globales_base or [])
-                libres_equipo = restar_intervalos(equipo_operativo_abs, bloqueos_eq)
+                bloqueos_eq = (bloqueos_por_equipo_base.get(eq_id, []) or []) + (bloqueos_globales_base or [])
 
-                # Intersección empleado ∩ equipo
-                libres_comunes_base = calcular_interseccion(libres_emp_en_base, libres_equipo)
+                # Intersección empleado ∩ equipo (∩ servicio en full_slot) − bloqueos del equipo
+                libres_para_pack = intersectar_multiples(
+                    [libres_emp_en_base, conjunto(equipo_operativo_abs)] + ventanas_pack,
+                    restar=[bloqueos_eq],
+                )
 
                 for eff_ini, eff_fin in start_constraint_windows:
-                    libres_para_pack = libres_comunes_base
-                    if policy_value == "full_slot" and servicio_windows_abs:
-                        libres_para_pack = calcular_interseccion(libres_para_pack, servicio_windows_abs)
-
                     inicios_pre = encontrar_slots(
                         [eff_ini, eff_fin],
                         libres_para_pack,
@@ -664,32 +871,24 @@ def gestionar_busqueda_disponibilidad(
                         buffer_posterior,
                     )
 
-                    for inicio_pre in inicios_pre:
-                        inicio_dt_abs = base_midnight.add(minutes=inicio_pre)
-                        fin_dt_abs = inicio_dt_abs.add(minutes=duracion_total_slot)
-                        resultados_interseccion.append(
-                            {
-                                "inicio_slot": inicio_dt_abs,
-                                "fin_slot": fin_dt_abs,
-                                "empleado_id_asignado": empleado_id,
-                                "equipo_id_asignado": eq_id,
-                            }
-                        )
+                    i_emp, i_eq = idx_empleado[empleado_id], idx_equipo[eq_id]
+                    resultados_interseccion.extend(
+                        (ini, ini + duracion_total_slot, i_emp, i_eq) for ini in inicios_pre
+                    )
 
         # Deduplicación por horario (inicio, fin) seleccionando un único equipo por slot para el empleado
-        grupos: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
-        for r in resultados_interseccion:
-            k = (r["inicio_slot"].isoformat(), r["fin_slot"].isoformat())
-            grupos.setdefault(k, []).append(r)
+        grupos_emp: Dict[Tuple[int, int], List[Tuple[int, int, int, int]]] = {}
+        for c in resultados_interseccion:
+            grupos_emp.setdefault((c[0], c[1]), []).append(c)
 
         svc_eqs: List[str] = servicio.get("equipos_compatibles", []) or []
-        seleccionados: List[Dict[str, Any]] = []
-        for _, lst in grupos.items():
+        seleccionados_emp: List[Tuple[int, int, int, int]] = []
+        for lst in grupos_emp.values():
             # Preferir equipo según orden declarado por el servicio; desempate determinista por id
             mejor = None
             mejor_rank = None
             for cand in lst:
-                eq_id = cand.get("equipo_id_asignado")
+                eq_id = None if cand[3] == _SIN_EQUIPO else equipos_ids[cand[3]]
                 if eq_id is None:
                     # Si el servicio no requiere equipo, cualquier candidato es válido; elegimos el primero por orden
                     if mejor is None:
@@ -702,81 +901,111 @@ def gestionar_busqueda_disponibilidad(
                     mejor_rank = rank
                 elif rank == mejor_rank:
                     # Tie-breaker determinista: menor equipo_id lexicográfico
-                    if str(eq_id) < str(mejor.get("equipo_id_asignado")):
+                    mejor_eq = None if mejor[3] == _SIN_EQUIPO else equipos_ids[mejor[3]]
+                    if str(eq_id) < str(mejor_eq):
                         mejor = cand
                         mejor_rank = rank
             if mejor:
-                seleccionados.append(mejor)
+                seleccionados_emp.append(mejor)
 
-        seleccionados.sort(key=lambda s: s["inicio_slot"])  # ordenar por inicio
-        return seleccionados
+        return _materializar_slots(base_midnight, seleccionados_emp, empleados_ids, equipos_ids)
 
     # Camino servicio-only (sin equipo): en modo pool general
     # - Si el servicio declara equipos_compatibles, intentamos autoasignación por intersección
     #   y omitimos empleados sin intersección (estricto).
     # - Si NO declara equipos_compatibles, devolvemos slots sin equipo asignado.
 
-    resultados: List[Dict[str, Any]] = []
+    resultados = []
 
-    for h in horarios:
-        empleado_id = h["empleado_id"]
-        trabajo_ini, trabajo_fin = h["horario_trabajo"]
-        intervalos_trabajo_abs = [[trabajo_ini + d, trabajo_fin + d] for d in day_offsets]
-
-        # Libres de empleado (base + globales)
-        bloqueos_emp = (bloqueos_por_empleado_base.get(empleado_id, []) or []) + (bloqueos_globales_base or [])
-        libres_empleado = restar_intervalos(intervalos_trabajo_abs, bloqueos_emp)
-
-        # Recorte por ventana base
-        libres_emp_en_base = calcular_interseccion(libres_empleado, [[inicio_min, fin_min]])
-
-        requiere_equipo = bool(servicio.get("equipos_compatibles"))
-        if requiere_equipo:
+    requiere_equipo = bool(servicio.get("equipos_compatibles"))
+    # El motor por lotes opera sobre listas de intervalos: con mapa de bits el pool
+    # se resuelve por empleado (o par empleado-equipo) con el constructor elegido
+    motor_bitmap = conjunto != IntervalSet.normalizar
+    equipos_por_empleado: Optional[Dict[str, List[str]]] = None
+    if requiere_equipo:
+        equipos_por_empleado = {}
+        for h in horarios:
             equipos_match = obtener_equipos_compatibles_para_empleado(servicio, h)
             if not equipos_match:
                 # Estricto en pool: si el servicio requiere equipo y no hay intersección, omitir empleado
                 logging.info(
                     "Pool: servicio %s requiere equipo; empleado %s sin match",
                     solicitud.servicio_id,
-                    empleado_id,
+                    h["empleado_id"],
+                )
+                continue
+            equipos_por_empleado[h["empleado_id"]] = equipos_match
+    if not requiere_equipo and motor_bitmap:
+        for h in horarios:
+            empleado_id = h["empleado_id"]
+            bloqueos_emp = (bloqueos_por_empleado_base.get(empleado_id, []) or []) + (bloqueos_globales_base or [])
+            libres_para_pack = intersectar_multiples(
+                [conjunto(_intervalos_trabajo(h, fecha_base, day_offsets)), ventana_base_set] + ventanas_pack,
+                restar=[bloqueos_emp],
+            )
+            i_emp = idx_empleado[empleado_id]
+            for eff_ini, eff_fin in start_constraint_windows:
+                inicios_pre = encontrar_slots(
+                    [eff_ini, eff_fin],
+                    libres_para_pack,
+                    duracion_total_slot,
+                    buffer_previo,
+                    buffer_posterior,
                 )
+                resultados.extend((ini, ini + duracion_total_slot, i_emp, _SIN_EQUIPO) for ini in inicios_pre)
+    elif not motor_bitmap:
+        # Libres y slots de todo el pool en una sola pasada vectorizada (motor por
+        # lotes): un dueño por empleado, o por par (empleado, equipo compatible)
+        # si el servicio requiere equipo.
+        equipos_pool = list(dict.fromkeys(eq for eqs in (equipos_por_empleado or {}).values() for eq in eqs))
+        for empleado_id, eq_id, inicio_pre in _inicios_pool_lote(
+            horarios,
+            fecha_base=fecha_base,
+            day_offsets=day_offsets,
+            bloqueos_por_empleado=bloqueos_por_empleado_base,
+            bloqueos_globales=bloqueos_globales_base,
+            ventana_base=[inicio_min, fin_min],
+            start_constraint_windows=start_constraint_windows,
+            servicio_windows_abs=servicio_windows_abs if policy_value == "full_slot" else [],
+            duracion_total_slot=duracion_total_slot,
+            buffer_previo=buffer_previo,
+            buffer_posterior=buffer_posterior,
+            equipos_por_empleado=equipos_por_empleado,
+            operativo_por_equipo={
+                eq: _operativo_equipo(escenario, eq, day_offsets, inicio_min, fin_min) for eq in equipos_pool
+            },
+            bloqueos_por_equipo=bloqueos_por_equipo_base,
+        ):
+            i_eq = _SIN_EQUIPO if eq_id is None else idx_equipo[eq_id]
+            resultados.append((inicio_pre, inicio_pre + duracion_total_slot, idx_empleado[empleado_id], i_eq))
+    else:
+        for h in horarios:
+            empleado_id = h["empleado_id"]
+            equipos_match = equipos_por_empleado.get(empleado_id)
+            if not equipos_match:
                 continue
+            intervalos_trabajo_abs = conjunto(_intervalos_trabajo(h, fecha_base, day_offsets))
+
+            # Libres de empleado (base + globales)
+            bloqueos_emp = (bloqueos_por_empleado_base.get(empleado_id, []) or []) + (bloqueos_globales_base or [])
+            libres_empleado = restar_intervalos(intervalos_trabajo_abs, bloqueos_emp)
+
+            # Recorte por ventana base
+            libres_emp_en_base = calcular_interseccion(libres_empleado, ventana_base_set)
 
             # Probar todos los equipos compatibles del empleado para no omitir horarios por orden
             for eq_id in equipos_match:
-                equipo_operativo_abs: List[List[int]] = []
-                if escenario and "equipos" in escenario:
-                    eq_list = escenario["equipos"]
-                    eq_match = next((e for e in eq_list if e.get("equipo_id") == eq_id), None)
-                    if eq_match and isinstance(eq_match.get("horario_operativo"), list):
-                        op_ini, op_fin = eq_match["horario_operativo"]
-                        equipo_operativo_abs = [[op_ini + d, op_fin + d] for d in day_offsets]
-                if not equipo_operativo_abs:
-                    equipo_operativo_abs = [[inicio_min, fin_min]]
-
-                # Bloqueos específicos del equipo actual
-                _, bloqueos_por_equipo_cur, _ = build_total_blockings(
-                    base_midnight=base_midnight,
-                    inicio_dt=inicio_dt,
-                    fin_dt=fin_dt,
-                    escenario=escenario,
-                    empleados_ids=empleados_ids,
-                    equipo_id=eq_id,
-                    servicio_id=solicitud.servicio_id,
-                    get_ocupaciones_fn=get_ocupaciones_fn,
-                )
+                equipo_operativo_abs = _operativo_equipo(escenario, eq_id, day_offsets, inicio_min, fin_min)
 
-                bloqueos_eq = (bloqueos_por_equipo_cur.get(eq_id, []) or []) + (bloqueos_globales_base or [])
-                libres_equipo = restar_intervalos(equipo_operativo_abs, bloqueos_eq)
+                bloqueos_eq = (bloqueos_por_equipo_base.get(eq_id, []) or []) + (bloqueos_globales_base or [])
 
-                # Intersección empleado ∩ equipo
-                libres_comunes_base = calcular_interseccion(libres_emp_en_base, libres_equipo)
+                # Intersección empleado ∩ equipo (∩ servicio en full_slot) − bloqueos del equipo
+                libres_para_pack = intersectar_multiples(
+                    [libres_emp_en_base, conjunto(equipo_operativo_abs)] + ventanas_pack,
+                    restar=[bloqueos_eq],
+                )
 
                 for eff_ini, eff_fin in start_constraint_windows:
-                    libres_para_pack = libres_comunes_base
-                    if policy_value == "full_slot" and servicio_windows_abs:
-                        libres_para_pack = calcular_interseccion(libres_para_pack, servicio_windows_abs)
-
                     inicios_pre = encontrar_slots(
                         [eff_ini, eff_fin],
                         libres_para_pack,
@@ -785,52 +1014,16 @@ def gestionar_busqueda_disponibilidad(
                         buffer_posterior,
                     )
 
-                    for inicio_pre in inicios_pre:
-                        inicio_dt_abs = base_midnight.add(minutes=inicio_pre)
-                        fin_dt_abs = inicio_dt_abs.add(minutes=duracion_total_slot)
-                        resultados.append(
-                            {
-                                "inicio_slot": inicio_dt_abs,
-                                "fin_slot": fin_dt_abs,
-                                "empleado_id_asignado": empleado_id,
-                                "equipo_id_asignado": eq_id,
-                            }
-                        )
-        else:
-            # Servicio no requiere equipo: devolver slots sin equipo asignado
-            libres_comunes_base = libres_emp_en_base
-            for eff_ini, eff_fin in start_constraint_windows:
-                libres_para_pack = libres_comunes_base
-                if policy_value == "full_slot" and servicio_windows_abs:
-                    libres_para_pack = calcular_interseccion(libres_para_pack, servicio_windows_abs)
-
-                inicios_pre = encontrar_slots(
-                    [eff_ini, eff_fin],
-                    libres_para_pack,
-                    duracion_total_slot,
-                    buffer_previo,
-                    buffer_posterior,
-                )
-
-                for inicio_pre in inicios_pre:
-                    inicio_dt_abs = base_midnight.add(minutes=inicio_pre)
-                    fin_dt_abs = inicio_dt_abs.add(minutes=duracion_total_slot)
-                    resultados.append(
-                        {
-                            "inicio_slot": inicio_dt_abs,
-                            "fin_slot": fin_dt_abs,
-                            "empleado_id_asignado": empleado_id,
-                            "equipo_id_asignado": None,
-                        }
-                    )
+                    i_emp, i_eq = idx_empleado[empleado_id], idx_equipo[eq_id]
+                    resultados.extend((ini, ini + duracion_total_slot, i_emp, i_eq) for ini in inicios_pre)
 
     # Balanceo y deduplicación:
     # Regla por filtros:
     # - Pool general (sin empleado_id ni equipo_id): deduplicar por (inicio, fin) ignorando equipo.
     # - Con equipo_id especificado: deduplicar por (inicio, fin, equipo).
     # - Con empleado_id especificado sin equipo: deduplicar por (inicio, fin, equipo) si el servicio requiere equipo; de lo contrario por (inicio, fin).
-    grupos: Dict[Tuple[str, str, Optional[str]], List[Dict[str, Any]]] = {}
-    for r in resultados:
+    grupos_pool: Dict[Tuple[int, int, int], List[Tuple[int, int, int, int]]] = {}
+    for c in resultados:
         dedup_ignore_eq = False
         if not emp_present and not eq_present:
             dedup_ignore_eq = True
@@ -839,44 +1032,35 @@ def gestionar_busqueda_disponibilidad(
         else:
             # Solo empleado: ignorar equipo para aplicar política y devolver un único slot
             dedup_ignore_eq = True
-        k = (
-            r["inicio_slot"].isoformat(),
-            r["fin_slot"].isoformat(),
-            None if dedup_ignore_eq else r.get("equipo_id_asignado"),
-        )
-        grupos.setdefault(k, []).append(r)
+        grupos_pool.setdefault((c[0], c[1], _SIN_EQUIPO if dedup_ignore_eq else c[3]), []).append(c)
 
-    seleccionados: List[Dict[str, Any]] = []
-    for (ini_iso, fin_iso, eq_id), lst in grupos.items():
+    seleccionados_pool: List[Tuple[int, int, int, int]] = []
+    for (_, _, eq_key), lst in grupos_pool.items():
         # Medir carga dentro de la ventana base solicitada para la búsqueda
         ventana_base = [inicio_min, fin_min]
 
         mejor = None
         mejor_carga = None
         for cand in lst:
-            eid = cand.get("empleado_id_asignado")
-            carga = _sumar_minutos_interseccion(bloqueos_por_empleado_base.get(eid, []), ventana_base)
+            carga = _carga(cand[2])
             if mejor is None or carga < mejor_carga:
                 mejor = cand
                 mejor_carga = carga
             elif carga == mejor_carga:
                 # Tie-breaker determinista: menor empleado_id lexicográfico
-                if str(eid) < str(mejor.get("empleado_id_asignado")):
+                if str(empleados_ids[cand[2]]) < str(empleados_ids[mejor[2]]):
                     mejor = cand
                     mejor_carga = carga
 
         # Si se está ignorando equipo en la deduplicación, aplicar política para elegir uno
         # entre los candidatos del empleado seleccionado.
-        # Determinar si estamos en modo de ignorar equipo
-        dedup_ignore_eq_local = (eq_id is None)
+        dedup_ignore_eq_local = eq_key == _SIN_EQUIPO
 
         if dedup_ignore_eq_local and servicio.get("equipos_compatibles"):
-            empleado_elegido = mejor.get("empleado_id_asignado")
+            empleado_elegido = mejor[2]
             # Equipos candidatos que generan el mismo slot para ese empleado
             candidatos_eq = [
-                c.get("equipo_id_asignado")
-                for c in lst
-                if c.get("empleado_id_asignado") == empleado_elegido and c.get("equipo_id_asignado") is not None
+                equipos_ids[c[3]] for c in lst if c[2] == empleado_elegido and c[3] != _SIN_EQUIPO
             ]
             candidatos_eq = list(dict.fromkeys(candidatos_eq))  # unique, preserva orden
             if candidatos_eq:
@@ -891,20 +1075,156 @@ def gestionar_busqueda_disponibilidad(
                     ventana_base=ventana_base,
                     escenario=escenario,
                     get_ocupaciones_fn=get_ocupaciones_fn,
+                    bloqueos_por_equipo=bloqueos_por_equipo_base,
+                    tabla_cargas=tabla_equipos,
                 )
                 # Elegir el candidato que corresponde al equipo seleccionado
+                i_elegido = idx_equipo.get(eq_elegido)
                 for c in lst:
-                    if (
-                        c.get("empleado_id_asignado") == empleado_elegido
-                        and c.get("equipo_id_asignado") == eq_elegido
-                    ):
+                    if c[2] == empleado_elegido and c[3] == i_elegido:
                         mejor = c
                         break
 
-        seleccionados.append(mejor)
+        seleccionados_pool.append(mejor)
+
+    return _materializar_slots(base_midnight, seleccionados_pool, empleados_ids, equipos_ids)
+
+
+def _recursos_libres_en_slot(
+    horarios: List[Dict[str, Any]],
+    equipos_por_empleado: Dict[str, List[str]],
+    *,
+    ini: int,
+    fin: int,
+    trabajo_de: Callable[[Dict[str, Any]], Any],
+    operativo_de: Callable[[str], Any],
+    servicio_windows_abs: List[List[int]],
+    requiere_equipo: bool,
+    bloqueos_por_empleado: Dict[str, List[List[int]]],
+    bloqueos_por_equipo: Dict[str, List[List[int]]],
+    bloqueos_globales: List[List[int]],
+) -> Iterator[Tuple[str, List[str]]]:
+    """Genera `(empleado_id, equipos_libres)` para cada empleado, en el orden de
+    `horarios`, que tiene libre el slot completo `[ini, fin)`.
+
+    - El empleado: trabajo ∩ slot (∩ ventanas del servicio, si se pasan) menos
+      sus bloqueos y los globales debe cubrir el slot.
+    - Con equipos candidatos, además al menos uno libre en su horario operativo
+      menos sus bloqueos; `equipos_libres` los lista en el orden recibido.
+    - Sin equipos: se omite al empleado si el servicio requiere equipo; si no,
+      se genera con `equipos_libres` vacío.
+
+    No valida la ventana de inicio (regla 1); eso queda a cargo del llamador.
+    """
+    slot = [[ini, fin]]
+    for h in horarios:
+        empleado_id = h["empleado_id"]
+        equipos = equipos_por_empleado.get(empleado_id) or []
+        if not equipos and requiere_equipo:
+            continue
+        requeridos = [trabajo_de(h), slot]
+        if servicio_windows_abs:
+            requeridos.append(servicio_windows_abs)
+        libres_emp = intersectar_multiples(
+            requeridos, restar=[bloqueos_por_empleado.get(empleado_id, []), bloqueos_globales]
+        )
+        if libres_emp != slot:
+            continue
+        if not equipos:
+            yield empleado_id, []
+            continue
+        equipos_libres = [
+            eq
+            for eq in equipos
+            if intersectar_multiples([libres_emp, operativo_de(eq)], restar=[bloqueos_por_equipo.get(eq, [])]) == slot
+        ]
+        if equipos_libres:
+            yield empleado_id, equipos_libres
+
+
+def validar_slot_reservable(
+    solicitud: Any,
+    servicio: Dict[str, Any],
+    escenario: Optional[Dict[str, Any]],
+    *,
+    get_horarios_empleados_fn: Optional[Callable[..., List[Dict[str, Any]]]] = None,
+    get_ocupaciones_fn: Optional[Callable[[List[str], Any, Any], List[Dict[str, Any]]]] = None,
+) -> bool:
+    """¿Es reservable exactamente este slot (empleado, equipo, inicio, fin)?
+
+    Camino rápido de validación para la creación de reservas: evalúa solo las
+    ventanas y bloqueos de los recursos nombrados en el instante del slot, en
+    lugar de ejecutar una búsqueda completa y recorrer sus resultados. Su costo
+    no depende del tamaño del pool.
+
+    Misma semántica que buscar en la ventana `[inicio_slot, fin_slot)` con los
+    filtros de la solicitud y exigir coincidencia exacta:
+    - El inicio del servicio (`inicio + buffer_previo`) cae en base ∩ negocio ∩ servicio.
+    - El slot completo está libre en trabajo ∩ equipo (∩ servicio en full_slot)
+      menos los bloqueos del empleado, del equipo y globales.
+    - Sin `equipo_id`: basta con uno de los equipos compatibles del empleado; si
+      el servicio no requiere equipo, se valida solo al empleado.
+    - Sin `empleado_id`: basta con un empleado elegible.
+    """
+    svc_compatibles = servicio.get("equipos_compatibles", []) or []
+    equipo_id = getattr(solicitud, "equipo_id", None)
+    if equipo_id and svc_compatibles and equipo_id not in svc_compatibles:
+        raise ValueError("Equipo no compatible para el servicio")
+
+    inicio_dt = pendulum.instance(solicitud.inicio_slot).in_timezone("UTC")
+    fin_dt = pendulum.instance(solicitud.fin_slot).in_timezone("UTC")
+    base_midnight = inicio_dt.start_of("day")
+    origen_epoch = minutos_epoch(base_midnight)
+    inicio_min = minutos_epoch(inicio_dt) - origen_epoch
+    fin_min = minutos_epoch(fin_dt) - origen_epoch
+    buffer_previo = int(servicio.get("buffer_previo", 0))
+    day_offsets = _offsets_de_dias(fin_min)
 
-    seleccionados.sort(key=lambda s: s["inicio_slot"])  # ordenar por inicio
-    return seleccionados
+    horarios = _filtrar_horarios(solicitud, escenario, base_midnight, get_horarios_empleados_fn)
+    if not horarios:
+        return False
+
+    # Regla 1: inicio del servicio dentro de la atención efectiva
+    start_constraint_windows, _, servicio_windows_abs = _ventanas_inicio(
+        escenario, solicitud.servicio_id, day_offsets, inicio_min, fin_min
+    )
+    inicio_servicio = inicio_min + buffer_previo
+    if not any(a <= inicio_servicio < b for a, b in start_constraint_windows):
+        return False
+
+    # Equipos a evaluar por empleado: el solicitado o sus compatibles con el servicio
+    equipos_por_empleado: Dict[str, List[str]] = {
+        h["empleado_id"]: [equipo_id] if equipo_id else obtener_equipos_compatibles_para_empleado(servicio, h)
+        for h in horarios
+    }
+    bloqueos_emp, bloqueos_eq, bloqueos_glob = build_total_blockings(
+        base_midnight=base_midnight,
+        inicio_dt=inicio_dt,
+        fin_dt=fin_dt,
+        escenario=escenario,
+        empleados_ids=list(equipos_por_empleado),
+        equipo_id=None,
+        servicio_id=solicitud.servicio_id,
+        get_ocupaciones_fn=get_ocupaciones_fn,
+        equipo_ids=list(dict.fromkeys(eq for eqs in equipos_por_empleado.values() for eq in eqs)),
+    )
+
+    policy_value = getattr(solicitud.service_window_policy, "value", solicitud.service_window_policy)
+    fecha_base = base_midnight.date()
+    libres = _recursos_libres_en_slot(
+        horarios,
+        equipos_por_empleado,
+        ini=inicio_min,
+        fin=fin_min,
+        trabajo_de=lambda h: _intervalos_trabajo(h, fecha_base, day_offsets),
+        operativo_de=lambda eq: _operativo_equipo(escenario, eq, day_offsets, inicio_min, fin_min),
+        servicio_windows_abs=servicio_windows_abs if policy_value == "full_slot" else [],
+        requiere_equipo=bool(svc_compatibles),
+        bloqueos_por_empleado=bloqueos_emp,
+        bloqueos_por_equipo=bloqueos_eq,
+        bloqueos_globales=bloqueos_glob,
+    )
+    return next(libres, None) is not None
 
 
 def gestionar_creacion_reserva(
@@ -918,8 +1238,8 @@ def gestionar_creacion_reserva(
     Gerente de creación de reservas con doble chequeo anti-colisión.
 
     - Valida rango y coherencia con el servicio.
-    - Reusa el gerente de disponibilidad para confirmar el slot.
-    - Revalida contra memoria simulada y crea la reserva.
+    - Confirma el slot con `validar_slot_reservable` (solo los recursos nombrados).
+    - Revalida contra memoria simulada y crea la reserva (chequeo bajo candado).
     """
     logging.info(
         "Gerente(creación): servicio=%s, empleado=%s, equipo=%s, inicio=%s, fin=%s, escenario=%s",
@@ -954,21 +1274,6 @@ def gestionar_creacion_reserva(
     if delta_min != duracion_total_slot:
         raise ValueError("Rango del slot no coincide con duración+buffers del servicio")
 
-    # Construir solicitud mínima de disponibilidad centrada en el slot,
-    # derivada únicamente por filtros presentes (sin search_mode).
-    emp_for_check = getattr(solicitud, "empleado_id", None)
-    eq_for_check = getattr(solicitud, "equipo_id", None)
-
-    solicitud_disp = {
-        "servicio_id": solicitud.servicio_id,
-        "empleado_id": emp_for_check,
-        "equipo_id": eq_for_check,
-        "scenario_id": getattr(solicitud, "scenario_id", None),
-        "fecha_inicio_utc": solicitud.inicio_slot,
-        "fecha_fin_utc": solicitud.fin_slot,
-        "service_window_policy": getattr(solicitud, "service_window_policy", "start_only"),
-    }
-
     # Chequeo de conflicto primero: si existe, retornar 409 desde la API
     if mock_state.has_conflict(
         empleado_id=solicitud.empleado_id,
@@ -980,33 +1285,14 @@ def gestionar_creacion_reserva(
         raise ValueError("Conflicto: el slot ya no está disponible")
 
     # Si no hay conflicto, confirmar que el slot solicitado sigue siendo válido
-    slots_libres = gestionar_busqueda_disponibilidad(
-        solicitud=type("_S", (), solicitud_disp)(),
-        get_servicio_fn=get_servicio_fn,
+    # evaluando solo los recursos nombrados (camino rápido, sin búsqueda completa)
+    if not validar_slot_reservable(
+        solicitud,
+        svc,
+        escenario,
         get_horarios_empleados_fn=get_horarios_empleados_fn,
         get_ocupaciones_fn=get_ocupaciones_fn,
-    )
-
-    # Coincidencia exacta del slot solicitado
-    def _match(slot: Dict[str, Any]) -> bool:
-        # Comparación robusta de tiempos (normalizar a UTC y tipo pendulum)
-        s_ini = pendulum.instance(slot.get("inicio_slot")).in_timezone("UTC")
-        s_fin = pendulum.instance(slot.get("fin_slot")).in_timezone("UTC")
-        rq_ini = pendulum.instance(solicitud.inicio_slot).in_timezone("UTC")
-        rq_fin = pendulum.instance(solicitud.fin_slot).in_timezone("UTC")
-        if s_ini != rq_ini:
-            return False
-        if s_fin != rq_fin:
-            return False
-        # En presencia de filtros, exigir coincidencias específicas.
-        if getattr(solicitud, "empleado_id", None) and slot.get("empleado_id_asignado") != solicitud.empleado_id:
-            return False
-        if getattr(solicitud, "equipo_id", None) and slot.get("equipo_id_asignado") != solicitud.equipo_id:
-            return False
-        return True
-
-    candidato = next((s for s in slots_libres if _match(s)), None)
-    if not candidato:
+    ):
         # Re-chequeo inmediato: si ahora hay conflicto en memoria, mapear a 409
         if mock_state.has_conflict(
             empleado_id=solicitud.empleado_id,
@@ -1039,137 +1325,467 @@ def gestionar_creacion_reserva(
     }
 
 
-def gestionar_creacion_bloqueo(solicitud_bloqueo: Dict[str, Any]) -> Dict[str, Any]:
-    """Registrar bloqueo operativo y aplicar cascada de resolución.
+async def _precargar_datos(
+    solicitud: Any,
+    escenario: Optional[Dict[str, Any]],
+    proveedor: ProveedorDatos,
+    *,
+    inicio_dt,
+    fin_dt,
+) -> Dict[str, Callable[..., Any]]:
+    """Pide al proveedor, en paralelo, lo que el gerente síncrono va a consultar.
+
+    - Servicio, horarios y (si el empleado viene nombrado) sus ocupaciones se
+      lanzan juntos con `asyncio.gather`; sin empleado nombrado, las ocupaciones
+      dependen de los horarios y se piden en cuanto estos llegan.
+    - Solo se pide lo que el escenario no define.
+    - Las ocupaciones pasan por un `LoteOcupaciones` de la solicitud, así que
+      las consultas repetidas del motor (p. ej. `least_loaded`) no vuelven al origen.
+
+    Retorna las dependencias síncronas (`get_servicio_fn`, `get_horarios_empleados_fn`,
+    `get_ocupaciones_fn`) servidas desde lo precargado.
+    """
+    base_midnight = inicio_dt.start_of("day")
+    servicio_id = solicitud.servicio_id
+    empleado_id = getattr(solicitud, "empleado_id", None)
+    lote = LoteOcupaciones(proveedor.get_ocupaciones)
 
-    - Persiste en memoria el bloqueo.
-    - Detecta reservas que se solapan temporalmente y aplican al alcance.
-    - Intenta reasignar manteniendo el mismo slot exacto; si no se puede, marca PENDIENTE_REAGENDA.
+    async def _nada() -> None:
+        return None
+
+    pedir_servicio = not (escenario and "servicios" in escenario and servicio_id in escenario["servicios"])
+    pedir_horarios = not (escenario and "empleados" in escenario)
+    pedir_ocupaciones = not (escenario and isinstance(escenario.get("ocupaciones"), list))
+    servicio, horarios, _ = await asyncio.gather(
+        proveedor.get_servicio(servicio_id) if pedir_servicio else _nada(),
+        proveedor.get_horarios_empleados(
+            base_midnight, servicio_id=servicio_id, equipo_id=getattr(solicitud, "equipo_id", None)
+        )
+        if pedir_horarios
+        else _nada(),
+        lote.obtener([empleado_id], inicio_dt, fin_dt) if pedir_ocupaciones and empleado_id else _nada(),
+    )
+
+    def get_horarios_empleados_fn(*_args: Any, **_kwargs: Any) -> List[Dict[str, Any]]:
+        return horarios
+
+    if pedir_ocupaciones and not empleado_id:
+        candidatos = _filtrar_horarios(solicitud, escenario, base_midnight, get_horarios_empleados_fn)
+        if candidatos:
+            await lote.obtener([h["empleado_id"] for h in candidatos], inicio_dt, fin_dt)
+    return {
+        "get_servicio_fn": lambda _servicio_id: servicio,
+        "get_horarios_empleados_fn": get_horarios_empleados_fn,
+        "get_ocupaciones_fn": lote.como_funcion(),
+    }
+
+
+async def gestionar_busqueda_disponibilidad_async(
+    solicitud: Any,
+    *,
+    proveedor: Optional[ProveedorDatos] = None,
+    excluir_empleado_id: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """`gestionar_busqueda_disponibilidad` con los datos de dominio de un `ProveedorDatos`.
+
+    Las consultas al proveedor se hacen concurrentes (`_precargar_datos`); el
+    cálculo es el del gerente síncrono. Sin proveedor, usa `mock_db`.
     """
-    bloqueo = mock_state.add_bloqueo(solicitud_bloqueo)
-    bi = bloqueo.get("inicio_utc")
-    bf = bloqueo.get("fin_utc")
-    scope = str(bloqueo.get("scope", "")).lower()
-    emp_ids = set(bloqueo.get("empleado_ids", []) or [])
-    eq_ids = set(bloqueo.get("equipo_ids", []) or [])
-    svc_ids = set(bloqueo.get("servicio_ids", []) or [])
+    if solicitud.fecha_fin_utc <= solicitud.fecha_inicio_utc:
+        return gestionar_busqueda_disponibilidad(solicitud, excluir_empleado_id=excluir_empleado_id)
+    escenario = load_scenario(solicitud.scenario_id) if getattr(solicitud, "scenario_id", None) else None
+    dependencias = await _precargar_datos(
+        solicitud,
+        escenario,
+        proveedor or ProveedorSincrono(),
+        inicio_dt=pendulum.instance(solicitud.fecha_inicio_utc).in_timezone("UTC"),
+        fin_dt=pendulum.instance(solicitud.fecha_fin_utc).in_timezone("UTC"),
+    )
+    return gestionar_busqueda_disponibilidad(solicitud, excluir_empleado_id=excluir_empleado_id, **dependencias)
 
-    procesadas: List[Dict[str, Any]] = []
 
-    for r in list(mock_state.list_reservas()):
-        # Intersección temporal
-        if not (r.inicio_slot < bf and r.fin_slot > bi):
+async def gestionar_creacion_reserva_async(
+    solicitud: Any,
+    *,
+    proveedor: Optional[ProveedorDatos] = None,
+) -> Dict[str, Any]:
+    """`gestionar_creacion_reserva` con los datos de dominio de un `ProveedorDatos`.
+
+    El empleado viene nombrado, así que servicio, horarios y ocupaciones se
+    piden al proveedor a la vez. Sin proveedor, usa `mock_db`.
+    """
+    if solicitud.fin_slot <= solicitud.inicio_slot:
+        return gestionar_creacion_reserva(solicitud)
+    escenario = load_scenario(getattr(solicitud, "scenario_id", None)) if getattr(solicitud, "scenario_id", None) else None
+    dependencias = await _precargar_datos(
+        solicitud,
+        escenario,
+        proveedor or ProveedorSincrono(),
+        inicio_dt=pendulum.instance(solicitud.inicio_slot).in_timezone("UTC"),
+        fin_dt=pendulum.instance(solicitud.fin_slot).in_timezone("UTC"),
+    )
+    return gestionar_creacion_reserva(solicitud, **dependencias)
+
+
+def _bloqueo_aplica(scope: str, bloqueo: Dict[str, Any], r: Any) -> bool:
+    """¿El alcance del bloqueo cubre a la reserva? (el solape temporal se evalúa aparte)."""
+    if scope == "business":
+        return True
+    if scope == "employee":
+        ids = bloqueo.get("empleado_ids", []) or []
+        return (not ids) or r.empleado_id in ids
+    if scope == "equipment":
+        ids = bloqueo.get("equipo_ids", []) or []
+        return (not ids) or bool(r.equipo_id and r.equipo_id in ids)
+    if scope == "service":
+        ids = bloqueo.get("servicio_ids", []) or []
+        return (not ids) or r.servicio_id in ids
+    return False
+
+
+def _instantanea_cascada(escenario, servicio_id: Optional[str], reservas: List[Any], equipo_ids: List[str]):
+    """Instantánea de bloqueos compartida por un grupo de reservas (mismo escenario y servicio).
+
+    Un solo `build_total_blockings` sobre la ventana que cubre todo el grupo, con
+    todos los empleados del servicio y todos los equipos involucrados.
+    """
+    inicio_dt = pendulum.instance(min(r.inicio_slot for r in reservas)).in_timezone("UTC")
+    fin_dt = pendulum.instance(max(r.fin_slot for r in reservas)).in_timezone("UTC")
+    base_midnight = inicio_dt.start_of("day")
+    origen_epoch = minutos_epoch(base_midnight)
+    inicio_min = minutos_epoch(inicio_dt) - origen_epoch
+    fin_min = minutos_epoch(fin_dt) - origen_epoch
+    day_offsets = _offsets_de_dias(fin_min)
+    fecha_base = base_midnight.date()
+
+    consulta = type("_Disp", (), {"servicio_id": servicio_id, "empleado_id": None, "equipo_id": None})()
+    horarios = _filtrar_horarios(consulta, escenario, base_midnight, None)
+    bloqueos_emp, bloqueos_eq, bloqueos_glob = build_total_blockings(
+        base_midnight=base_midnight,
+        inicio_dt=inicio_dt,
+        fin_dt=fin_dt,
+        escenario=escenario,
+        empleados_ids=[h["empleado_id"] for h in horarios],
+        equipo_id=None,
+        servicio_id=servicio_id,
+        equipo_ids=equipo_ids,
+    )
+    start_windows, _, _ = _ventanas_inicio(escenario, servicio_id, day_offsets, inicio_min, fin_min)
+    # Expansiones memoizadas por grupo (el operativo por defecto es la ventana del grupo)
+    trabajo: Dict[str, Any] = {}
+    operativo: Dict[str, Any] = {}
+
+    def trabajo_de(h: Dict[str, Any]) -> Any:
+        if h["empleado_id"] not in trabajo:
+            trabajo[h["empleado_id"]] = _intervalos_trabajo(h, fecha_base, day_offsets)
+        return trabajo[h["empleado_id"]]
+
+    def operativo_de(eq: str) -> Any:
+        if eq not in operativo:
+            operativo[eq] = _operativo_equipo(escenario, eq, day_offsets, inicio_min, fin_min)
+        return operativo[eq]
+
+    return {
+        "base_midnight": base_midnight,
+        "origen_epoch": origen_epoch,
+        "start_windows": start_windows,
+        "bloqueos_emp": bloqueos_emp,
+        "bloqueos_eq": bloqueos_eq,
+        "bloqueos_glob": bloqueos_glob,
+        "trabajo_de": trabajo_de,
+        "operativo_de": operativo_de,
+    }
+
+
+def _reasignacion_directa(r: Any, escenario_r: Optional[Dict[str, Any]], excluidos: set) -> Optional[str]:
+    """Fallback conservador: otro empleado elegible del escenario, fuera de `excluidos`
+    y sin conflicto en memoria."""
+    if not (escenario_r and "empleados" in escenario_r):
+        return None
+    for h in escenario_r["empleados"]:
+        eid = h.get("empleado_id")
+        if not eid or eid == r.empleado_id or eid in excluidos:
             continue
-        # Filtrado por alcance
-        aplica = False
-        if scope == "business":
-            aplica = True
-        elif scope == "employee":
-            aplica = (not emp_ids) or (r.empleado_id in emp_ids)
-        elif scope == "equipment":
-            aplica = (not eq_ids) or (r.equipo_id and r.equipo_id in eq_ids)
-        elif scope == "service":
-            aplica = (not svc_ids) or (r.servicio_id in svc_ids)
-        if not aplica:
+        # Filtrar por servicio asignado cuando se declara
+        servs = h.get("servicios_asignados", []) or []
+        if servs and r.servicio_id not in servs:
             continue
+        # Validar conflicto en memoria (empleado/equipo)
+        if not mock_state.has_conflict(
+            empleado_id=eid,
+            equipo_id=r.equipo_id,
+            inicio_dt=r.inicio_slot,
+            fin_dt=r.fin_slot,
+        ):
+            return eid
+    return None
 
-        # Cascada: negocio -> agenda pendiente directa
-        if scope == "business":
-            mock_state.update_reserva(reserva_id=r.reserva_id, estado="PENDIENTE_REAGENDA")
-            procesadas.append({"reserva_id": r.reserva_id, "estado": "PENDIENTE_REAGENDA"})
-            continue
 
-        # Reasignar mismo slot excluyendo al empleado bloqueado.
-        # Preservar equipo si la reserva lo tiene y no está bloqueado explícitamente.
-        escenario_r = load_scenario(getattr(r, "scenario_id", None)) if getattr(r, "scenario_id", None) else None
-        if escenario_r and "servicios" in escenario_r and r.servicio_id in escenario_r["servicios"]:
-            svc_r = escenario_r["servicios"][r.servicio_id]
+def _mover_en_instantanea(
+    ctx: Dict[str, Any],
+    propio: List[int],
+    desde: Tuple[str, Optional[str]],
+    hacia: Tuple[str, Optional[str]],
+) -> None:
+    """Traslada la ocupación `propio` de una reserva entre (empleado, equipo) en la instantánea."""
+    bloqueos_emp, bloqueos_eq = ctx["bloqueos_emp"], ctx["bloqueos_eq"]
+    if desde[0] != hacia[0]:
+        if propio in bloqueos_emp.get(desde[0], []):
+            bloqueos_emp[desde[0]].remove(propio)
+        bloqueos_emp.setdefault(hacia[0], []).append(propio)
+    if desde[1] != hacia[1]:
+        if desde[1] and propio in bloqueos_eq.get(desde[1], []):
+            bloqueos_eq[desde[1]].remove(propio)
+        if hacia[1]:
+            bloqueos_eq.setdefault(hacia[1], []).append(propio)
+
+
+def _mover_en_instantaneas(
+    contextos: Iterable[Dict[str, Any]],
+    r: Any,
+    desde: Tuple[str, Optional[str]],
+    hacia: Tuple[str, Optional[str]],
+) -> None:
+    """Traslada la ocupación de `r` en todas las instantáneas de la cascada.
+
+    Los grupos (escenario, servicio) comparten empleados y equipos: una
+    reasignación decidida en un grupo consume capacidad también en los demás.
+    Cada instantánea tiene su propio origen del eje.
+    """
+    for ctx in contextos:
+        _mover_en_instantanea(ctx, rango_en_eje(ctx["origen_epoch"], r.inicio_slot, r.fin_slot), desde, hacia)
+
+
+def _decidir_reasignacion(
+    r: Any,
+    ctx: Dict[str, Any],
+    propio: List[int],
+    scope: str,
+    eq_bloqueados: set,
+    emp_bloqueados: set,
+) -> Tuple[str, Optional[str], Optional[str]]:
+    """Decide el destino de una reserva afectada sobre la instantánea del grupo.
+
+    Retorna `(estado, empleado_id, equipo_id)`: REASIGNADA con el nuevo empleado
+    (y equipo, o None para conservar el actual) o PENDIENTE_REAGENDA.
+    """
+    escenario_r, svc_r = ctx["escenario"], ctx["servicio"]
+    ini, fin = propio
+    bloqueos_eq = ctx["bloqueos_eq"]
+    # La reserva que se mueve no compite consigo misma por su equipo
+    if r.equipo_id and propio in bloqueos_eq.get(r.equipo_id, []):
+        sin_propio = list(bloqueos_eq[r.equipo_id])
+        sin_propio.remove(propio)
+        bloqueos_eq = {**bloqueos_eq, r.equipo_id: sin_propio}
+
+    # Reasignar mismo slot excluyendo al empleado bloqueado.
+    # Preservar equipo si la reserva lo tiene y no está bloqueado explícitamente.
+    equipo_req = r.equipo_id if (r.equipo_id and (scope != "equipment" or r.equipo_id not in eq_bloqueados)) else None
+    consulta = type("_Disp", (), {"servicio_id": r.servicio_id, "empleado_id": None, "equipo_id": equipo_req})()
+    horarios = sorted(
+        (
+            h
+            for h in _filtrar_horarios(consulta, escenario_r, ctx["base_midnight"], None)
+            if h.get("empleado_id") != r.empleado_id
+        ),
+        key=lambda h: str(h["empleado_id"]),
+    )
+
+    inicio_servicio = ini + int(svc_r.get("buffer_previo", 0))
+    if horarios and any(a <= inicio_servicio < b for a, b in ctx["start_windows"]):
+        libre = next(
+            _recursos_libres_en_slot(
+                horarios,
+                {
+                    h["empleado_id"]: [equipo_req] if equipo_req else obtener_equipos_compatibles_para_empleado(svc_r, h)
+                    for h in horarios
+                },
+                ini=ini,
+                fin=fin,
+                trabajo_de=ctx["trabajo_de"],
+                operativo_de=ctx["operativo_de"],
+                servicio_windows_abs=[],
+                requiere_equipo=bool(svc_r.get("equipos_compatibles")),
+                bloqueos_por_empleado=ctx["bloqueos_emp"],
+                bloqueos_por_equipo=bloqueos_eq,
+                bloqueos_globales=ctx["bloqueos_glob"],
+            ),
+            None,
+        )
+        if libre:
+            empleado_id, equipos_libres = libre
+            equipo_elegido = None
+            if equipos_libres:
+                # Política medida sobre el día del slot (el eje de la instantánea puede empezar antes)
+                desfase = (ini // 1440) * 1440
+                equipo_elegido = seleccionar_equipo_por_politica(
+                    equipos_libres,
+                    svc_r,
+                    r.servicio_id,
+                    [empleado_id],
+                    base_midnight=ctx["base_midnight"].add(minutes=desfase),
+                    inicio_dt=r.inicio_slot,
+                    fin_dt=r.fin_slot,
+                    ventana_base=[ini - desfase, fin - desfase],
+                    escenario=escenario_r,
+                    bloqueos_por_equipo={
+                        eq: [[s - desfase, e - desfase] for s, e in bloqueos_eq.get(eq, [])] for eq in equipos_libres
+                    },
+                )
+            return "REASIGNADA", empleado_id, equipo_elegido
+
+    nuevo_emp = _reasignacion_directa(r, escenario_r, emp_bloqueados)
+    if nuevo_emp:
+        return "REASIGNADA", nuevo_emp, None
+    return "PENDIENTE_REAGENDA", None, None
+
+
+def planificar_cascada_bloqueo(bloqueo: Dict[str, Any]) -> Dict[str, Any]:
+    """Resuelve en lote las reservas afectadas por un bloqueo ya persistido.
+
+    Fases (con su duración en `tiempos_ms`):
+    1. recoleccion: reservas que se solapan con el bloqueo y caen en su alcance.
+    2. instantanea: un `build_total_blockings` por (escenario, servicio) que cubre
+       a todo el grupo, en lugar de una búsqueda completa por reserva.
+    3. resolucion: para cada reserva, en orden, el mismo slot con otro empleado
+       (el primero por id con el slot libre, como el balanceo del Gerente) y el
+       equipo preservado o elegido por política. Cada reasignación se descuenta
+       de todas las instantáneas (los grupos comparten empleados y equipos), así
+       que consume capacidad para las siguientes, de cualquier servicio.
+    4. aplicacion: escritura de cada decisión en el estado en memoria, con
+       control optimista (`expected_version`). Si otra escritura modificó la
+       reserva durante la planificación, se re-evalúa con su estado vigente
+       (hasta `MAX_REINTENTOS_CASCADA` reintentos).
+
+    Con scope "business" todas las reservas pasan directo a PENDIENTE_REAGENDA.
+    Retorna `{"procesadas": [...], "tiempos_ms": {...}}`.
+    """
+    tiempos: Dict[str, float] = {"recoleccion": 0.0, "instantanea": 0.0, "resolucion": 0.0, "aplicacion": 0.0}
+    t_total = t0 = time.perf_counter()
+
+    def _medir(fase: str) -> None:
+        nonlocal t0
+        ahora = time.perf_counter()
+        tiempos[fase] += (ahora - t0) * 1000.0
+        t0 = ahora
+
+    scope = str(bloqueo.get("scope", "")).lower()
+    eq_bloqueados = set(bloqueo.get("equipo_ids", []) or [])
+    # Empleados nombrados por el propio bloqueo: nunca son destino de una reasignación
+    emp_bloqueados = set(bloqueo.get("empleado_ids", []) or []) if scope == "employee" else set()
+    afectadas = [
+        r
+        for r in mock_state.get_reservas_en_rango(bloqueo.get("inicio_utc"), bloqueo.get("fin_utc"))
+        if _bloqueo_aplica(scope, bloqueo, r)
+    ]
+
+    # Agrupar por (escenario, servicio): una instantánea por grupo
+    grupos: Dict[Tuple[Optional[str], str], List[Any]] = {}
+    if scope != "business":
+        for r in afectadas:
+            grupos.setdefault((getattr(r, "scenario_id", None), r.servicio_id), []).append(r)
+    _medir("recoleccion")
+
+    contextos: Dict[Tuple[Optional[str], str], Dict[str, Any]] = {}
+    for (scenario_id, servicio_id), reservas in grupos.items():
+        escenario_r = load_scenario(scenario_id) if scenario_id else None
+        if escenario_r and "servicios" in escenario_r and servicio_id in escenario_r["servicios"]:
+            svc_r = escenario_r["servicios"][servicio_id]
         else:
-            svc_r = default_get_servicio(r.servicio_id)
-        equipo_req = r.equipo_id if (r.equipo_id and (scope != "equipment" or r.equipo_id not in eq_ids)) else None
-
-        disp_req = type("_Disp", (), {
-            "servicio_id": r.servicio_id,
-            "empleado_id": None,
-            "equipo_id": equipo_req,
-            "scenario_id": getattr(r, "scenario_id", None),
-            "fecha_inicio_utc": r.inicio_slot,
-            "fecha_fin_utc": r.fin_slot,
-            "service_window_policy": "start_only",
-        })()
-
-        try:
-            candidatos = gestionar_busqueda_disponibilidad(
-                solicitud=disp_req,
-                excluir_empleado_id=r.empleado_id,
-            )
-        except Exception:
-            candidatos = []
-
-        elegido = None
-        for c in candidatos:
-            c_ini = pendulum.instance(c.get("inicio_slot")).in_timezone("UTC")
-            c_fin = pendulum.instance(c.get("fin_slot")).in_timezone("UTC")
-            r_ini = pendulum.instance(r.inicio_slot).in_timezone("UTC")
-            r_fin = pendulum.instance(r.fin_slot).in_timezone("UTC")
-            if (
-                c_ini == r_ini
-                and c_fin == r_fin
-                and c.get("empleado_id_asignado") != r.empleado_id
-            ):
-                elegido = c
+            svc_r = default_get_servicio(servicio_id)
+        equipo_ids = list(
+            dict.fromkeys(list(svc_r.get("equipos_compatibles", []) or []) + [r.equipo_id for r in reservas if r.equipo_id])
+        )
+        ctx = _instantanea_cascada(escenario_r, servicio_id, reservas, equipo_ids)
+        ctx.update(escenario=escenario_r, servicio=svc_r)
+        contextos[(scenario_id, servicio_id)] = ctx
+    _medir("instantanea")
+
+    bi, bf = bloqueo.get("inicio_utc"), bloqueo.get("fin_utc")
+    procesadas: List[Dict[str, Any]] = []
+    for r in afectadas:
+        ctx = contextos.get((getattr(r, "scenario_id", None), r.servicio_id))
+        propio = rango_en_eje(ctx["origen_epoch"], r.inicio_slot, r.fin_slot) if ctx else None
+        # Empleado y equipo con los que la instantánea tiene registrada a la reserva
+        ubicacion = (r.empleado_id, r.equipo_id)
+        resultado: Optional[Dict[str, Any]] = None
+        for intento in range(MAX_REINTENTOS_CASCADA + 1):
+            # La planificación ocurre sin candados; solo la escritura final se
+            # serializa y exige que la versión leída siga vigente (CAS).
+            version = r.version
+            if intento and not (r.inicio_slot < bf and r.fin_slot > bi and _bloqueo_aplica(scope, bloqueo, r)):
+                # Otra escritura ya sacó a la reserva del alcance del bloqueo
                 break
+            if ctx:
+                _mover_en_instantaneas(contextos.values(), r, ubicacion, (r.empleado_id, r.equipo_id))
+                ubicacion = (r.empleado_id, r.equipo_id)
 
-        if elegido:
-            updated = mock_state.update_reserva(
-                reserva_id=r.reserva_id,
-                empleado_id=elegido.get("empleado_id_asignado"),
-                equipo_id=elegido.get("equipo_id_asignado"),
-                estado="REASIGNADA",
-            )
-            procesadas.append({
-                "reserva_id": r.reserva_id,
-                "estado": "REASIGNADA",
-                "empleado_id": updated.empleado_id if updated else None,
-                "equipo_id": updated.equipo_id if updated else None,
-            })
-        else:
-            # Fallback conservador: intentar reasignación directa a otro empleado
-            # elegible del escenario que no esté bloqueado ni en conflicto en memoria.
-            nuevo_emp: Optional[str] = None
-            if escenario_r and "empleados" in escenario_r:
-                for h in escenario_r["empleados"]:
-                    eid = h.get("empleado_id")
-                    if not eid or eid == r.empleado_id:
-                        continue
-                    # Filtrar por servicio asignado cuando se declara
-                    servs = h.get("servicios_asignados", []) or []
-                    if servs and r.servicio_id not in servs:
-                        continue
-                    # Validar conflicto en memoria (empleado/equipo)
-                    if not mock_state.has_conflict(
-                        empleado_id=eid,
-                        equipo_id=r.equipo_id,
-                        inicio_dt=r.inicio_slot,
-                        fin_dt=r.fin_slot,
-                    ):
-                        nuevo_emp = eid
-                        break
+            if scope == "business":
+                # Cascada: negocio -> agenda pendiente directa
+                estado, empleado_id, equipo_id = "PENDIENTE_REAGENDA", None, None
+            else:
+                estado, empleado_id, equipo_id = _decidir_reasignacion(
+                    r, ctx, propio, scope, eq_bloqueados, emp_bloqueados
+                )
+            _medir("resolucion")
 
-            if nuevo_emp:
+            try:
                 updated = mock_state.update_reserva(
                     reserva_id=r.reserva_id,
-                    empleado_id=nuevo_emp,
-                    estado="REASIGNADA",
+                    empleado_id=empleado_id,
+                    equipo_id=equipo_id,
+                    estado=estado,
+                    expected_version=version,
                 )
-                procesadas.append({
+            except mock_state.ConflictoVersion:
+                # Releer: las vistas en memoria ya reflejan el cambio, las
+                # instantáneas de un repositorio externo no
+                r = mock_state.get_reserva(r.reserva_id) or r
+                _medir("aplicacion")
+                continue
+            if updated is not None:
+                r = updated
+            if estado == "REASIGNADA":
+                resultado = {
                     "reserva_id": r.reserva_id,
-                    "estado": "REASIGNADA",
-                    "empleado_id": updated.empleado_id if updated else nuevo_emp,
-                    "equipo_id": updated.equipo_id if updated else r.equipo_id,
-                })
+                    "estado": estado,
+                    "empleado_id": updated.empleado_id if updated else empleado_id,
+                    "equipo_id": updated.equipo_id if updated else equipo_id,
+                }
             else:
-                mock_state.update_reserva(reserva_id=r.reserva_id, estado="PENDIENTE_REAGENDA")
-                procesadas.append({"reserva_id": r.reserva_id, "estado": "PENDIENTE_REAGENDA"})
+                resultado = {"reserva_id": r.reserva_id, "estado": estado}
+            _medir("aplicacion")
+            break
+        else:
+            logging.warning(
+                "Cascada: reserva %s sin resolver tras %d conflictos de versión", r.reserva_id, MAX_REINTENTOS_CASCADA + 1
+            )
+
+        if resultado:
+            procesadas.append(resultado)
+        # La reserva (actualizada) ocupa ahora su empleado y equipo finales, en todos los grupos
+        if ctx:
+            _mover_en_instantaneas(contextos.values(), r, ubicacion, (r.empleado_id, r.equipo_id))
+    tiempos["total"] = (time.perf_counter() - t_total) * 1000.0
+    return {"procesadas": procesadas, "tiempos_ms": {k: round(v, 3) for k, v in tiempos.items()}}
+
 
-    return {"bloqueo_id": bloqueo.get("id"), "procesadas": procesadas}
+def gestionar_creacion_bloqueo(solicitud_bloqueo: Dict[str, Any]) -> Dict[str, Any]:
+    """Registrar bloqueo operativo y aplicar cascada de resolución.
+
+    - Persiste en memoria el bloqueo.
+    - Detecta reservas que se solapan temporalmente y aplican al alcance.
+    - Intenta reasignar manteniendo el mismo slot exacto; si no se puede, marca PENDIENTE_REAGENDA.
+
+    La cascada se resuelve en lote con `planificar_cascada_bloqueo`; el reporte de
+    tiempos por fase se incluye en `tiempos_ms`.
+    """
+    bloqueo = mock_state.add_bloqueo(solicitud_bloqueo)
+    plan = planificar_cascada_bloqueo(bloqueo)
+    logging.info(
+        "Cascada bloqueo %s: %d reservas procesadas, tiempos_ms=%s",
+        bloqueo.get("id"),
+        len(plan["procesadas"]),
+        plan["tiempos_ms"],
+    )
+    return {"bloqueo_id": bloqueo.get("id"), "procesadas": plan["procesadas"], "tiempos_ms": plan["tiempos_ms"]}
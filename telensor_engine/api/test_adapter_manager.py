@@ -64,3 +64,46 @@ def test_manager_start_only_allows_end_past_service_window():
     assert len(slots_manager) >= 1
     service_end = _iso_to_dt("2025-11-06T11:00:00Z")
     assert any(slot["fin_slot"] > service_end for slot in slots_manager)
+
+
+def test_manager_resuelve_bloqueos_en_un_solo_barrido(monkeypatch):
+    """Pool con varios equipos: una sola agregación de bloqueos por solicitud."""
+    import pendulum
+
+    from telensor_engine.api import adapter
+    from telensor_engine.fixtures import load_scenario
+
+    llamadas = []
+    original = adapter.build_total_blockings
+
+    def contar(**kwargs):
+        llamadas.append(kwargs)
+        return original(**kwargs)
+
+    monkeypatch.setattr(adapter, "build_total_blockings", contar)
+    solicitud = SolicitudDisponibilidad(
+        servicio_id="SVC2",
+        scenario_id="baseline",
+        fecha_inicio_utc=_iso_to_dt("2025-11-06T06:00:00Z"),
+        fecha_fin_utc=_iso_to_dt("2025-11-06T14:00:00Z"),
+    )
+    slots = gestionar_busqueda_disponibilidad(solicitud)
+    assert slots
+    assert len(llamadas) == 1
+
+    # La instantánea multi-equipo coincide con resolver cada equipo por separado
+    escenario = load_scenario("baseline")
+    inicio = pendulum.datetime(2025, 11, 6, 6, tz="UTC")
+    comun = dict(
+        base_midnight=inicio.start_of("day"),
+        inicio_dt=inicio,
+        fin_dt=inicio.add(hours=8),
+        escenario=escenario,
+        empleados_ids=["E1", "E2"],
+        servicio_id="SVC2",
+    )
+    emp, por_equipo, glob = original(equipo_id=None, equipo_ids=["EQ1", "EQ2"], **comun)
+    for eq in ("EQ1", "EQ2"):
+        emp_1, por_equipo_1, glob_1 = original(equipo_id=eq, **comun)
+        assert por_equipo[eq] == por_equipo_1[eq]
+        assert emp == emp_1 and glob == glob_1
@@ -1,7 +1,12 @@
+import copy
+import json
+import os
 from datetime import timedelta
 
+import pytest
 from fastapi.testclient import TestClient
 
+from telensor_engine.fixtures import _RegistroEscenarios, load_scenario
 from telensor_engine.main import app
 
 
@@ -84,3 +89,32 @@ def test_fixture_night_shift_cross_midnight():
     assert resp.status_code == 200
     slots = resp.json()["horarios_disponibles"]
     assert len(slots) >= 1
+
+
+def test_registro_escenarios_cachea_y_recarga_por_cambio(tmp_path):
+    # El registro global devuelve la misma vista sin volver a parsear
+    assert load_scenario("baseline") is load_scenario("baseline")
+    assert load_scenario("no_existe") is None
+
+    ruta = tmp_path / "scenarios.json"
+    ruta.write_text(json.dumps({"scenarios": {"s1": {"empleados": [{"empleado_id": "E1"}]}}}), encoding="utf-8")
+    registro = _RegistroEscenarios(ruta)
+    vista = registro.obtener("s1")
+    assert registro.obtener("s1") is vista
+
+    # Vistas de solo lectura que siguen siendo dict/list
+    assert isinstance(vista, dict) and isinstance(vista["empleados"], list)
+    with pytest.raises(TypeError):
+        vista["empleados"].append({"empleado_id": "E2"})
+    with pytest.raises(TypeError):
+        vista["nuevo"] = 1
+    copia = copy.deepcopy(vista)
+    copia["empleados"].append({"empleado_id": "E2"})
+    assert len(vista["empleados"]) == 1
+
+    # Cambio de contenido (tamaño/mtime) → recarga
+    ruta.write_text(json.dumps({"scenarios": {"s1": {"empleados": []}, "s2": {}}}), encoding="utf-8")
+    st = ruta.stat()
+    os.utime(ruta, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert registro.obtener("s1") == {"empleados": []}
+    assert registro.obtener("s2") == {}
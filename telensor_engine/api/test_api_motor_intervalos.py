@@ -0,0 +1,101 @@
+from fastapi.testclient import TestClient
+
+from telensor_engine.api import adapter
+from telensor_engine.engine.bitmap import MapaMinutos
+from telensor_engine.main import app
+
+
+client = TestClient(app)
+
+
+CASOS = [
+    {"servicio_id": "SVC2", "scenario_id": "baseline"},
+    {"servicio_id": "SVC1", "scenario_id": "baseline", "empleado_id": "E1"},
+    {"servicio_id": "SVC1", "scenario_id": "overlap_heavy", "equipo_id": "EQ1"},
+    {"servicio_id": "SVC_LBG", "scenario_id": "load_balance_demo"},
+    {"servicio_id": "SVC_POOL", "scenario_id": "policy_demo"},
+    {"servicio_id": "SVC1", "scenario_id": "night_shift"},
+]
+
+
+def test_motor_bitmap_produce_los_mismos_slots():
+    """El backend de mapa de bits es intercambiable con el de intervalos."""
+    for caso in CASOS:
+        respuestas = {}
+        for motor in ("intervalos", "bitmap", "auto"):
+            payload = {
+                **caso,
+                "fecha_inicio_utc": "2025-11-06T08:00:00Z",
+                "fecha_fin_utc": "2025-11-06T20:00:00Z",
+                "motor_intervalos": motor,
+            }
+            resp = client.post("/api/v1/disponibilidad", json=payload)
+            assert resp.status_code == 200, resp.text
+            respuestas[motor] = resp.json()["horarios_disponibles"]
+        assert respuestas["bitmap"] == respuestas["intervalos"], caso
+        assert respuestas["auto"] == respuestas["intervalos"], caso
+
+
+def test_pool_sin_equipo_con_bitmap_usa_mapa_de_minutos(monkeypatch):
+    """En pool sin equipos compatibles, "bitmap" opera con `MapaMinutos`, no con el motor por lotes."""
+    construidos = []
+
+    class _MapaEspia(MapaMinutos):
+        @classmethod
+        def desde_intervalos(cls, *args, **kwargs):
+            construidos.append(args[0])
+            return MapaMinutos.desde_intervalos(*args, **kwargs)
+
+    payload = {
+        "servicio_id": "SVC_LBG",
+        "scenario_id": "load_balance_demo",
+        "fecha_inicio_utc": "2025-11-06T08:00:00Z",
+        "fecha_fin_utc": "2025-11-06T20:00:00Z",
+    }
+    esperado = client.post("/api/v1/disponibilidad", json={**payload, "motor_intervalos": "intervalos"}).json()
+
+    def _sin_lotes(*args, **kwargs):
+        raise AssertionError("el motor por lotes no debe usarse con bitmap")
+
+    monkeypatch.setattr(adapter, "MapaMinutos", _MapaEspia)
+    monkeypatch.setattr(adapter, "_inicios_pool_lote", _sin_lotes)
+    resp = client.post("/api/v1/disponibilidad", json={**payload, "motor_intervalos": "bitmap"})
+    assert resp.status_code == 200, resp.text
+    assert resp.json() == esperado
+    assert esperado["horarios_disponibles"] and construidos
+
+
+def test_pool_con_equipos_usa_el_motor_por_lotes_por_par(monkeypatch):
+    """En pool con equipos compatibles, "intervalos" resuelve los pares (empleado, equipo) en un lote."""
+    llamadas = []
+    original = adapter._inicios_pool_lote
+
+    def _espia(*args, **kwargs):
+        llamadas.append(kwargs["equipos_por_empleado"])
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(adapter, "_inicios_pool_lote", _espia)
+    payload = {
+        "servicio_id": "SVC2",
+        "scenario_id": "baseline",
+        "fecha_inicio_utc": "2025-11-06T08:00:00Z",
+        "fecha_fin_utc": "2025-11-06T20:00:00Z",
+        "motor_intervalos": "intervalos",
+    }
+    resp = client.post("/api/v1/disponibilidad", json=payload)
+    assert resp.status_code == 200, resp.text
+    assert len(llamadas) == 1 and llamadas[0]
+    slots = resp.json()["horarios_disponibles"]
+    assert slots and all(s["equipo_id_asignado"] for s in slots)
+
+
+def test_motor_desconocido_rechazado():
+    payload = {
+        "servicio_id": "SVC2",
+        "scenario_id": "baseline",
+        "fecha_inicio_utc": "2025-11-06T08:00:00Z",
+        "fecha_fin_utc": "2025-11-06T20:00:00Z",
+        "motor_intervalos": "gpu",
+    }
+    resp = client.post("/api/v1/disponibilidad", json=payload)
+    assert resp.status_code == 422
@@ -174,3 +174,37 @@ def test_night_shift_service_full_slot_limits_end_before_02_30_and_crosses_midni
     # Validar que ningún slot termine después de las 02:30 bajo full_slot
     end_limit = _iso_to_dt("2025-11-07T02:30:00Z")
     assert all(_iso_to_dt(sl["fin_slot"]) <= end_limit for sl in slots)
+
+
+def test_multi_day_horizon_covers_every_day():
+    # baseline SVC2 en pool: un único request de 3 días devuelve slots en los 3 días
+    payload = {
+        "servicio_id": "SVC2",
+        "scenario_id": "baseline",
+        "fecha_inicio_utc": "2025-11-06T00:00:00Z",
+        "fecha_fin_utc": "2025-11-09T00:00:00Z",
+    }
+    resp = client.post("/api/v1/disponibilidad", json=payload)
+    assert resp.status_code == 200
+    dias = {_iso_to_dt(s["inicio_slot"]).date().isoformat() for s in resp.json()["horarios_disponibles"]}
+    assert dias == {"2025-11-06", "2025-11-07", "2025-11-08"}
+
+    # El día 3 produce los mismos horarios que una búsqueda de ese día aislado
+    payload_dia3 = dict(payload, fecha_inicio_utc="2025-11-08T00:00:00Z")
+    resp_dia3 = client.post("/api/v1/disponibilidad", json=payload_dia3)
+    slots_dia3 = [s["inicio_slot"] for s in resp_dia3.json()["horarios_disponibles"]]
+    slots_multi = [
+        s["inicio_slot"] for s in resp.json()["horarios_disponibles"] if s["inicio_slot"].startswith("2025-11-08")
+    ]
+    assert slots_multi == slots_dia3
+
+
+def test_horizon_over_limit_returns_400():
+    payload = {
+        "servicio_id": "SVC2",
+        "scenario_id": "baseline",
+        "fecha_inicio_utc": "2025-11-01T00:00:00Z",
+        "fecha_fin_utc": "2026-01-01T00:00:00Z",
+    }
+    resp = client.post("/api/v1/disponibilidad", json=payload)
+    assert resp.status_code == 400
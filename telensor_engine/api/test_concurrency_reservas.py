@@ -7,11 +7,19 @@ API (Director/Gerente) como a nivel unidad (mock_state).
 """
 
 import pendulum
+import pytest
 from concurrent.futures import ThreadPoolExecutor
 from fastapi.testclient import TestClient
 
 from telensor_engine.main import app
-from telensor_engine.mock_state import reset_state, add_reserva
+from telensor_engine.mock_state import (
+    ConflictoVersion,
+    add_reserva,
+    get_reserva,
+    get_reservas_recurso_en_rango,
+    reset_state,
+    update_reserva,
+)
 
 
 def _obtener_primer_slot_baseline(client: TestClient):
@@ -107,4 +115,78 @@ def test_concurrent_add_reserva_lock_enforced_unit():
 
     assert len(results) == 1
     # Al menos uno de los errores debe mencionar conflicto
-    assert any("Conflicto" in msg for msg in errors)
\ No newline at end of file
+    assert any("Conflicto" in msg for msg in errors)
+
+
+def test_concurrent_add_reserva_franjas_por_recurso():
+    """Ráfaga concurrente sobre varios empleados y equipos: exactamente una
+    reserva por empleado en el slot disputado, sin interbloqueos."""
+    reset_state()
+    inicio_dt = pendulum.parse("2025-11-06T08:00:00Z").in_timezone("UTC")
+    fin_dt = inicio_dt.add(minutes=45)
+    empleados = [f"E{i}" for i in range(8)]
+
+    def _add(i: int):
+        try:
+            return add_reserva(
+                servicio_id="SVC2",
+                empleado_id=empleados[i % len(empleados)],
+                equipo_id=f"EQ{i % len(empleados)}",
+                inicio_slot=inicio_dt,
+                fin_slot=fin_dt,
+            )
+        except ValueError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=16) as ex:
+        creadas = [r for r in ex.map(_add, range(len(empleados) * 6)) if r is not None]
+
+    assert sorted(r.empleado_id for r in creadas) == empleados
+
+
+def test_concurrent_update_reserva_intercambio_sin_interbloqueo():
+    """Reasignaciones cruzadas A→B y B→A en paralelo terminan y dejan el índice coherente."""
+    reset_state()
+    inicio_dt = pendulum.parse("2025-11-06T08:00:00Z").in_timezone("UTC")
+    reservas = [
+        add_reserva(
+            servicio_id="SVC2",
+            empleado_id="EA" if i % 2 else "EB",
+            equipo_id=None,
+            inicio_slot=inicio_dt.add(hours=i),
+            fin_slot=inicio_dt.add(hours=i, minutes=45),
+        )
+        for i in range(20)
+    ]
+
+    def _mover(i: int):
+        r = reservas[i % len(reservas)]
+        return update_reserva(reserva_id=r.reserva_id, empleado_id="EB" if r.empleado_id == "EA" else "EA")
+
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        list(ex.map(_mover, range(200)))
+
+    for emp in ("EA", "EB"):
+        indexadas = get_reservas_recurso_en_rango(
+            empleado_id=emp, inicio_dt=inicio_dt, fin_dt=inicio_dt.add(days=1)
+        )
+        assert sorted(r.reserva_id for r in indexadas) == sorted(
+            r.reserva_id for r in reservas if r.empleado_id == emp
+        )
+
+
+def test_update_reserva_compare_and_swap_por_version():
+    """`expected_version` obsoleto lanza ConflictoVersion sin modificar la reserva."""
+    reset_state()
+    inicio_dt = pendulum.parse("2025-11-06T08:00:00Z").in_timezone("UTC")
+    r = add_reserva(
+        servicio_id="SVC2", empleado_id="E1", equipo_id=None, inicio_slot=inicio_dt, fin_slot=inicio_dt.add(minutes=45)
+    )
+    assert get_reserva(r.reserva_id) == r and r.version == 1
+
+    update_reserva(reserva_id=r.reserva_id, empleado_id="E2", expected_version=1)
+    assert r.version == 2
+
+    with pytest.raises(ConflictoVersion):
+        update_reserva(reserva_id=r.reserva_id, empleado_id="E3", expected_version=1)
+    assert (r.empleado_id, r.version) == ("E2", 2)
@@ -1,5 +1,6 @@
 from fastapi.testclient import TestClient
 
+from telensor_engine.api import adapter
 from telensor_engine.main import app
 from telensor_engine.mock_state import reset_state
 
@@ -57,4 +58,34 @@ def test_reservas_e2e_creacion_y_conflicto_baseline():
 
     # 4) Intentar crear de nuevo la misma reserva debe fallar con 409
     resp_post_conflict = client.post("/api/v1/reservas", json=payload_post)
-    assert resp_post_conflict.status_code == 409
\ No newline at end of file
+    assert resp_post_conflict.status_code == 409
+
+
+def test_creacion_valida_slot_sin_busqueda_completa(monkeypatch):
+    """La validación de la reserva evalúa solo los recursos nombrados (sin buscar en el pool)."""
+    reset_state()
+
+    def _no_buscar(*args, **kwargs):
+        raise AssertionError("la creación no debe ejecutar una búsqueda completa")
+
+    monkeypatch.setattr(adapter, "gestionar_busqueda_disponibilidad", _no_buscar)
+    base = {
+        "servicio_id": "SVC2",
+        "empleado_id": "E2",
+        "equipo_id": "EQ2",
+        "scenario_id": "baseline",
+        "service_window_policy": "start_only",
+    }
+    # E2 está ocupado 09:55–10:55 en baseline
+    resp_ocupado = client.post(
+        "/api/v1/reservas",
+        json=dict(base, inicio_slot="2025-11-06T10:00:00Z", fin_slot="2025-11-06T11:00:00Z"),
+    )
+    assert resp_ocupado.status_code == 400
+
+    resp = client.post(
+        "/api/v1/reservas",
+        json=dict(base, inicio_slot="2025-11-06T11:00:00Z", fin_slot="2025-11-06T12:00:00Z"),
+    )
+    assert resp.status_code == 201
+    reset_state()
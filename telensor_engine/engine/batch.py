@@ -0,0 +1,236 @@
+"""Álgebra de intervalos por lotes (vectorizada con NumPy).
+
+Variante del motor que opera sobre muchos "dueños" (empleados, equipos) en una
+sola pasada. Un lote es una terna de arreglos planos `(inicios, fines, duenos)`
+con intervalos semiabiertos [ini, fin) en minutos absolutos del eje continuo y
+un identificador entero no negativo de dueño por intervalo.
+
+Estrategia:
+- Cada dueño se desplaza a una franja propia de un eje global
+  (`dueno * ancho + (minuto - origen)`), con `ancho` mayor que el rango total.
+  Así los intervalos de dueños distintos nunca se tocan y un único barrido
+  global equivale a un barrido independiente por dueño.
+- Intersección y resta se resuelven sobre los segmentos elementales definidos
+  por todas las fronteras, evaluando cobertura con `searchsorted`.
+
+Los resultados son idénticos a los de `engine.py` aplicado dueño por dueño
+(intervalos normalizados y ordenados por dueño e inicio).
+"""
+
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+
+Lote = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def _vacio() -> Lote:
+    return (
+        np.empty(0, dtype=np.int64),
+        np.empty(0, dtype=np.int64),
+        np.empty(0, dtype=np.int64),
+    )
+
+
+def crear_lote(inicios: Iterable[int], fines: Iterable[int], duenos: Iterable[int]) -> Lote:
+    """Construye un lote validando longitudes y tipos (int64)."""
+    s, e, o = (
+        np.asarray(x if isinstance(x, np.ndarray) else list(x), dtype=np.int64)
+        for x in (inicios, fines, duenos)
+    )
+    if not (s.shape == e.shape == o.shape) or s.ndim != 1:
+        raise ValueError("Lote inválido: inicios, fines y dueños deben ser 1D y de igual longitud")
+    if o.size and o.min() < 0:
+        raise ValueError("Lote inválido: los dueños deben ser enteros no negativos")
+    return s, e, o
+
+
+def lote_desde_listas(por_dueno: Dict[int, Sequence[Sequence[int]]]) -> Lote:
+    """Convierte `{dueno: [[ini, fin], ...]}` en un lote plano."""
+    s: List[int] = []
+    e: List[int] = []
+    o: List[int] = []
+    for dueno, intervalos in por_dueno.items():
+        for ini, fin in intervalos:
+            s.append(ini)
+            e.append(fin)
+            o.append(dueno)
+    return crear_lote(s, e, o)
+
+
+def replicar_lote(intervalos: Sequence[Sequence[int]], duenos: Iterable[int]) -> Lote:
+    """Replica la misma lista de intervalos para cada dueño indicado.
+
+    Útil para ventanas comunes (base, servicio) o bloqueos globales.
+    """
+    duenos_arr = np.asarray(list(duenos), dtype=np.int64)
+    if not intervalos or duenos_arr.size == 0:
+        return _vacio()
+    base = np.asarray(intervalos, dtype=np.int64).reshape(-1, 2)
+    s = np.tile(base[:, 0], duenos_arr.size)
+    e = np.tile(base[:, 1], duenos_arr.size)
+    o = np.repeat(duenos_arr, base.shape[0])
+    return s, e, o
+
+
+def concatenar_lotes(*lotes: Lote) -> Lote:
+    """Une varios lotes en uno (sin normalizar)."""
+    if not lotes:
+        return _vacio()
+    return (
+        np.concatenate([l[0] for l in lotes]).astype(np.int64, copy=False),
+        np.concatenate([l[1] for l in lotes]).astype(np.int64, copy=False),
+        np.concatenate([l[2] for l in lotes]).astype(np.int64, copy=False),
+    )
+
+
+def lote_a_listas(lote: Lote) -> Dict[int, List[List[int]]]:
+    """Convierte un lote en `{dueno: [[ini, fin], ...]}` preservando el orden."""
+    res: Dict[int, List[List[int]]] = {}
+    for s, e, o in zip(lote[0].tolist(), lote[1].tolist(), lote[2].tolist()):
+        res.setdefault(o, []).append([s, e])
+    return res
+
+
+def _marco(*lotes: Lote) -> Tuple[int, int]:
+    """Calcula (origen, ancho) comunes para proyectar lotes al eje global."""
+    minimos = [int(l[0].min()) for l in lotes if l[0].size]
+    maximos = [int(l[1].max()) for l in lotes if l[1].size]
+    origen = min(minimos)
+    ancho = max(max(maximos) - origen, 0) + 1
+    return origen, ancho
+
+
+def _normalizar_eje(s: np.ndarray, e: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Ordena y fusiona intervalos del eje global (une solapados y adyacentes)."""
+    validos = e > s
+    s = s[validos]
+    e = e[validos]
+    if s.size == 0:
+        return s, e
+    orden = np.lexsort((e, s))
+    s = s[orden]
+    e = e[orden]
+    fin_acum = np.maximum.accumulate(e)
+    nuevo = np.empty(s.size, dtype=bool)
+    nuevo[0] = True
+    nuevo[1:] = s[1:] > fin_acum[:-1]
+    idx = np.flatnonzero(nuevo)
+    return s[idx], np.maximum.reduceat(e, idx)
+
+
+def _proyectar(lote: Lote, origen: int, ancho: int) -> Tuple[np.ndarray, np.ndarray]:
+    s, e, o = lote
+    desplazamiento = o * ancho - origen
+    return _normalizar_eje(s + desplazamiento, e + desplazamiento)
+
+
+def _desproyectar(s: np.ndarray, e: np.ndarray, origen: int, ancho: int) -> Lote:
+    # En el eje global, `s = o * ancho + (minuto - origen)` con 0 <= minuto - origen < ancho.
+    o = s // ancho
+    desplazamiento = o * ancho - origen
+    return s - desplazamiento, e - desplazamiento, o
+
+
+def _cubiertos(puntos: np.ndarray, s: np.ndarray, e: np.ndarray) -> np.ndarray:
+    """Máscara de puntos cubiertos por intervalos normalizados [s, e)."""
+    return (np.searchsorted(s, puntos, side="right") - np.searchsorted(e, puntos, side="right")) > 0
+
+
+def _combinar(a: Lote, b: Lote, conservar_b: bool) -> Lote:
+    """Barrido común: A ∩ B (conservar_b=True) o A − B (conservar_b=False)."""
+    origen, ancho = _marco(a, b)
+    a_s, a_e = _proyectar(a, origen, ancho)
+    b_s, b_e = _proyectar(b, origen, ancho)
+    if a_s.size == 0:
+        return _vacio()
+    if b_s.size == 0:
+        if conservar_b:
+            return _vacio()
+        return _desproyectar(a_s, a_e, origen, ancho)
+
+    fronteras = np.unique(np.concatenate((a_s, a_e, b_s, b_e)))
+    izq = fronteras[:-1]
+    der = fronteras[1:]
+    en_a = _cubiertos(izq, a_s, a_e)
+    en_b = _cubiertos(izq, b_s, b_e)
+    mascara = en_a & en_b if conservar_b else en_a & ~en_b
+    if not mascara.any():
+        return _vacio()
+
+    # Fusionar segmentos elementales contiguos seleccionados
+    previo = np.empty_like(mascara)
+    previo[0] = False
+    previo[1:] = mascara[:-1]
+    siguiente = np.empty_like(mascara)
+    siguiente[-1] = False
+    siguiente[:-1] = mascara[1:]
+    inicios = izq[mascara & ~previo]
+    fines = der[mascara & ~siguiente]
+    return _desproyectar(inicios, fines, origen, ancho)
+
+
+def normalizar_lote(lote: Lote) -> Lote:
+    """Ordena por (dueño, inicio) y fusiona intervalos solapados o adyacentes por dueño."""
+    if lote[0].size == 0:
+        return _vacio()
+    origen, ancho = _marco(lote)
+    s, e = _proyectar(lote, origen, ancho)
+    return _desproyectar(s, e, origen, ancho)
+
+
+def calcular_interseccion_lote(lote_a: Lote, lote_b: Lote) -> Lote:
+    """Intersección por dueño de dos lotes (equivale a `calcular_interseccion` por dueño)."""
+    if lote_a[0].size == 0 or lote_b[0].size == 0:
+        return _vacio()
+    return _combinar(lote_a, lote_b, conservar_b=True)
+
+
+def restar_intervalos_lote(base: Lote, ocupados: Lote) -> Lote:
+    """Resta por dueño la unión de `ocupados` a `base` (equivale a `restar_intervalos`)."""
+    if base[0].size == 0:
+        return _vacio()
+    if ocupados[0].size == 0:
+        return normalizar_lote(base)
+    return _combinar(base, ocupados, conservar_b=False)
+
+
+def encontrar_slots_lote(
+    ventana_base_efectiva: Sequence[int],
+    libres: Lote,
+    duracion_total_slot: int,
+    buffer_previo: int,
+    buffer_posterior: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Versión por lotes de `encontrar_slots`: calcula de forma cerrada cuántos
+    saltos de slot caben en cada libre y materializa los inicios "pre".
+
+    Retorna `(duenos, inicios_pre)` ordenados por dueño e inicio, tal como
+    resultaría de invocar `encontrar_slots` para cada dueño por separado.
+    `libres` debe estar normalizado (salida de las otras funciones del módulo).
+    """
+    s, e, o = libres
+    if s.size == 0 or duracion_total_slot <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    eff_ini, eff_fin = int(ventana_base_efectiva[0]), int(ventana_base_efectiva[1])
+    d = int(duracion_total_slot)
+
+    arranque = np.maximum(s, eff_ini - buffer_previo)
+    # Saltos que caben completos: arranque + k*d + d <= fin
+    holgura = e - arranque - d
+    n_cabe = np.where(holgura >= 0, holgura // d + 1, 0)
+    # Inicio de servicio dentro de la ventana: arranque + k*d + pre < eff_fin
+    limite = eff_fin - buffer_previo - arranque
+    n_ventana = np.where(limite > 0, (limite + d - 1) // d, 0)
+    n = np.minimum(n_cabe, n_ventana)
+
+    total = int(n.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    rep_arranque = np.repeat(arranque, n)
+    # Índice k dentro de cada libre: posición global menos el offset del grupo
+    offsets = np.repeat(np.cumsum(n) - n, n)
+    k = np.arange(total, dtype=np.int64) - offsets
+    return np.repeat(o, n), rep_arranque + k * d
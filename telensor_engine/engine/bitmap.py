@@ -0,0 +1,125 @@
+"""Representación de disponibilidad como mapa de bits por minuto.
+
+Backend alternativo del motor para agendas densas. Un `MapaMinutos` cubre un
+marco fijo del eje continuo `[origen, origen + longitud)` y guarda un bit por
+minuto (1 = libre/cubierto) en un entero de Python, cuyas operaciones bit a
+bit se ejecutan en C sobre palabras de máquina:
+
+- Intersección: AND.
+- Resta: AND-NOT.
+- Empaquetado de slots: escaneo de corridas de unos (run-length) y luego el
+  mismo cálculo que `encontrar_slots` sobre cada corrida.
+
+Todo intervalo se recorta al marco. Si el marco cubre la ventana base de la
+búsqueda (como hace el adaptador), el resultado es idéntico al de la ruta de
+listas de intervalos, porque los libres finales siempre se intersecan con ella.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+
+# Umbrales para la selección automática de backend (ver `preferir_bitmap`).
+UMBRAL_DENSIDAD_BITMAP = 16  # bloqueos promedio por recurso
+MAX_SPAN_BITMAP = 7 * 24 * 60  # minutos del marco
+
+_CORRIDA = re.compile("1+")
+
+
+class MapaMinutos:
+    """Mapa de bits inmutable de minutos sobre el marco `[origen, origen + longitud)`."""
+
+    __slots__ = ("origen", "longitud", "bits")
+
+    def __init__(self, origen: int, longitud: int, bits: int = 0) -> None:
+        if longitud < 0:
+            raise ValueError("MapaMinutos: longitud negativa")
+        object.__setattr__(self, "origen", int(origen))
+        object.__setattr__(self, "longitud", int(longitud))
+        object.__setattr__(self, "bits", bits & ((1 << longitud) - 1))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("MapaMinutos es inmutable")
+
+    @classmethod
+    def desde_intervalos(
+        cls, intervalos: Iterable[Sequence[int]], origen: int, longitud: int
+    ) -> "MapaMinutos":
+        """Construye el mapa encendiendo los minutos de cada intervalo recortado al marco."""
+        return cls(origen, longitud, _bits_de_intervalos(intervalos, origen, longitud))
+
+    def _bits_de(self, otro) -> int:
+        """Bits de `otro` expresados en el marco de este mapa."""
+        if isinstance(otro, MapaMinutos):
+            if otro.origen == self.origen and otro.longitud == self.longitud:
+                return otro.bits
+            desplazamiento = otro.origen - self.origen
+            bits = otro.bits << desplazamiento if desplazamiento >= 0 else otro.bits >> -desplazamiento
+            return bits & ((1 << self.longitud) - 1)
+        return _bits_de_intervalos(otro, self.origen, self.longitud)
+
+    def _con_bits(self, bits: int) -> "MapaMinutos":
+        return MapaMinutos(self.origen, self.longitud, bits)
+
+    def interseccion(self, otro) -> "MapaMinutos":
+        return self._con_bits(self.bits & self._bits_de(otro))
+
+    def diferencia(self, otro) -> "MapaMinutos":
+        return self._con_bits(self.bits & ~self._bits_de(otro))
+
+    def union(self, otro) -> "MapaMinutos":
+        return self._con_bits(self.bits | self._bits_de(otro))
+
+    def corridas(self) -> Iterator[Tuple[int, int]]:
+        """Escaneo run-length: produce `(ini, fin)` absolutos de cada corrida de unos."""
+        if not self.bits:
+            return
+        # bin() es MSB primero; se invierte para que el índice sea el minuto relativo
+        cadena = bin(self.bits)[:1:-1]
+        for m in _CORRIDA.finditer(cadena):
+            yield self.origen + m.start(), self.origen + m.end()
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return self.corridas()
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, MapaMinutos):
+            return self.a_lista() == other.a_lista()
+        if isinstance(other, list):
+            return self.a_lista() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"MapaMinutos(origen={self.origen}, longitud={self.longitud}, libres={self.a_lista()!r})"
+
+    def a_lista(self) -> List[List[int]]:
+        return [[s, e] for s, e in self.corridas()]
+
+    def total_minutos(self) -> int:
+        return bin(self.bits).count("1")
+
+
+def _bits_de_intervalos(intervalos: Iterable[Sequence[int]], origen: int, longitud: int) -> int:
+    bits = 0
+    fin_marco = origen + longitud
+    for s, e in intervalos:
+        s = s if s > origen else origen
+        e = e if e < fin_marco else fin_marco
+        if e > s:
+            bits |= ((1 << (e - s)) - 1) << (s - origen)
+    return bits
+
+
+def preferir_bitmap(bloqueos_por_recurso: float, span_min: int) -> bool:
+    """Selección automática de backend según densidad.
+
+    El mapa de bits conviene cuando cada recurso acumula muchos bloqueos y el
+    marco es acotado; con pocas ocupaciones las listas de intervalos son más
+    baratas que construir mapas.
+    """
+    return 0 < span_min <= MAX_SPAN_BITMAP and bloqueos_por_recurso >= UMBRAL_DENSIDAD_BITMAP
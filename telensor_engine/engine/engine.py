@@ -1,10 +1,21 @@
-from typing import List
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+from array import array
+import heapq
 import logging
 
+from telensor_engine.engine.bitmap import MapaMinutos
+from telensor_engine.engine.interval_set import IntervalSet
 
-def _merge_intervals(intervalos: List[List[int]]) -> List[List[int]]:
+
+Intervalos = Union[List[List[int]], IntervalSet, MapaMinutos]
+
+
+def _merge_intervals(intervalos: Intervalos) -> List[List[int]]:
     if not intervalos:
         return []
+    if isinstance(intervalos, IntervalSet):
+        # Ya normalizado: evitar reordenar y refusionar
+        return intervalos.a_lista()
     ordenados = sorted(intervalos, key=lambda x: (x[0], x[1]))
     merged: List[List[int]] = []
     cur_s, cur_e = ordenados[0]
@@ -19,11 +30,21 @@ def _merge_intervals(intervalos: List[List[int]]) -> List[List[int]]:
     return merged
 
 
-def calcular_interseccion(lista_a: List[List[int]], lista_b: List[List[int]]) -> List[List[int]]:
+def calcular_interseccion(lista_a: Intervalos, lista_b: Intervalos) -> Intervalos:
     """
     Intersección de dos listas de intervalos [ini, fin) en minutos absolutos.
     Acepta intervalos desordenados y solapados; retorna lista normalizada.
+
+    Si alguna entrada es un `IntervalSet`, opera por mezcla lineal sin
+    renormalizarlo y retorna un `IntervalSet`. Si alguna es un `MapaMinutos`,
+    opera con AND en su marco y retorna un `MapaMinutos`.
     """
+    if isinstance(lista_a, MapaMinutos):
+        return lista_a.interseccion(lista_b)
+    if isinstance(lista_b, MapaMinutos):
+        return lista_b.interseccion(lista_a)
+    if isinstance(lista_a, IntervalSet) or isinstance(lista_b, IntervalSet):
+        return IntervalSet.normalizar(lista_a).interseccion(lista_b)
     a = _merge_intervals(lista_a)
     b = _merge_intervals(lista_b)
     if not a or not b:
@@ -43,11 +64,20 @@ def calcular_interseccion(lista_a: List[List[int]], lista_b: List[List[int]]) ->
     return res
 
 
-def restar_intervalos(base: List[List[int]], ocupados: List[List[int]]) -> List[List[int]]:
+def restar_intervalos(base: Intervalos, ocupados: Intervalos) -> Intervalos:
     """
     Resta la unión de "ocupados" a la lista "base" y devuelve los libres.
     Opera en el eje continuo con intervalos [ini, fin) en minutos absolutos.
+
+    Si alguna entrada es un `IntervalSet`, retorna un `IntervalSet`; si alguna
+    es un `MapaMinutos`, opera con AND-NOT en su marco y retorna un `MapaMinutos`.
     """
+    if isinstance(base, MapaMinutos):
+        return base.diferencia(ocupados)
+    if isinstance(ocupados, MapaMinutos):
+        return MapaMinutos.desde_intervalos(base, ocupados.origen, ocupados.longitud).diferencia(ocupados)
+    if isinstance(base, IntervalSet) or isinstance(ocupados, IntervalSet):
+        return IntervalSet.normalizar(base).diferencia(ocupados)
     if not base:
         return []
     base_n = _merge_intervals(base)
@@ -74,40 +104,232 @@ def restar_intervalos(base: List[List[int]], ocupados: List[List[int]]) -> List[
     return libres
 
 
+def _eventos(intervalos: Intervalos, etiqueta: int) -> Iterator[Tuple[int, int, int]]:
+    """Eventos `(t, delta, etiqueta)` ordenados; los fines (-1) preceden a los inicios (+1)."""
+    if isinstance(intervalos, IntervalSet):
+        # Ya normalizado: los eventos salen ordenados sin sort
+        for s, e in intervalos:
+            yield s, 1, etiqueta
+            yield e, -1, etiqueta
+        return
+    eventos: List[Tuple[int, int, int]] = []
+    for s, e in intervalos:
+        if e > s:
+            eventos.append((s, 1, etiqueta))
+            eventos.append((e, -1, etiqueta))
+    eventos.sort()
+    yield from eventos
+
+
+def intersectar_multiples(
+    listas: Sequence[Intervalos],
+    restar: Optional[Sequence[Intervalos]] = None,
+) -> Intervalos:
+    """
+    Intersección de K listas de intervalos [ini, fin) y resta opcional de la
+    unión de `restar`, en un único barrido.
+
+    Equivale a encadenar `calcular_interseccion` sobre `listas` y luego
+    `restar_intervalos` con cada elemento de `restar`, sin listas intermedias:
+    los eventos de todas las entradas se mezclan con un heap (`heapq.merge`) y
+    se mantiene por entrada un contador de cobertura.
+
+    Retorna un `IntervalSet` si alguna entrada lo es (lista en otro caso). Con
+    entradas `MapaMinutos` se pliega con AND/AND-NOT en su marco.
+    """
+    if not listas:
+        return []
+    restar = [r for r in (restar or []) if r]
+    todas = list(listas) + restar
+    if any(isinstance(x, MapaMinutos) for x in todas):
+        # El pliegue arranca de `listas[0]` (no de cualquier mapa, que podría
+        # venir de `restar`), llevada al marco del primer mapa presente
+        acc = listas[0]
+        if not isinstance(acc, MapaMinutos):
+            marco = next(x for x in todas if isinstance(x, MapaMinutos))
+            acc = MapaMinutos.desde_intervalos(acc, marco.origen, marco.longitud)
+        for lista in listas[1:]:
+            acc = calcular_interseccion(acc, lista)
+        for ocupados in restar:
+            acc = restar_intervalos(acc, ocupados)
+        return acc
+
+    devolver_set = any(isinstance(x, IntervalSet) for x in todas)
+    if any(not lista for lista in listas):
+        return IntervalSet() if devolver_set else []
+
+    k = len(listas)
+    cobertura = [0] * k
+    activos = 0  # listas con cobertura > 0
+    bloqueos = 0  # intervalos de `restar` abiertos
+    res: List[List[int]] = []
+    dentro = False
+    inicio = 0
+    t_actual: Optional[int] = None
+
+    flujos = [_eventos(lista, idx) for idx, lista in enumerate(listas)]
+    flujos.extend(_eventos(ocupados, -1) for ocupados in restar)
+    for t, delta, idx in heapq.merge(*flujos):
+        if t != t_actual:
+            # Evaluar el estado tras procesar todos los eventos del instante previo
+            if t_actual is not None:
+                en = activos == k and bloqueos == 0
+                if en and not dentro:
+                    inicio, dentro = t_actual, True
+                elif not en and dentro:
+                    res.append([inicio, t_actual])
+                    dentro = False
+            t_actual = t
+        if idx < 0:
+            bloqueos += delta
+            continue
+        previo = cobertura[idx]
+        cobertura[idx] = previo + delta
+        if previo == 0 and delta > 0:
+            activos += 1
+        elif previo == 1 and delta < 0:
+            activos -= 1
+    if dentro and t_actual is not None:
+        res.append([inicio, t_actual])
+    if devolver_set:
+        # El barrido ya produce intervalos normalizados
+        return IntervalSet._desde_normalizado(array("q", [x for par in res for x in par]))
+    return res
+
+
+def _rango_slots(
+    libre_ini: int,
+    libre_fin: int,
+    eff_ini: int,
+    eff_fin: int,
+    duracion_total_slot: int,
+    buffer_previo: int,
+) -> Tuple[int, int]:
+    """
+    Forma cerrada del rango de saltos válidos dentro de un libre común.
+
+    Retorna `(arranque, n)`: los inicios válidos son `arranque + k * duracion_total_slot`
+    para `k` en `[0, n)`.
+    - Cabe completo: arranque + k*dur + dur <= libre_fin.
+    - Inicio de servicio en ventana: arranque + k*dur + buffer_previo < eff_fin
+      (el límite inferior lo garantiza el arranque alineado).
+    """
+    arranque = max(libre_ini, eff_ini - buffer_previo)
+    holgura = libre_fin - arranque - duracion_total_slot
+    if holgura < 0:
+        return arranque, 0
+    n_cabe = holgura // duracion_total_slot + 1
+    limite = eff_fin - buffer_previo - arranque
+    n_ventana = -(-limite // duracion_total_slot) if limite > 0 else 0
+    return arranque, min(n_cabe, n_ventana)
+
+
 def encontrar_slots(
     ventana_base_efectiva: List[int],
-    libres_comunes: List[List[int]],
+    libres_comunes: Intervalos,
     duracion_total_slot: int,
     buffer_previo: int,
     buffer_posterior: int,
 ) -> List[int]:
     """
-    Itera por "saltos de slot" dentro de cada libre común y devuelve los
-    inicios "pre" (minuto absoluto) de cada slot válido.
+    Recorre por "saltos de slot" cada libre común y devuelve los inicios
+    "pre" (minuto absoluto) de cada slot válido.
+
+    El rango de saltos válidos de cada libre se calcula de forma cerrada
+    (`_rango_slots`) en lugar de avanzar minuto a minuto con un bucle.
 
     Validaciones:
     - Inicio de servicio dentro de la ventana efectiva [eff_ini, eff_fin).
     - Slot completo dentro del libre común: inicio_pre + duracion_total <= libre_fin.
     """
-    if not libres_comunes:
+    if not libres_comunes or duracion_total_slot <= 0:
         return []
     eff_ini, eff_fin = ventana_base_efectiva
+    logging.debug(
+        "slots: eff=[%d,%d], dur=%d, pre=%d, post=%d",
+        eff_ini,
+        eff_fin,
+        duracion_total_slot,
+        buffer_previo,
+        buffer_posterior,
+    )
     inicios: List[int] = []
     for libre_ini, libre_fin in libres_comunes:
-        arranque = max(libre_ini, eff_ini - buffer_previo)
-        logging.info(
-            "slots: libre=[%d,%d], eff=[%d,%d], dur=%d, pre=%d, post=%d",
-            libre_ini,
-            libre_fin,
-            eff_ini,
-            eff_fin,
-            duracion_total_slot,
-            buffer_previo,
-            buffer_posterior,
-        )
-        while arranque + duracion_total_slot <= libre_fin:
-            inicio_servicio = arranque + buffer_previo
-            if eff_ini <= inicio_servicio < eff_fin:
-                inicios.append(arranque)
-            arranque += duracion_total_slot
-    return inicios
\ No newline at end of file
+        arranque, n = _rango_slots(libre_ini, libre_fin, eff_ini, eff_fin, duracion_total_slot, buffer_previo)
+        if n > 0:
+            inicios.extend(range(arranque, arranque + n * duracion_total_slot, duracion_total_slot))
+    return inicios
+
+
+def encontrar_slots_multiples(
+    ventana_base_efectiva: List[int],
+    libres_comunes: Intervalos,
+    perfiles: Sequence[Tuple[int, int, int]],
+) -> List[List[int]]:
+    """
+    Empaqueta en una sola pasada varios perfiles de servicio sobre los mismos libres.
+
+    `perfiles` es una secuencia de `(duracion, buffer_previo, buffer_posterior)`;
+    la duración total del slot de cada perfil es la suma de los tres. Los libres
+    comunes se calculan (y materializan) una sola vez y se recorren una vez; en
+    cada libre se aplica la forma cerrada `_rango_slots` a cada perfil que cabe.
+
+    Retorna una lista de inicios "pre" por perfil, en el mismo orden que
+    `perfiles`; cada lista es idéntica a la de `encontrar_slots` con ese perfil.
+    """
+    resultados: List[List[int]] = [[] for _ in perfiles]
+    totales = [(i, dur + pre + post, pre) for i, (dur, pre, post) in enumerate(perfiles) if dur + pre + post > 0]
+    if not libres_comunes or not totales:
+        return resultados
+    eff_ini, eff_fin = ventana_base_efectiva
+    # Más cortos primero: si un libre no admite el perfil más corto, no admite ninguno
+    totales.sort(key=lambda p: p[1])
+    minimo = totales[0][1]
+    for libre_ini, libre_fin in libres_comunes:
+        if libre_fin - libre_ini < minimo:
+            continue
+        for i, total, pre in totales:
+            if libre_fin - libre_ini < total:
+                break
+            arranque, n = _rango_slots(libre_ini, libre_fin, eff_ini, eff_fin, total, pre)
+            if n > 0:
+                resultados[i].extend(range(arranque, arranque + n * total, total))
+    return resultados
+
+
+def iterar_slots(
+    ventana_base_efectiva: List[int],
+    libres_comunes: Intervalos,
+    duracion_total_slot: int,
+    buffer_previo: int,
+    buffer_posterior: int,
+    *,
+    limit: Optional[int] = None,
+    after: Optional[int] = None,
+) -> Iterator[int]:
+    """
+    Variante perezosa de `encontrar_slots` para paginación.
+
+    - `after`: solo produce inicios "pre" estrictamente mayores (cursor de página).
+    - `limit`: máximo de inicios a producir.
+
+    Produce los mismos valores y en el mismo orden que `encontrar_slots`, sin
+    materializar los inicios descartados.
+    """
+    if not libres_comunes or duracion_total_slot <= 0 or (limit is not None and limit <= 0):
+        return
+    eff_ini, eff_fin = ventana_base_efectiva
+    emitidos = 0
+    for libre_ini, libre_fin in libres_comunes:
+        if after is not None and libre_fin - duracion_total_slot <= after:
+            continue
+        arranque, n = _rango_slots(libre_ini, libre_fin, eff_ini, eff_fin, duracion_total_slot, buffer_previo)
+        k = 0
+        if after is not None and after >= arranque:
+            k = (after - arranque) // duracion_total_slot + 1
+        while k < n:
+            yield arranque + k * duracion_total_slot
+            emitidos += 1
+            if limit is not None and emitidos >= limit:
+                return
+            k += 1
@@ -0,0 +1,200 @@
+"""Conjunto de intervalos normalizado e inmutable para el motor.
+
+`IntervalSet` garantiza por construcción el invariante "normalizado":
+intervalos [ini, fin) no vacíos, ordenados y sin solapes ni adyacencias.
+Gracias a ello las operaciones entre conjuntos son mezclas lineales que no
+vuelven a ordenar ni a fusionar, a diferencia de las funciones sobre listas
+de `engine.py`, que normalizan sus entradas en cada llamada.
+
+Representación compacta: un único `array('q')` plano `[s0, e0, s1, e1, ...]`.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Iterator, List, Sequence, Tuple, Union
+
+
+IntervalosLike = Union["IntervalSet", Iterable[Sequence[int]]]
+
+
+class IntervalSet:
+    """Conjunto inmutable de intervalos [ini, fin) en minutos absolutos.
+
+    - Construir desde listas (`IntervalSet([[s, e], ...])`) ordena y fusiona una vez.
+    - `interseccion`, `diferencia`, `union` y `recortar` devuelven nuevos
+      conjuntos ya normalizados sin reordenar.
+    - Iterar produce tuplas `(ini, fin)`, compatible con `encontrar_slots`.
+    """
+
+    __slots__ = ("_datos",)
+
+    def __init__(self, intervalos: Iterable[Sequence[int]] = ()) -> None:
+        pares = sorted((int(s), int(e)) for s, e in intervalos if e > s)
+        datos = array("q")
+        for s, e in pares:
+            if datos and s <= datos[-1]:  # semiabierto: une solapados y adyacentes
+                if e > datos[-1]:
+                    datos[-1] = e
+            else:
+                datos.append(s)
+                datos.append(e)
+        object.__setattr__(self, "_datos", datos)
+
+    @classmethod
+    def _desde_normalizado(cls, datos: array) -> "IntervalSet":
+        """Construye sin validar: `datos` ya cumple el invariante normalizado."""
+        obj = object.__new__(cls)
+        object.__setattr__(obj, "_datos", datos)
+        return obj
+
+    @classmethod
+    def normalizar(cls, intervalos: IntervalosLike) -> "IntervalSet":
+        """Devuelve `intervalos` si ya es un IntervalSet; si no, lo normaliza."""
+        if isinstance(intervalos, cls):
+            return intervalos
+        return cls(intervalos)
+
+    # Inmutabilidad
+    def __setattr__(self, name, value):  # noqa: D401
+        raise AttributeError("IntervalSet es inmutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("IntervalSet es inmutable")
+
+    # Protocolo de colección
+    def __len__(self) -> int:
+        return len(self._datos) // 2
+
+    def __bool__(self) -> bool:
+        return bool(self._datos)
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        it = iter(self._datos)
+        return zip(it, it)
+
+    def __getitem__(self, idx: int) -> Tuple[int, int]:
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("índice fuera de rango")
+        return self._datos[2 * idx], self._datos[2 * idx + 1]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, IntervalSet):
+            return self._datos == other._datos
+        if isinstance(other, list):
+            return self.a_lista() == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self._datos.tobytes())
+
+    def __repr__(self) -> str:
+        return f"IntervalSet({self.a_lista()!r})"
+
+    def a_lista(self) -> List[List[int]]:
+        """Convierte a la representación de lista de listas del motor."""
+        return [[s, e] for s, e in self]
+
+    def total_minutos(self) -> int:
+        """Suma de longitudes de los intervalos."""
+        d = self._datos
+        return sum(d[i + 1] - d[i] for i in range(0, len(d), 2))
+
+    # Álgebra (mezclas lineales sobre conjuntos normalizados)
+    def interseccion(self, otro: IntervalosLike) -> "IntervalSet":
+        b = IntervalSet.normalizar(otro)._datos
+        a = self._datos
+        res = array("q")
+        i = j = 0
+        na, nb = len(a), len(b)
+        while i < na and j < nb:
+            s = a[i] if a[i] > b[j] else b[j]
+            e = a[i + 1] if a[i + 1] < b[j + 1] else b[j + 1]
+            if s < e:
+                res.append(s)
+                res.append(e)
+            if a[i + 1] < b[j + 1]:
+                i += 2
+            else:
+                j += 2
+        return IntervalSet._desde_normalizado(res)
+
+    def diferencia(self, otro: IntervalosLike) -> "IntervalSet":
+        occ = IntervalSet.normalizar(otro)._datos
+        base = self._datos
+        res = array("q")
+        j = 0
+        no = len(occ)
+        for i in range(0, len(base), 2):
+            bs, be = base[i], base[i + 1]
+            cursor = bs
+            while j < no and occ[j + 1] <= bs:
+                j += 2
+            k = j
+            while k < no and occ[k] < be:
+                if occ[k] > cursor:
+                    res.append(cursor)
+                    res.append(occ[k])
+                if occ[k + 1] > cursor:
+                    cursor = occ[k + 1]
+                k += 2
+            if cursor < be:
+                res.append(cursor)
+                res.append(be)
+        return IntervalSet._desde_normalizado(res)
+
+    def union(self, otro: IntervalosLike) -> "IntervalSet":
+        a = self._datos
+        b = IntervalSet.normalizar(otro)._datos
+        res = array("q")
+        i = j = 0
+        na, nb = len(a), len(b)
+        while i < na or j < nb:
+            if j >= nb or (i < na and a[i] <= b[j]):
+                s, e = a[i], a[i + 1]
+                i += 2
+            else:
+                s, e = b[j], b[j + 1]
+                j += 2
+            if res and s <= res[-1]:
+                if e > res[-1]:
+                    res[-1] = e
+            else:
+                res.append(s)
+                res.append(e)
+        return IntervalSet._desde_normalizado(res)
+
+    def recortar(self, ini: int, fin: int) -> "IntervalSet":
+        """Intersección con una única ventana [ini, fin) usando búsqueda binaria."""
+        d = self._datos
+        if fin <= ini or not d:
+            return IntervalSet._desde_normalizado(array("q"))
+        # Primer intervalo cuyo fin supera `ini` (fines en posiciones impares)
+        n = len(d) // 2
+        lo = bisect_right(_VistaFines(d), ini)
+        res = array("q")
+        for idx in range(lo, n):
+            s, e = d[2 * idx], d[2 * idx + 1]
+            if s >= fin:
+                break
+            res.append(s if s > ini else ini)
+            res.append(e if e < fin else fin)
+        return IntervalSet._desde_normalizado(res)
+
+
+class _VistaFines:
+    """Secuencia de solo lectura con los fines de un arreglo plano (para bisect)."""
+
+    __slots__ = ("_d",)
+
+    def __init__(self, d: array) -> None:
+        self._d = d
+
+    def __len__(self) -> int:
+        return len(self._d) // 2
+
+    def __getitem__(self, idx: int) -> int:
+        return self._d[2 * idx + 1]
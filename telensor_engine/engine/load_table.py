@@ -0,0 +1,65 @@
+"""Tabla de cargas por recurso con sumas prefijas.
+
+La carga de un recurso en una ventana `[a, b)` es la suma de minutos de
+intersección de cada uno de sus bloqueos con la ventana (los solapes cuentan
+por separado, igual que `_sumar_minutos_interseccion` del adaptador).
+
+Con los inicios `S` y fines `E` ordenados y sus sumas prefijas, la integral de
+la cobertura hasta `x` es
+
+    F(x) = Σ_{s<x} (x - s) - Σ_{e<x} (x - e)
+
+y la carga en `[a, b)` es `F(b) - F(a)`: dos búsquedas binarias por extremo.
+Cada recurso se prepara de forma perezosa la primera vez que se consulta.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Dict, Hashable, List, Mapping, Sequence, Tuple
+
+
+_Prefijos = Tuple[List[int], List[int], List[int], List[int]]
+
+
+class TablaCargas:
+    """Cargas por recurso consultables en O(log n) para cualquier ventana."""
+
+    __slots__ = ("_fuentes", "_prefijos")
+
+    def __init__(self, fuentes: Mapping[Hashable, Sequence[Sequence[int]]]) -> None:
+        self._fuentes = fuentes
+        self._prefijos: Dict[Hashable, _Prefijos] = {}
+
+    def __contains__(self, recurso: Hashable) -> bool:
+        return recurso in self._fuentes
+
+    def _preparar(self, recurso: Hashable) -> _Prefijos:
+        prefijos = self._prefijos.get(recurso)
+        if prefijos is None:
+            intervalos = [(s, e) for s, e in (self._fuentes.get(recurso) or []) if e > s]
+            inicios = sorted(s for s, _ in intervalos)
+            fines = sorted(e for _, e in intervalos)
+            prefijos = (
+                inicios,
+                [0, *accumulate(inicios)],
+                fines,
+                [0, *accumulate(fines)],
+            )
+            self._prefijos[recurso] = prefijos
+        return prefijos
+
+    def carga(self, recurso: Hashable, ini: int, fin: int) -> int:
+        """Minutos ocupados de `recurso` dentro de `[ini, fin)`."""
+        if fin <= ini:
+            return 0
+        p = self._preparar(recurso)
+        return _integral(p, fin) - _integral(p, ini)
+
+
+def _integral(p: _Prefijos, x: int) -> int:
+    inicios, suma_inicios, fines, suma_fines = p
+    k_s = bisect_left(inicios, x)
+    k_e = bisect_left(fines, x)
+    return (k_s * x - suma_inicios[k_s]) - (k_e * x - suma_fines[k_e])
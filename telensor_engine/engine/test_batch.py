@@ -0,0 +1,68 @@
+import random
+
+from telensor_engine.engine.engine import (
+    calcular_interseccion,
+    restar_intervalos,
+    encontrar_slots,
+)
+from telensor_engine.engine.batch import (
+    calcular_interseccion_lote,
+    concatenar_lotes,
+    encontrar_slots_lote,
+    lote_a_listas,
+    lote_desde_listas,
+    replicar_lote,
+    restar_intervalos_lote,
+)
+
+
+def _intervalos_aleatorios(rng: random.Random, n: int, span: int = 2880):
+    res = []
+    for _ in range(n):
+        s = rng.randrange(0, span)
+        res.append([s, s + rng.randrange(1, 180)])
+    return res
+
+
+def test_restar_lote_equivale_a_escalar_por_dueno():
+    base = lote_desde_listas({0: [[540, 1020]], 1: [[1200, 1680]]})
+    ocupados = lote_desde_listas({0: [[600, 650], [700, 710]], 1: [[1300, 1330], [1500, 1560]]})
+    libres = lote_a_listas(restar_intervalos_lote(base, ocupados))
+    assert libres == {
+        0: [[540, 600], [650, 700], [710, 1020]],
+        1: [[1200, 1300], [1330, 1500], [1560, 1680]],
+    }
+
+
+def test_duenos_adyacentes_no_se_mezclan():
+    # El fin de un dueño coincide con el inicio del siguiente en el eje original
+    base = lote_desde_listas({0: [[0, 100]], 1: [[0, 100]]})
+    libres = lote_a_listas(calcular_interseccion_lote(base, replicar_lote([[50, 100]], [0, 1])))
+    assert libres == {0: [[50, 100]], 1: [[50, 100]]}
+
+
+def test_pipeline_lote_identico_al_motor_escalar():
+    rng = random.Random(20251106)
+    trabajo = {d: [[rng.randrange(300, 600), rng.randrange(900, 1300)]] for d in range(40)}
+    bloqueos = {d: _intervalos_aleatorios(rng, rng.randrange(0, 12)) for d in range(40)}
+    globales = [[700, 730]]
+    ventana = [[480, 1200]]
+    eff = [600, 1100]
+
+    bloq_lote = concatenar_lotes(lote_desde_listas(bloqueos), replicar_lote(globales, trabajo.keys()))
+    libres = restar_intervalos_lote(lote_desde_listas(trabajo), bloq_lote)
+    libres = calcular_interseccion_lote(libres, replicar_lote(ventana, trabajo.keys()))
+    duenos, inicios = encontrar_slots_lote(eff, libres, 45, 10, 5)
+    libres_por_dueno = lote_a_listas(libres)
+
+    slots_lote = {}
+    for d, ini in zip(duenos.tolist(), inicios.tolist()):
+        slots_lote.setdefault(d, []).append(ini)
+
+    for d in trabajo:
+        esperado_libres = calcular_interseccion(
+            restar_intervalos(trabajo[d], bloqueos[d] + globales), ventana
+        )
+        assert libres_por_dueno.get(d, []) == esperado_libres
+        esperado_slots = encontrar_slots(eff, esperado_libres, 45, 10, 5)
+        assert slots_lote.get(d, []) == esperado_slots
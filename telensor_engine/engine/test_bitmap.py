@@ -0,0 +1,45 @@
+import random
+
+from telensor_engine.engine.bitmap import MapaMinutos, preferir_bitmap
+from telensor_engine.engine.engine import (
+    calcular_interseccion,
+    restar_intervalos,
+    encontrar_slots,
+)
+
+
+def test_mapa_operaciones_basicas():
+    base = MapaMinutos.desde_intervalos([[540, 1020]], 480, 720)
+    libres = restar_intervalos(base, [[600, 650], [700, 710], [750, 800]])
+    assert isinstance(libres, MapaMinutos)
+    assert libres == [[540, 600], [650, 700], [710, 750], [800, 1020]]
+    assert calcular_interseccion(libres, [[690, 760]]) == [[690, 700], [710, 750]]
+
+
+def test_intervalos_fuera_del_marco_se_recortan():
+    mapa = MapaMinutos.desde_intervalos([[0, 100], [1100, 1500]], 480, 720)
+    assert mapa == [[1100, 1200]]
+
+
+def test_bitmap_identico_a_intervalos_en_pipeline():
+    rng = random.Random(99)
+    for _ in range(150):
+        ini, fin = 420, 1260
+        trabajo = [[rng.randrange(300, 700), rng.randrange(800, 1400)]]
+        bloqueos = []
+        for _ in range(rng.randrange(0, 25)):
+            s = rng.randrange(300, 1400)
+            bloqueos.append([s, s + rng.randrange(1, 90)])
+        eff = [rng.randrange(420, 700), rng.randrange(800, 1260)]
+
+        esperado = calcular_interseccion(restar_intervalos(trabajo, bloqueos), [[ini, fin]])
+        mapa = MapaMinutos.desde_intervalos(trabajo, ini, fin - ini)
+        obtenido = calcular_interseccion(restar_intervalos(mapa, bloqueos), [[ini, fin]])
+        assert obtenido == esperado
+        assert encontrar_slots(eff, obtenido, 45, 10, 5) == encontrar_slots(eff, esperado, 45, 10, 5)
+
+
+def test_preferir_bitmap_por_densidad():
+    assert preferir_bitmap(40, 720)
+    assert not preferir_bitmap(2, 720)
+    assert not preferir_bitmap(40, 30 * 1440)
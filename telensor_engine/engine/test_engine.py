@@ -1,8 +1,15 @@
+import random
+
+from telensor_engine.engine.bitmap import MapaMinutos
 from telensor_engine.engine.engine import (
     calcular_interseccion,
     restar_intervalos,
     encontrar_slots,
+    encontrar_slots_multiples,
+    intersectar_multiples,
+    iterar_slots,
 )
+from telensor_engine.engine.interval_set import IntervalSet
 
 
 def test_restar_intervalos_simples():
@@ -53,4 +60,63 @@ def test_empaquetado_con_buffer_previo():
     # El inicio de servicio (arranque+10) debe estar < 840
     assert inicios[:6] == [590, 635, 680, 725, 770, 815]
     # 860 (servicio a 870) no debe incluirse por exceder ventana efectiva
-    assert 860 not in inicios
\ No newline at end of file
+    assert 860 not in inicios
+
+def test_slots_forma_cerrada_equivale_a_saltos():
+    libres = [[540, 700], [705, 800], [830, 1020]]
+    ventana = [600, 900]
+    esperado = []
+    for libre_ini, libre_fin in libres:
+        arranque = max(libre_ini, ventana[0] - 10)
+        while arranque + 45 <= libre_fin:
+            if ventana[0] <= arranque + 10 < ventana[1]:
+                esperado.append(arranque)
+            arranque += 45
+    assert encontrar_slots(ventana, libres, 45, 10, 5) == esperado
+
+
+def test_iterar_slots_con_limit_y_after():
+    libres = [[540, 1020]]
+    todos = encontrar_slots([600, 840], libres, 45, 10, 5)
+    assert list(iterar_slots([600, 840], libres, 45, 10, 5)) == todos
+    assert list(iterar_slots([600, 840], libres, 45, 10, 5, limit=2)) == [590, 635]
+    assert list(iterar_slots([600, 840], libres, 45, 10, 5, after=635, limit=3)) == [680, 725, 770]
+    assert list(iterar_slots([600, 840], libres, 45, 10, 5, after=600)) == [635, 680, 725, 770, 815]
+
+
+def test_intersectar_multiples_equivale_a_encadenar():
+    rng = random.Random(5)
+    for _ in range(300):
+        listas = [
+            [[s, s + rng.randrange(1, 200)] for s in (rng.randrange(0, 1440) for _ in range(rng.randrange(1, 6)))]
+            for _ in range(rng.randrange(1, 5))
+        ]
+        restar = [
+            [[s, s + rng.randrange(1, 60)] for s in (rng.randrange(0, 1440) for _ in range(rng.randrange(0, 6)))]
+            for _ in range(rng.randrange(0, 3))
+        ]
+        esperado = restar_intervalos(listas[0], [])
+        for lista in listas[1:]:
+            esperado = calcular_interseccion(esperado, lista)
+        for ocupados in restar:
+            esperado = restar_intervalos(esperado, ocupados)
+        assert intersectar_multiples(listas, restar) == esperado
+        assert intersectar_multiples([IntervalSet(x) for x in listas], restar) == esperado
+    # Un mapa sólo en `restar` no debe tomarse como base del pliegue
+    mapa = MapaMinutos.desde_intervalos([[10, 20]], 0, 100)
+    assert intersectar_multiples([[[0, 100]]], [mapa]) == [[0, 10], [20, 100]]
+
+
+def test_encontrar_slots_multiples_equivale_a_busquedas_separadas():
+    rng = random.Random(9)
+    perfiles = [(80, 5, 5), (50, 5, 5), (30, 10, 0), (0, 0, 0), (45, 0, 15)]
+    for _ in range(100):
+        libres = IntervalSet(
+            [[s, s + rng.randrange(1, 240)] for s in (rng.randrange(0, 2880) for _ in range(rng.randrange(0, 10)))]
+        )
+        eff = [rng.randrange(0, 1440), rng.randrange(1440, 2880)]
+        esperado = [encontrar_slots(eff, libres, d + pre + post, pre, post) for d, pre, post in perfiles]
+        assert encontrar_slots_multiples(eff, libres, perfiles) == esperado
+        assert encontrar_slots_multiples(eff, libres.a_lista(), perfiles) == esperado
+        mapa = MapaMinutos.desde_intervalos(libres, 0, 3200)
+        assert encontrar_slots_multiples(eff, mapa, perfiles) == esperado
@@ -0,0 +1,41 @@
+import random
+
+import pytest
+
+from telensor_engine.engine.engine import calcular_interseccion, restar_intervalos
+from telensor_engine.engine.interval_set import IntervalSet
+
+
+def test_construccion_normaliza_una_vez():
+    s = IntervalSet([[700, 710], [540, 600], [590, 650], [650, 660], [800, 800]])
+    assert s.a_lista() == [[540, 660], [700, 710]]
+    assert len(s) == 2
+    assert s.total_minutos() == 130
+
+
+def test_inmutable():
+    s = IntervalSet([[0, 10]])
+    with pytest.raises(AttributeError):
+        s._datos = None
+
+
+def test_operaciones_basicas():
+    a = IntervalSet([[540, 1020]])
+    occ = IntervalSet([[600, 650], [700, 710], [750, 800]])
+    assert a.diferencia(occ) == [[540, 600], [650, 700], [710, 750], [800, 1020]]
+    assert a.interseccion([[480, 600], [1000, 1200]]) == [[540, 600], [1000, 1020]]
+    assert occ.union([[650, 700], [900, 950]]) == [[600, 710], [750, 800], [900, 950]]
+    assert occ.recortar(640, 760) == [[640, 650], [700, 710], [750, 760]]
+
+
+def test_motor_acepta_interval_set_y_coincide_con_listas():
+    rng = random.Random(7)
+    for _ in range(200):
+        a = [[s, s + rng.randrange(1, 120)] for s in (rng.randrange(0, 1440) for _ in range(rng.randrange(0, 8)))]
+        b = [[s, s + rng.randrange(1, 120)] for s in (rng.randrange(0, 1440) for _ in range(rng.randrange(0, 8)))]
+        inter = calcular_interseccion(IntervalSet(a), b)
+        resta = restar_intervalos(IntervalSet(a), IntervalSet(b))
+        assert isinstance(inter, IntervalSet) and isinstance(resta, IntervalSet)
+        assert inter == calcular_interseccion(a, b)
+        assert resta == restar_intervalos(a, b)
+        assert IntervalSet(a).recortar(300, 900) == calcular_interseccion(a, [[300, 900]])
@@ -0,0 +1,20 @@
+import random
+
+from telensor_engine.api.adapter import _sumar_minutos_interseccion
+from telensor_engine.engine.load_table import TablaCargas
+
+
+def test_carga_equivale_a_suma_de_intersecciones():
+    rng = random.Random(15)
+    fuentes = {
+        r: [[s, s + rng.randrange(-5, 200)] for s in (rng.randrange(-500, 3000) for _ in range(rng.randrange(0, 40)))]
+        for r in ("EQ1", "EQ2", "E1")
+    }
+    tabla = TablaCargas(fuentes)
+    for _ in range(500):
+        a = rng.randrange(-600, 3200)
+        b = a + rng.randrange(0, 1500)
+        for r, intervalos in fuentes.items():
+            assert tabla.carga(r, a, b) == _sumar_minutos_interseccion(intervalos, [a, b])
+    assert "EQ1" in tabla and "EQ9" not in tabla
+    assert tabla.carga("EQ9", 0, 1440) == 0
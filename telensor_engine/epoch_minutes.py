@@ -0,0 +1,57 @@
+"""
+Capa de tiempo entera: minutos desde la época Unix (UTC).
+
+El adaptador convierte ambos extremos de cada ocupación, excepción, reserva y
+bloqueo al eje continuo en cada búsqueda. Hacerlo con `pendulum.instance` /
+`pendulum.parse` + `in_timezone("UTC")` domina el costo de la búsqueda, así
+que esta capa resuelve la conversión con aritmética entera sobre `datetime`
+y un parser ISO-8601 memoizado. Pendulum queda en el borde de la API.
+
+Semántica idéntica a la ruta anterior:
+- Los `datetime` naive y las cadenas sin zona se interpretan como UTC.
+- Los segundos se truncan hacia abajo (piso), como `total_seconds() // 60`
+  sobre un origen alineado al minuto.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any
+
+import pendulum
+
+
+_EPOCA = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_EPOCA_NAIVE = datetime(1970, 1, 1)
+
+# Cadenas ISO distintas retenidas en la memo (los fixtures repiten muchas)
+MAX_CADENAS_EN_MEMO = 8192
+
+
+def minutos_epoch(valor: Any) -> int:
+    """Minuto epoch (UTC, piso) de un `datetime` o una cadena ISO-8601."""
+    if isinstance(valor, datetime):
+        return _minutos_de_datetime(valor)
+    return _minutos_de_cadena(str(valor))
+
+
+def _minutos_de_datetime(dt: datetime) -> int:
+    # timedelta normalizado: days puede ser negativo, seconds ∈ [0, 86400) → piso exacto
+    delta = dt - _EPOCA if dt.utcoffset() is not None else dt - _EPOCA_NAIVE
+    return delta.days * 1440 + delta.seconds // 60
+
+
+@lru_cache(maxsize=MAX_CADENAS_EN_MEMO)
+def _minutos_de_cadena(texto: str) -> int:
+    try:
+        dt = datetime.fromisoformat(texto)
+    except ValueError:
+        # Formatos que `fromisoformat` no admite: mismo parser que antes
+        dt = pendulum.parse(texto)
+    return _minutos_de_datetime(dt)
+
+
+def rango_en_eje(origen_epoch: int, inicio: Any, fin: Any) -> list:
+    """Intervalo `[ini, fin)` en minutos relativos a `origen_epoch`."""
+    return [minutos_epoch(inicio) - origen_epoch, minutos_epoch(fin) - origen_epoch]
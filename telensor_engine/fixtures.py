@@ -1,8 +1,100 @@
 from __future__ import annotations
 
 import json
+import threading
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
+
+
+class _DictSoloLectura(dict):
+    """dict inmutable: conserva `isinstance(x, dict)` y la serialización JSON."""
+
+    __slots__ = ()
+
+    def _solo_lectura(self, *args, **kwargs):
+        raise TypeError("escenario de solo lectura")
+
+    __setitem__ = __delitem__ = __ior__ = _solo_lectura
+    clear = pop = popitem = setdefault = update = _solo_lectura
+
+    def __reduce_ex__(self, protocol):
+        # copy/deepcopy/pickle producen un dict mutable
+        return dict, (dict(self),)
+
+
+class _ListaSoloLectura(list):
+    """list inmutable: conserva `isinstance(x, list)` y la serialización JSON."""
+
+    __slots__ = ()
+
+    def _solo_lectura(self, *args, **kwargs):
+        raise TypeError("escenario de solo lectura")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _solo_lectura
+    append = extend = insert = pop = remove = clear = sort = reverse = _solo_lectura
+
+    def __reduce_ex__(self, protocol):
+        return list, (list(self),)
+
+
+def _congelar(valor: Any) -> Any:
+    """Convierte recursivamente dicts y listas del JSON en vistas de solo lectura."""
+    if isinstance(valor, dict):
+        return _DictSoloLectura((k, _congelar(v)) for k, v in valor.items())
+    if isinstance(valor, list):
+        return _ListaSoloLectura(_congelar(v) for v in valor)
+    return valor
+
+
+def es_solo_lectura(valor: Any) -> bool:
+    """¿Es `valor` una vista congelada de un escenario? (inmutable en toda su profundidad)."""
+    return isinstance(valor, (_DictSoloLectura, _ListaSoloLectura))
+
+
+class _RegistroEscenarios:
+    """Registro de escenarios parseado una vez e indexado por id.
+
+    Recarga el archivo solo cuando cambian su mtime o su tamaño; entre
+    recargas, cada consulta cuesta un `stat` y un acceso a diccionario.
+    """
+
+    def __init__(self, ruta: Path) -> None:
+        self._ruta = ruta
+        self._lock = threading.Lock()
+        self._firma: Optional[Tuple[int, int]] = None
+        self._escenarios: Dict[str, Any] = {}
+
+    def obtener(self, scenario_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            st = self._ruta.stat()
+        except OSError:
+            return None
+        firma = (st.st_mtime_ns, st.st_size)
+        if firma != self._firma:
+            with self._lock:
+                if firma != self._firma:
+                    self._recargar(firma)
+        return self._escenarios.get(scenario_id)
+
+    def _recargar(self, firma: Tuple[int, int]) -> None:
+        try:
+            with self._ruta.open("r", encoding="utf-8") as f:
+                payload = json.load(f)
+            escenarios = payload.get("scenarios", {}) or {}
+            self._escenarios = {sid: _congelar(esc) for sid, esc in escenarios.items()}
+        except Exception:
+            # Archivo inválido o en escritura: sin escenarios hasta el próximo cambio
+            self._escenarios = {}
+        self._firma = firma
+
+    def invalidar(self) -> None:
+        with self._lock:
+            self._firma = None
+            self._escenarios = {}
+
+
+# Determinar raíz del proyecto (uno arriba del paquete)
+_REGISTRO = _RegistroEscenarios(Path(__file__).resolve().parent.parent / "docs" / "test_scenarios.json")
 
 
 def load_scenario(scenario_id: str) -> Optional[Dict[str, Any]]:
@@ -14,21 +106,15 @@ def load_scenario(scenario_id: str) -> Optional[Dict[str, Any]]:
         "id": {
           "servicios": { "SVC1": {"duracion": int, "buffer_previo": int, "buffer_posterior": int} },
           "empleados": [ {"empleado_id": str, "horario_trabajo": [ini_min, fin_min]} ],
+          # Alternativa a horario_trabajo: "horario_semanal" (ver telensor_engine.schedules)
           "equipos": [ {"equipo_id": str} ],
           "ocupaciones": [ {"empleado_id": str, "inicio": iso_datetime, "fin": iso_datetime} ]
         }
       }
     }
+
+    El archivo se parsea una sola vez y se recarga solo si cambian su mtime o
+    tamaño. Devuelve una vista de solo lectura compartida entre llamadas
+    (dicts y listas que rechazan mutaciones); copiar antes de modificar.
     """
-    # Determinar raíz del proyecto (uno arriba del paquete)
-    root = Path(__file__).resolve().parent.parent  # /.../Telensor
-    scenarios_path = root / "docs" / "test_scenarios.json"
-    if not scenarios_path.exists():
-        return None
-    try:
-        with scenarios_path.open("r", encoding="utf-8") as f:
-            payload = json.load(f)
-        scenarios = payload.get("scenarios", {})
-        return scenarios.get(scenario_id)
-    except Exception:
-        return None
\ No newline at end of file
+    return _REGISTRO.obtener(scenario_id)
@@ -4,6 +4,7 @@ from typing import Optional, List
 from datetime import datetime
 import pendulum
 import logging
+import os
 from enum import Enum
 
 from .engine.engine import (
@@ -17,14 +18,39 @@ from .mock_db import (
     get_ocupaciones,
 )
 from .fixtures import load_scenario
+from .mock_state import activar_durabilidad, usar_repositorio
+from .sqlite_store import RepositorioSQLite
+from .providers import ProveedorSincrono
 from .api.adapter import build_total_blockings
-from .api.adapter import gestionar_busqueda_disponibilidad
-from .api.adapter import gestionar_creacion_reserva
+from .api.adapter import gestionar_busqueda_disponibilidad_async
+from .api.adapter import gestionar_creacion_reserva_async
 from .api.adapter import gestionar_creacion_bloqueo
 
 app = FastAPI(title="Telensor Engine API", version="0.1.0")
 logging.basicConfig(level=logging.INFO)
 
+# Durabilidad local opcional: con TELENSOR_DATA_DIR el estado se recupera al
+# arrancar y cada escritura pasa por el log (TELENSOR_FSYNC: siempre|intervalo|nunca)
+if os.environ.get("TELENSOR_DATA_DIR"):
+    activar_durabilidad(
+        os.environ["TELENSOR_DATA_DIR"],
+        politica_fsync=os.environ.get("TELENSOR_FSYNC", "siempre"),
+    )
+
+# Repositorio SQLite opcional: con TELENSOR_SQLITE las reservas y bloqueos se
+# guardan en ese archivo en lugar del estado en memoria
+if os.environ.get("TELENSOR_SQLITE"):
+    usar_repositorio(RepositorioSQLite(os.environ["TELENSOR_SQLITE"]))
+
+
+def _proveedor_datos() -> ProveedorSincrono:
+    """Fuente de datos de dominio de cada solicitud (funciones de `mock_db`).
+
+    Se construye por solicitud para respetar los reemplazos de esas funciones
+    en el módulo (pruebas).
+    """
+    return ProveedorSincrono(get_servicio, get_horarios_empleados, get_ocupaciones)
+
 
 class ServiceWindowPolicy(str, Enum):
     """Política sobre cómo aplicar el horario de atención del servicio.
@@ -36,6 +62,17 @@ class ServiceWindowPolicy(str, Enum):
     full_slot = "full_slot"
 
 
+class MotorIntervalos(str, Enum):
+    """Backend de álgebra de intervalos usado por la búsqueda.
+
+    - intervalos: listas normalizadas de intervalos (IntervalSet).
+    - bitmap: mapa de bits por minuto sobre la ventana de búsqueda (agendas densas).
+    - auto: se elige según la densidad de bloqueos por empleado.
+    Todos producen exactamente los mismos slots.
+    """
+    intervalos = "intervalos"
+    bitmap = "bitmap"
+    auto = "auto"
 
 
 class SolicitudDisponibilidad(BaseModel):
@@ -54,6 +91,7 @@ class SolicitudDisponibilidad(BaseModel):
     fecha_fin_utc: datetime
     scenario_id: Optional[str] = None
     service_window_policy: ServiceWindowPolicy = ServiceWindowPolicy.start_only
+    motor_intervalos: MotorIntervalos = MotorIntervalos.auto
 
     # Pydantic v2: usar ConfigDict para eliminar advertencia de clase Config
     model_config = ConfigDict(extra="forbid")
@@ -163,12 +201,7 @@ async def buscar_disponibilidad(solicitud: SolicitudDisponibilidad) -> Respuesta
 
     # Delegación al Gerente: toda la lógica pesada vive en el adaptador.
     try:
-        resultados_dict = gestionar_busqueda_disponibilidad(
-            solicitud,
-            get_servicio_fn=get_servicio,
-            get_horarios_empleados_fn=get_horarios_empleados,
-            get_ocupaciones_fn=get_ocupaciones,
-        )
+        resultados_dict = await gestionar_busqueda_disponibilidad_async(solicitud, proveedor=_proveedor_datos())
     except ValueError as e:
         # Mapear errores de validación del Gerente a HTTP 400 para el cliente
         raise HTTPException(status_code=400, detail=str(e))
@@ -360,12 +393,7 @@ async def crear_reserva(solicitud: SolicitudReserva) -> ReservaCreada:
         raise HTTPException(status_code=400, detail="Rango de fechas inválido para la reserva")
 
     try:
-        creada = gestionar_creacion_reserva(
-            solicitud,
-            get_servicio_fn=get_servicio,
-            get_horarios_empleados_fn=get_horarios_empleados,
-            get_ocupaciones_fn=get_ocupaciones,
-        )
+        creada = await gestionar_creacion_reserva_async(solicitud, proveedor=_proveedor_datos())
     except ValueError as e:
         msg = str(e)
         if "Conflicto" in msg or "conflicto" in msg:
@@ -5,9 +5,23 @@ Este módulo mantiene un estado en memoria seguro para pruebas locales,
 con funciones utilitarias para agregar, listar y resetear reservas.
 
 Notas de diseño:
-- Las reservas se almacenan con tiempos en UTC (datetime aware).
-- Se provee un candado (Lock) para proteger escrituras concurrentes.
+- Las reservas viven en un almacén columnar (`AlmacenReservas`): minutos
+  epoch e ids internados en arreglos paralelos. `Reserva` es una vista sobre
+  una fila que expone tiempos en UTC (datetime aware) al leerlos.
+- Las escrituras de reservas toman candados por franjas (lock striping) de
+  su empleado y su equipo, en orden ascendente de franja para evitar
+  interbloqueos: reservas sobre recursos distintos avanzan en paralelo.
 - Se expone un chequeo de solapamiento simple para anti-colisión.
+- Un índice incremental por recurso (`IndiceOcupacion`) se actualiza en cada
+  escritura y permite consultar ocupación por rango sin recorrer todo el estado.
+- Repositorio opcional (`usar_repositorio`): con uno activo (p. ej.
+  `sqlite_store.RepositorioSQLite`), las funciones públicas de reservas y
+  bloqueos delegan en sus métodos homónimos en lugar del estado en memoria.
+- Durabilidad opcional (`activar_durabilidad`): cada alta o actualización se
+  encola en un log de escritura anticipada bajo los candados de la escritura
+  (eso fija el orden del log) y se confirma en grupo fuera de ellos; las
+  instantáneas periódicas acotan el log a reproducir al arrancar. Si el log
+  falla, el estado pasa a solo lectura (las escrituras lanzan OSError).
 
 IMPORTANTE: En producción esto se reemplazará por una base de datos
 real con garantías de concurrencia. Esta implementación está enfocada
@@ -16,78 +30,272 @@ en pruebas y E2E locales del Sprint.
 
 from __future__ import annotations
 
+import functools
+import gc
+import logging
 import threading
-from dataclasses import dataclass
+import time
+from array import array
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+from telensor_engine import write_ahead_log as wal
+from telensor_engine.epoch_minutes import minutos_epoch
+from telensor_engine.occupancy_index import IndiceOcupacion
+from telensor_engine.reservation_store import (
+    AlmacenReservas,
+    Reserva,
+    microsegundos_epoch,
+    minuto_exacto,
+    minuto_techo,
+)
+
+logger = logging.getLogger(__name__)
+
+# Candados por franjas: cada recurso (empleado o equipo) cae en una franja fija.
+# Una escritura toma solo las franjas de sus recursos, siempre en orden ascendente.
+N_FRANJAS = 64
+_FRANJAS = tuple(threading.Lock() for _ in range(N_FRANJAS))
+# Secciones cortas sobre estructuras compartidas por todas las reservas (alta de
+# filas en el almacén y filtros por rango sobre sus columnas). Se toma después de las franjas.
+_lock_registro = threading.Lock()
+# Escrituras de bloqueos operativos (independientes de las reservas)
+_lock_bloqueos = threading.Lock()
+# Una instantánea a la vez
+_lock_instantanea = threading.Lock()
+# Instantánea en segundo plano ya lanzada (una sola por cruce del umbral)
+_lock_programacion = threading.Lock()
+_instantanea_programada = False
+
+
+@contextmanager
+def _detener_escrituras() -> Iterator[None]:
+    """Toma todas las franjas (en orden) y luego los candados compartidos."""
+    for franja in _FRANJAS:
+        franja.acquire()
+    try:
+        with _lock_registro, _lock_bloqueos:
+            yield
+    finally:
+        for franja in reversed(_FRANJAS):
+            franja.release()
+
+
+@contextmanager
+def _bloquear_recursos(*recursos: Tuple[str, Optional[str]]) -> Iterator[None]:
+    """Toma las franjas de los recursos indicados en orden ascendente (sin duplicados).
+
+    Los recursos con id None (p. ej. reserva sin equipo) no toman franja.
+    """
+    franjas = sorted({hash(r) % N_FRANJAS for r in recursos if r[1] is not None})
+    for i in franjas:
+        _FRANJAS[i].acquire()
+    try:
+        yield
+    finally:
+        for i in reversed(franjas):
+            _FRANJAS[i].release()
 
 
-# Candado global para operaciones de escritura
-_lock = threading.Lock()
+class ConflictoVersion(ValueError):
+    """La reserva cambió desde que se leyó: `expected_version` ya no coincide."""
 
 
-@dataclass
-class Reserva:
-    """Representa una reserva creada en el sistema.
+# Estado en memoria
+MOCK_RESERVAS = AlmacenReservas()
+MOCK_INACTIVIDADES: List[Dict[str, Any]] = []  # Espacio para inactividades futuras
+MOCK_BLOQUEOS: List[Dict[str, Any]] = []  # Bloqueos operativos (business/employee/equipment/service)
 
-    Atributos:
-    - reserva_id: identificador único de la reserva
-    - servicio_id: id del servicio reservado
-    - empleado_id: id del empleado asignado
-    - equipo_id: id del equipo asignado (opcional)
-    - inicio_slot: inicio del slot del servicio (UTC)
-    - fin_slot: fin del slot del servicio (UTC)
-    - creada_en: timestamp de creación (UTC)
-    - version: número de versión para futuras estrategias de concurrencia
-    """
+# Índice de ocupación por recurso:
+# - ("empleado", id) / ("equipo", id): filas de las reservas asignadas al recurso,
+#   con extremos en minutos epoch.
+# - ("global", None): bloqueos operativos ordenados en el tiempo.
+# - ("bloqueo", scope): bloqueos de un alcance; ("bloqueo", scope, id): los que
+#   nombran a ese empleado/equipo/servicio (id None: sin IDs, aplican a todos).
+_INDICE = IndiceOcupacion()
+# Fila -> orden de su nodo en el árbol del empleado / del equipo (0 = sin nodo).
+# Con el inicio de la fila forman la clave para reindexar en update_reserva.
+_ORDEN_EN_EMPLEADO = array("q")
+_ORDEN_EN_EQUIPO = array("q")
+# bloqueo id -> posición de inserción (desempate del orden temporal en consultas)
+_ORDEN_BLOQUEO: Dict[str, int] = {}
 
-    reserva_id: str
-    servicio_id: str
-    empleado_id: str
-    equipo_id: Optional[str]
-    inicio_slot: datetime
-    fin_slot: datetime
-    creada_en: datetime
-    estado: str = "confirmada"
-    scenario_id: Optional[str] = None
-    version: int = 1
+# Log de escritura anticipada (None: sin durabilidad) y su configuración
+_WAL: Optional[wal.RegistroEscritura] = None
+_DIRECTORIO_DATOS: Optional[Path] = None
+_REGISTROS_POR_INSTANTANEA: Optional[int] = None
 
+# Repositorio externo en el que delegan las funciones públicas (None: estado en memoria)
+_REPOSITORIO: Optional[Any] = None
 
-# Estado en memoria
-MOCK_RESERVAS: List[Reserva] = []
-MOCK_INACTIVIDADES: List[Dict[str, Any]] = []  # Espacio para inactividades futuras
-MOCK_BLOQUEOS: List[Dict[str, Any]] = []  # Bloqueos operativos (business/employee/equipment/service)
+# Alcance -> campo con los IDs a los que aplica (también lo usan los repositorios externos)
+CAMPOS_ALCANCE = {"employee": "empleado_ids", "equipment": "equipo_ids", "service": "servicio_ids"}
+
+
+_F = TypeVar("_F", bound=Callable[..., Any])
 
 
+def _delegable(fn: _F) -> _F:
+    """Con un repositorio activo, la función delega en su método del mismo nombre."""
+    nombre = fn.__name__
+
+    @functools.wraps(fn)
+    def envoltura(*args: Any, **kwargs: Any) -> Any:
+        repositorio = _REPOSITORIO
+        if repositorio is not None:
+            return getattr(repositorio, nombre)(*args, **kwargs)
+        return fn(*args, **kwargs)
+
+    return envoltura  # type: ignore[return-value]
+
+
+def usar_repositorio(repositorio: Optional[Any]) -> None:
+    """Activa un repositorio externo con la interfaz de este módulo (None: volver a memoria).
+
+    El repositorio debe implementar `reset_state`, `get_reserva`, `list_reservas`,
+    `get_reservas_en_rango`, `get_reservas_recurso_en_rango`, `has_conflict`,
+    `add_reserva`, `update_reserva`, `add_bloqueo`, `get_bloqueos_en_rango`,
+    `get_bloqueos_por_alcance` y `get_bloqueos_intersecting`.
+    """
+    global _REPOSITORIO
+    _REPOSITORIO = repositorio
+
+
+@_delegable
 def reset_state() -> None:
-    """Resetea el estado de memoria (reservas e inactividades)."""
-    global MOCK_RESERVAS, MOCK_INACTIVIDADES, MOCK_BLOQUEOS
-    with _lock:
-        MOCK_RESERVAS = []
-        MOCK_INACTIVIDADES = []
-        MOCK_BLOQUEOS = []
+    """Resetea el estado de memoria (reservas e inactividades).
+
+    Si había durabilidad activa, la desactiva; los archivos de datos no se tocan.
+    """
+    desactivar_durabilidad()
+    with _detener_escrituras():
+        _instalar_estado(AlmacenReservas(), [])
+
+
+def _instalar_estado(almacen: AlmacenReservas, bloqueos: List[Dict[str, Any]]) -> None:
+    """Reemplaza el estado y reconstruye los índices (con las escrituras detenidas)."""
+    global MOCK_RESERVAS, MOCK_INACTIVIDADES, MOCK_BLOQUEOS, _INDICE, _ORDEN_BLOQUEO
+    global _ORDEN_EN_EMPLEADO, _ORDEN_EN_EQUIPO
+    MOCK_RESERVAS = almacen
+    MOCK_INACTIVIDADES = []
+    MOCK_BLOQUEOS = []
+    _INDICE = IndiceOcupacion()
+    _ORDEN_BLOQUEO = {}
+    _ORDEN_EN_EMPLEADO = array("q", bytes(8 * len(almacen)))
+    _ORDEN_EN_EQUIPO = array("q", bytes(8 * len(almacen)))
+    # Árboles de reservas cargados en lote: O(n) por recurso en lugar de n inserciones
+    for tipo, ordenes in (("empleado", _ORDEN_EN_EMPLEADO), ("equipo", _ORDEN_EN_EQUIPO)):
+        destino = np.frombuffer(ordenes, dtype=np.int64)
+        for recurso_id, filas in almacen.filas_por_recurso(tipo):
+            if not recurso_id:
+                continue
+            secuencia = np.arange(1, len(filas) + 1)
+            destino[filas] = secuencia
+            inicios, fines = almacen.rangos_minutos(filas)
+            _INDICE.cargar((tipo, recurso_id), zip(inicios, secuencia.tolist(), fines, filas.tolist()))
+        del destino
+    for rec in bloqueos:
+        _ORDEN_BLOQUEO[rec["id"]] = len(MOCK_BLOQUEOS)
+        MOCK_BLOQUEOS.append(rec)
+        bi, bf = rec.get("inicio_utc"), rec.get("fin_utc")
+        if isinstance(bi, datetime) and isinstance(bf, datetime):
+            _indexar_bloqueo(rec, bi, bf)
+
+
+def _indexar_reserva(fila: int) -> None:
+    """Registra la fila en los árboles de su empleado y equipo (bajo sus franjas)."""
+    ini, fin = MOCK_RESERVAS.rango_minutos(fila)
+    _, orden = _INDICE.agregar(("empleado", MOCK_RESERVAS.empleado_id(fila)), ini, fin, fila)
+    _ORDEN_EN_EMPLEADO[fila] = orden
+    equipo_id = MOCK_RESERVAS.equipo_id(fila)
+    if equipo_id:
+        _, orden = _INDICE.agregar(("equipo", equipo_id), ini, fin, fila)
+        _ORDEN_EN_EQUIPO[fila] = orden
 
 
-def _gen_reserva_id() -> str:
-    ts = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S%f")
-    return f"R-{ts}-{len(MOCK_RESERVAS) + 1}"
+def _desindexar_reserva(fila: int) -> None:
+    ini = MOCK_RESERVAS.rango_minutos(fila)[0]
+    if _ORDEN_EN_EMPLEADO[fila]:
+        _INDICE.quitar(("empleado", MOCK_RESERVAS.empleado_id(fila)), (ini, _ORDEN_EN_EMPLEADO[fila]))
+        _ORDEN_EN_EMPLEADO[fila] = 0
+    if _ORDEN_EN_EQUIPO[fila]:
+        _INDICE.quitar(("equipo", MOCK_RESERVAS.equipo_id(fila)), (ini, _ORDEN_EN_EQUIPO[fila]))
+        _ORDEN_EN_EQUIPO[fila] = 0
+
+
+def _rango_consulta(inicio_dt: datetime, fin_dt: datetime) -> Tuple[int, int]:
+    """[inicio_dt, fin_dt) en minutos epoch: piso del inicio y techo del fin.
+
+    Las reservas están alineadas al minuto, así que el solape con el rango
+    redondeado coincide con el solape con el rango original.
+    """
+    return minutos_epoch(inicio_dt), minuto_techo(fin_dt)
+
 
+def _vistas(almacen: AlmacenReservas, filas: List[int]) -> List[Reserva]:
+    return [Reserva(almacen, fila) for fila in filas]
 
+
+@_delegable
+def get_reserva(reserva_id: str) -> Optional[Reserva]:
+    """Reserva por id (O(1)), o None si no existe."""
+    almacen = MOCK_RESERVAS
+    fila = almacen.fila_de_id(reserva_id)
+    return None if fila is None else Reserva(almacen, fila)
+
+
+@_delegable
 def list_reservas() -> List[Reserva]:
-    """Devuelve una copia superficial de las reservas actuales."""
+    """Devuelve las vistas de las reservas actuales, en orden de inserción."""
     return list(MOCK_RESERVAS)
 
 
+@_delegable
 def get_reservas_en_rango(inicio_dt: datetime, fin_dt: datetime) -> List[Reserva]:
-    """Obtiene reservas que se solapan con el rango [inicio_dt, fin_dt]."""
-    solapadas: List[Reserva] = []
-    for r in MOCK_RESERVAS:
-        # Solapamiento si inicio < fin_reserva y fin > inicio_reserva
-        if inicio_dt < r.fin_slot and fin_dt > r.inicio_slot:
-            solapadas.append(r)
-    return solapadas
+    """Obtiene reservas que se solapan con el rango [inicio_dt, fin_dt).
+
+    Filtra vectorizado sobre las columnas de minutos del almacén y devuelve
+    las solapadas en orden de inserción; solo ellas se materializan como vistas.
+    """
+    ini, fin = _rango_consulta(inicio_dt, fin_dt)
+    almacen = MOCK_RESERVAS
+    # El filtro exporta las columnas: ninguna alta puede agrandarlas mientras tanto
+    with _lock_registro:
+        filas = almacen.filas_solapadas(ini, fin)
+    return _vistas(almacen, filas)
 
 
+@_delegable
+def get_reservas_recurso_en_rango(
+    *,
+    empleado_id: Optional[str] = None,
+    equipo_id: Optional[str] = None,
+    inicio_dt: datetime,
+    fin_dt: datetime,
+) -> List[Reserva]:
+    """Reservas de un empleado o de un equipo que se solapan con [inicio_dt, fin_dt).
+
+    Consulta el índice por recurso en O(log n + k). Indicar exactamente uno de
+    `empleado_id` o `equipo_id`.
+    """
+    if (empleado_id is None) == (equipo_id is None):
+        raise ValueError("Indicar exactamente uno de empleado_id o equipo_id")
+    recurso = ("empleado", empleado_id) if empleado_id is not None else ("equipo", equipo_id)
+    almacen = MOCK_RESERVAS
+    return _vistas(almacen, _INDICE.consultar(recurso, *_rango_consulta(inicio_dt, fin_dt)))
+
+
+@_delegable
+def get_bloqueos_en_rango(inicio_dt: datetime, fin_dt: datetime) -> List[Dict[str, Any]]:
+    """Bloqueos operativos que se solapan con [inicio_dt, fin_dt), vía índice temporal."""
+    return _INDICE.consultar(("global", None), inicio_dt, fin_dt)
+
+
+@_delegable
 def has_conflict(
     *,
     empleado_id: str,
@@ -99,17 +307,16 @@ def has_conflict(
 
     La política es conservadora: cualquier solapamiento en el mismo empleado
     o, si se especifica, en el mismo equipo, se considera conflicto.
+
+    Recorre solo el árbol del empleado y se detiene en el primer solape que
+    coincide, por lo que no depende del total de reservas almacenadas.
     """
-    for r in MOCK_RESERVAS:
-        if r.empleado_id != empleado_id:
-            continue
-        if equipo_id is not None and r.equipo_id != equipo_id:
-            continue
-        if inicio_dt < r.fin_slot and fin_dt > r.inicio_slot:
-            return True
-    return False
+    almacen = MOCK_RESERVAS
+    predicado = None if equipo_id is None else (lambda fila: almacen.equipo_id(fila) == equipo_id)
+    return _INDICE.alguno(("empleado", empleado_id), *_rango_consulta(inicio_dt, fin_dt), predicado)
 
 
+@_delegable
 def add_reserva(
     *,
     servicio_id: str,
@@ -121,12 +328,15 @@ def add_reserva(
 ) -> Reserva:
     """Agrega una reserva al estado si no existe conflicto.
 
-    Lanza ValueError si existe conflicto o si el rango es inválido.
+    Lanza ValueError si existe conflicto, si el rango es inválido o si sus
+    extremos no están alineados al minuto (el almacén guarda minutos epoch).
     """
     if fin_slot <= inicio_slot:
         raise ValueError("Rango de tiempo inválido para la reserva")
+    inicio_min, fin_min = minuto_exacto(inicio_slot), minuto_exacto(fin_slot)
 
-    with _lock:
+    # El chequeo y el alta se serializan solo con otras escrituras sobre el mismo empleado/equipo
+    with _bloquear_recursos(("empleado", empleado_id), ("equipo", equipo_id)):
         if has_conflict(
             empleado_id=empleado_id,
             equipo_id=equipo_id,
@@ -134,45 +344,93 @@ def add_reserva(
             fin_dt=fin_slot,
         ):
             raise ValueError("Conflicto: el slot ya no está disponible")
-
-        reserva = Reserva(
-            reserva_id=_gen_reserva_id(),
-            servicio_id=servicio_id,
-            empleado_id=empleado_id,
-            equipo_id=equipo_id,
-            inicio_slot=inicio_slot,
-            fin_slot=fin_slot,
-            creada_en=datetime.now(timezone.utc),
-            scenario_id=scenario_id,
-        )
-        MOCK_RESERVAS.append(reserva)
-        return reserva
-
-
+        _exigir_escritura()
+
+        almacen = MOCK_RESERVAS
+        with _lock_registro:
+            _ORDEN_EN_EMPLEADO.append(0)
+            _ORDEN_EN_EQUIPO.append(0)
+            alta = {
+                "servicio_id": servicio_id,
+                "empleado_id": empleado_id,
+                "equipo_id": equipo_id,
+                "inicio_min": inicio_min,
+                "fin_min": fin_min,
+                "creada_us": microsegundos_epoch(datetime.now(timezone.utc)),
+                "scenario_id": scenario_id,
+            }
+            fila = almacen.agregar(**alta)
+            # En el log, las altas quedan en el mismo orden que sus filas
+            ticket = _anotar({"op": "alta_reserva", "fila": fila, **alta})
+        _indexar_reserva(fila)
+    _confirmar(ticket)
+    return Reserva(almacen, fila)
+
+
+@_delegable
 def update_reserva(
     *,
     reserva_id: str,
     empleado_id: Optional[str] = None,
     equipo_id: Optional[str] = None,
     estado: Optional[str] = None,
+    expected_version: Optional[int] = None,
 ) -> Optional[Reserva]:
-    """Actualiza campos de una reserva existente.
-
-    Si no se encuentra, retorna None.
-    """
-    with _lock:
-        for r in MOCK_RESERVAS:
-            if r.reserva_id == reserva_id:
-                if empleado_id is not None:
-                    r.empleado_id = empleado_id
-                if equipo_id is not None:
-                    r.equipo_id = equipo_id
-                if estado is not None:
-                    r.estado = estado
-                return r
-    return None
+    """Actualiza campos de una reserva existente e incrementa su `version`.
 
+    Si no se encuentra, retorna None. Con `expected_version`, la escritura es
+    compare-and-swap: lanza `ConflictoVersion` si la versión vigente difiere,
+    de modo que quien planificó sobre una lectura previa pueda reintentar.
 
+    Toma las franjas de los recursos actuales y de los nuevos. Si otra
+    escritura reasignó la reserva mientras se esperaban, se reintenta con
+    los recursos vigentes.
+    """
+    almacen = MOCK_RESERVAS
+    fila = almacen.fila_de_id(reserva_id)
+    if fila is None:
+        return None
+    r = Reserva(almacen, fila)
+    while True:
+        previos = (r.empleado_id, r.equipo_id)
+        with _bloquear_recursos(
+            ("empleado", previos[0]),
+            ("equipo", previos[1]),
+            ("empleado", empleado_id),
+            ("equipo", equipo_id),
+        ):
+            if (r.empleado_id, r.equipo_id) != previos:
+                continue
+            if expected_version is not None and r.version != expected_version:
+                raise ConflictoVersion(
+                    f"Conflicto de versión: reserva {reserva_id} en v{r.version}, se esperaba v{expected_version}"
+                )
+            _exigir_escritura()
+            reindexar = (empleado_id is not None and empleado_id != r.empleado_id) or (
+                equipo_id is not None and equipo_id != r.equipo_id
+            )
+            if reindexar:
+                _desindexar_reserva(fila)
+            almacen.actualizar(fila, empleado_id=empleado_id, equipo_id=equipo_id, estado=estado)
+            if reindexar:
+                _indexar_reserva(fila)
+            # Estado resultante completo: reproducir el registro es idempotente
+            ticket = _anotar(
+                {
+                    "op": "actualiza_reserva",
+                    "fila": fila,
+                    "empleado_id": r.empleado_id,
+                    "equipo_id": r.equipo_id,
+                    "estado": r.estado,
+                    "version": r.version,
+                }
+            )
+        break
+    _confirmar(ticket)
+    return r
+
+
+@_delegable
 def add_bloqueo(bloqueo: Dict[str, Any]) -> Dict[str, Any]:
     """Agrega un bloqueo operativo en memoria.
 
@@ -180,14 +438,66 @@ def add_bloqueo(bloqueo: Dict[str, Any]) -> Dict[str, Any]:
     scope ("business"|"employee"|"equipment"|"service"), y listas opcionales
     empleado_ids, equipo_ids, servicio_ids.
     """
-    with _lock:
+    with _lock_bloqueos:
+        _exigir_escritura()
         bloqueo_id = f"B-{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S%f')}-{len(MOCK_BLOQUEOS)+1}"
         rec = dict(bloqueo)
         rec["id"] = bloqueo_id
+        # Se anota antes de aplicar: un bloqueo que no se puede serializar no entra al estado
+        ticket = _anotar({"op": "bloqueo", "bloqueo": rec})
+        _ORDEN_BLOQUEO[bloqueo_id] = len(MOCK_BLOQUEOS)
         MOCK_BLOQUEOS.append(rec)
-        return rec
+        bi, bf = rec.get("inicio_utc"), rec.get("fin_utc")
+        if isinstance(bi, datetime) and isinstance(bf, datetime):
+            _indexar_bloqueo(rec, bi, bf)
+    _confirmar(ticket)
+    return rec
+
+
+def _indexar_bloqueo(rec: Dict[str, Any], bi: datetime, bf: datetime) -> None:
+    """Registra el bloqueo en el árbol global, el de su alcance y uno por ID nombrado (bajo `_lock_bloqueos`)."""
+    _INDICE.agregar(("global", None), bi, bf, rec)
+    scope = str(rec.get("scope", "")).lower()
+    _INDICE.agregar(("bloqueo", scope), bi, bf, rec)
+    campo = CAMPOS_ALCANCE.get(scope)
+    if campo:
+        for objetivo in dict.fromkeys(rec.get(campo, []) or []) or [None]:
+            _INDICE.agregar(("bloqueo", scope, objetivo), bi, bf, rec)
+
+
+@_delegable
+def get_bloqueos_por_alcance(
+    inicio_dt: datetime,
+    fin_dt: datetime,
+    *,
+    empleado_ids: Optional[List[str]] = None,
+    equipo_ids: Optional[List[str]] = None,
+    servicio_ids: Optional[List[str]] = None,
+) -> Dict[str, Dict[Optional[str], List[Dict[str, Any]]]]:
+    """Bloqueos que se solapan con [inicio_dt, fin_dt), agrupados por alcance y objetivo.
+
+    Consulta solo los árboles de los IDs pedidos, así que los bloqueos de otros
+    recursos o fuera de la ventana no se recorren. Retorna
+    `{"business": {None: [...]}, "employee": {id: [...], None: [...]}, ...}`,
+    donde la clave None agrupa los bloqueos sin IDs (aplican a todo el alcance).
+    Un alcance sin IDs pedidos queda vacío.
+    """
+    res: Dict[str, Dict[Optional[str], List[Dict[str, Any]]]] = {
+        "business": {None: _INDICE.consultar(("bloqueo", "business"), inicio_dt, fin_dt)}
+    }
+    pedidos = {"employee": empleado_ids, "equipment": equipo_ids, "service": servicio_ids}
+    for scope, ids in pedidos.items():
+        grupo: Dict[Optional[str], List[Dict[str, Any]]] = {}
+        if ids:
+            for objetivo in [None, *dict.fromkeys(ids)]:
+                encontrados = _INDICE.consultar(("bloqueo", scope, objetivo), inicio_dt, fin_dt)
+                if encontrados:
+                    grupo[objetivo] = encontrados
+        res[scope] = grupo
+    return res
 
 
+@_delegable
 def get_bloqueos_intersecting(
     inicio_dt: datetime,
     fin_dt: datetime,
@@ -200,49 +510,218 @@ def get_bloqueos_intersecting(
     Los bloqueos con scope="business" siempre aplican.
     """
     recursos = recursos or {}
-    empleados = set(recursos.get("empleado_ids", []) or [])
-    equipos = set(recursos.get("equipo_ids", []) or [])
-    servicios = set(recursos.get("servicio_ids", []) or [])
-
-    res: List[Dict[str, Any]] = []
-    for b in list(MOCK_BLOQUEOS):
-        bi = b.get("inicio_utc")
-        bf = b.get("fin_utc")
-        if not isinstance(bi, datetime) or not isinstance(bf, datetime):
-            continue
-        # Solapamiento temporal
-        if not (inicio_dt < bf and fin_dt > bi):
-            continue
-        sc = str(b.get("scope", "")).lower()
-        if sc == "business":
-            res.append(b)
-            continue
-        if sc == "employee":
-            ids = set(b.get("empleado_ids", []) or [])
-            if not ids:
-                continue
-            if not empleados:
-                # Si no se especifican recursos, consideramos que aplica
-                res.append(b)
-            elif ids & empleados:
-                res.append(b)
-            continue
-        if sc == "equipment":
-            ids = set(b.get("equipo_ids", []) or [])
-            if not ids:
-                continue
-            if not equipos:
-                res.append(b)
-            elif ids & equipos:
-                res.append(b)
-            continue
-        if sc == "service":
-            ids = set(b.get("servicio_ids", []) or [])
-            if not ids:
-                continue
-            if not servicios:
-                res.append(b)
-            elif ids & servicios:
-                res.append(b)
-            continue
-    return res
+    pedidos = {
+        "employee": recursos.get("empleado_ids", []) or [],
+        "equipment": recursos.get("equipo_ids", []) or [],
+        "service": recursos.get("servicio_ids", []) or [],
+    }
+
+    # Solo se indexan bloqueos con extremos datetime y solapados en el tiempo
+    res: Dict[str, Dict[str, Any]] = {}
+    for b in _INDICE.consultar(("bloqueo", "business"), inicio_dt, fin_dt):
+        res[b["id"]] = b
+    for scope, ids in pedidos.items():
+        campo = CAMPOS_ALCANCE[scope]
+        if not ids:
+            # Si no se especifican recursos, aplica todo bloqueo del alcance que nombre IDs
+            candidatos = (b for b in _INDICE.consultar(("bloqueo", scope), inicio_dt, fin_dt) if b.get(campo))
+        else:
+            candidatos = (
+                b for objetivo in dict.fromkeys(ids) for b in _INDICE.consultar(("bloqueo", scope, objetivo), inicio_dt, fin_dt)
+            )
+        for b in candidatos:
+            res.setdefault(b["id"], b)
+    # Mismo orden que el árbol temporal: inicio y luego inserción
+    return sorted(res.values(), key=lambda b: (b["inicio_utc"], _ORDEN_BLOQUEO[b["id"]]))
+
+
+# Durabilidad (log de escritura anticipada + instantáneas)
+
+_Ticket = Optional[Tuple[wal.RegistroEscritura, int]]
+
+
+def _exigir_escritura() -> None:
+    """Rechaza escrituras si el log activo falló (bajo los candados, antes de aplicar nada).
+
+    Una escritura ya aplicada cuyo registro no llegó al disco sigue visible en
+    memoria hasta el reinicio; con el estado en solo lectura, nadie construye
+    sobre ella.
+    """
+    registro_wal = _WAL
+    if registro_wal is not None and registro_wal.fallido:
+        raise OSError("Estado en solo lectura: el log de escritura anticipada falló")
+
+
+def _anotar(registro: Dict[str, Any]) -> _Ticket:
+    """Encola `registro` en el log activo (bajo los candados de la escritura)."""
+    registro_wal = _WAL
+    if registro_wal is None:
+        return None
+    return registro_wal, registro_wal.anotar(registro)
+
+
+def _confirmar(ticket: _Ticket) -> None:
+    """Espera a que el registro sea durable (fuera de los candados) y programa instantáneas."""
+    if ticket is None:
+        return
+    registro_wal, numero = ticket
+    registro_wal.confirmar(numero)
+    umbral = _REGISTROS_POR_INSTANTANEA
+    if umbral and registro_wal.anotados_en_segmento >= umbral:
+        _programar_instantanea()
+
+
+def _programar_instantanea() -> None:
+    """Lanza la instantánea en segundo plano, salvo que ya haya una programada."""
+    global _instantanea_programada
+    with _lock_programacion:
+        if _instantanea_programada:
+            return
+        _instantanea_programada = True
+    threading.Thread(target=_instantanea_en_segundo_plano, name="telensor-instantanea", daemon=True).start()
+
+
+def _instantanea_en_segundo_plano() -> None:
+    global _instantanea_programada
+    try:
+        tomar_instantanea(solo_si_libre=True)
+    except Exception:
+        logger.exception("No se pudo tomar la instantánea del estado")
+    finally:
+        with _lock_programacion:
+            _instantanea_programada = False
+
+
+def activar_durabilidad(
+    directorio: str | Path,
+    *,
+    politica_fsync: str = "siempre",
+    intervalo_fsync_s: float = 0.05,
+    registros_por_instantanea: Optional[int] = 100_000,
+) -> Dict[str, Any]:
+    """Recupera el estado persistido en `directorio` y registra las escrituras siguientes.
+
+    Carga la última instantánea, reproduce los segmentos del log posteriores
+    (descartando una cola truncada por una caída), reconstruye los índices y
+    abre un segmento nuevo. Con `registros_por_instantanea`, al superar esa
+    cantidad de registros en el segmento activo se toma una instantánea en
+    segundo plano. Retorna estadísticas de la recuperación.
+    """
+    if politica_fsync not in wal.POLITICAS_FSYNC:
+        raise ValueError(f"Política de fsync desconocida: {politica_fsync!r}; opciones: {wal.POLITICAS_FSYNC}")
+    desactivar_durabilidad()
+    directorio = Path(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    with _sin_recolector():
+        stats = _recuperar(directorio, politica_fsync, intervalo_fsync_s, registros_por_instantanea)
+    stats["tiempo_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    logger.info("Estado recuperado de %s: %s", directorio, stats)
+    return stats
+
+
+@contextmanager
+def _sin_recolector() -> Iterator[None]:
+    """Pausa el recolector cíclico: crear millones de nodos y registros sin ciclos
+    dispara colecciones completas que recorren todo lo ya creado."""
+    activo = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if activo:
+            gc.enable()
+
+
+def _recuperar(
+    directorio: Path, politica_fsync: str, intervalo_fsync_s: float, registros_por_instantanea: Optional[int]
+) -> Dict[str, Any]:
+    global _WAL, _DIRECTORIO_DATOS, _REGISTROS_POR_INSTANTANEA
+    ruta = wal.ultima_instantanea(directorio)
+    if ruta is not None:
+        segmento, cadenas, columnas, bloqueos = wal.leer_instantanea(ruta)
+        almacen = AlmacenReservas.desde_columnas(cadenas, columnas)
+    else:
+        segmento, almacen, bloqueos = 0, AlmacenReservas(), []
+    siguiente = segmento
+    reproducidos = 0
+    for n, ruta_segmento in wal.segmentos_desde(directorio, segmento):
+        registros, valido = wal.leer_segmento(ruta_segmento)
+        for registro in registros:
+            _reproducir(almacen, bloqueos, registro)
+        reproducidos += len(registros)
+        if valido < ruta_segmento.stat().st_size:
+            logger.warning("Log %s truncado en el byte %d (escritura interrumpida)", ruta_segmento.name, valido)
+            with ruta_segmento.open("r+b") as f:
+                f.truncate(valido)
+        siguiente = n + 1
+
+    with _detener_escrituras():
+        _instalar_estado(almacen, bloqueos)
+        _WAL = wal.RegistroEscritura(
+            directorio, siguiente, politica_fsync=politica_fsync, intervalo_fsync_s=intervalo_fsync_s
+        )
+        _DIRECTORIO_DATOS = directorio
+        _REGISTROS_POR_INSTANTANEA = registros_por_instantanea
+    return {"reservas": len(almacen), "bloqueos": len(bloqueos), "registros_reproducidos": reproducidos}
+
+
+def _reproducir(almacen: AlmacenReservas, bloqueos: List[Dict[str, Any]], registro: Dict[str, Any]) -> None:
+    op = registro["op"]
+    if op == "alta_reserva":
+        datos = dict(registro)
+        del datos["op"]
+        if datos.pop("fila") != len(almacen):
+            raise ValueError("Log inconsistente: alta de reserva fuera de orden")
+        almacen.agregar(**datos)
+    elif op == "actualiza_reserva":
+        almacen.restaurar(
+            registro["fila"],
+            empleado_id=registro["empleado_id"],
+            equipo_id=registro["equipo_id"],
+            estado=registro["estado"],
+            version=registro["version"],
+        )
+    elif op == "bloqueo":
+        bloqueos.append(registro["bloqueo"])
+    else:
+        raise ValueError(f"Registro de log desconocido: {op!r}")
+
+
+def tomar_instantanea(*, solo_si_libre: bool = False) -> Optional[Path]:
+    """Vuelca el estado completo y descarta el log que ya cubre.
+
+    Detiene las escrituras solo para copiar las columnas y rotar el segmento
+    del log; el archivo se escribe después, sin candados. Retorna la ruta de
+    la instantánea, o None si no hay durabilidad activa (o, con
+    `solo_si_libre`, si ya hay otra instantánea en curso).
+    """
+    if not _lock_instantanea.acquire(blocking=not solo_si_libre):
+        return None
+    try:
+        registro_wal, directorio = _WAL, _DIRECTORIO_DATOS
+        if registro_wal is None or directorio is None:
+            return None
+        with _detener_escrituras():
+            if registro_wal is not _WAL:
+                return None
+            cadenas, columnas = MOCK_RESERVAS.exportar()
+            bloqueos = list(MOCK_BLOQUEOS)
+            segmento = registro_wal.rotar()
+        ruta = wal.escribir_instantanea(directorio, segmento, cadenas, columnas, bloqueos)
+        wal.podar(directorio, segmento)
+        return ruta
+    finally:
+        _lock_instantanea.release()
+
+
+def desactivar_durabilidad() -> None:
+    """Cierra el log activo (vaciando lo pendiente); el estado en memoria se conserva."""
+    global _WAL, _DIRECTORIO_DATOS, _REGISTROS_POR_INSTANTANEA
+    with _lock_instantanea:
+        with _detener_escrituras():
+            registro_wal, _WAL = _WAL, None
+            _DIRECTORIO_DATOS = None
+            _REGISTROS_POR_INSTANTANEA = None
+        if registro_wal is not None:
+            registro_wal.cerrar()
@@ -0,0 +1,246 @@
+"""
+Índice incremental de tiempo ocupado por recurso.
+
+Mantiene, por recurso (empleado, equipo o global), un árbol de intervalos
+aumentado con el fin máximo de cada subárbol. Se actualiza en cada escritura
+de `mock_state` y responde "intervalos de X que se solapan con [a, b)" en
+O(log n + k), en lugar de recorrer todas las reservas y bloqueos.
+
+Notas de diseño:
+- El árbol es un treap persistente (copia de camino): cada inserción o baja
+  crea O(log n) nodos nuevos y publica la nueva raíz con una sola asignación.
+  Las lecturas concurrentes, que no toman el candado de escritura, siempre
+  ven un árbol completo y consistente.
+- Las escrituras deben serializarse externamente (candado de `mock_state`).
+- Los extremos pueden ser de cualquier tipo ordenable (datetime, minutos).
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+class _Nodo:
+    __slots__ = ("inicio", "orden", "fin", "valor", "prioridad", "izq", "der", "max_fin")
+
+    def __init__(self, inicio, orden, fin, valor, prioridad, izq, der):
+        self.inicio = inicio
+        self.orden = orden
+        self.fin = fin
+        self.valor = valor
+        self.prioridad = prioridad
+        self.izq = izq
+        self.der = der
+        m = fin
+        if izq is not None and izq.max_fin > m:
+            m = izq.max_fin
+        if der is not None and der.max_fin > m:
+            m = der.max_fin
+        self.max_fin = m
+
+    def con_hijos(self, izq: Optional["_Nodo"], der: Optional["_Nodo"]) -> "_Nodo":
+        return _Nodo(self.inicio, self.orden, self.fin, self.valor, self.prioridad, izq, der)
+
+
+def _insertar(n: Optional[_Nodo], nuevo: _Nodo) -> _Nodo:
+    if n is None:
+        return nuevo
+    if (nuevo.inicio, nuevo.orden) < (n.inicio, n.orden):
+        izq = _insertar(n.izq, nuevo)
+        if izq.prioridad > n.prioridad:
+            # Rotación a derecha
+            return izq.con_hijos(izq.izq, n.con_hijos(izq.der, n.der))
+        return n.con_hijos(izq, n.der)
+    der = _insertar(n.der, nuevo)
+    if der.prioridad > n.prioridad:
+        # Rotación a izquierda
+        return der.con_hijos(n.con_hijos(n.izq, der.izq), der.der)
+    return n.con_hijos(n.izq, der)
+
+
+def _unir(a: Optional[_Nodo], b: Optional[_Nodo]) -> Optional[_Nodo]:
+    """Une dos treaps donde todas las claves de `a` preceden a las de `b`."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a.prioridad > b.prioridad:
+        return a.con_hijos(a.izq, _unir(a.der, b))
+    return b.con_hijos(_unir(a, b.izq), b.der)
+
+
+def _quitar(n: Optional[_Nodo], inicio, orden: int) -> Tuple[Optional[_Nodo], bool]:
+    if n is None:
+        return None, False
+    if (inicio, orden) == (n.inicio, n.orden):
+        return _unir(n.izq, n.der), True
+    if (inicio, orden) < (n.inicio, n.orden):
+        izq, ok = _quitar(n.izq, inicio, orden)
+        return (n.con_hijos(izq, n.der), True) if ok else (n, False)
+    der, ok = _quitar(n.der, inicio, orden)
+    return (n.con_hijos(n.izq, der), True) if ok else (n, False)
+
+
+def _consultar(n: Optional[_Nodo], a, b, res: List[Any]) -> None:
+    # Poda: ningún intervalo del subárbol termina después de `a`
+    if n is None or not (n.max_fin > a):
+        return
+    _consultar(n.izq, a, b, res)
+    if n.inicio < b:
+        if n.fin > a:
+            res.append(n.valor)
+        # El subárbol derecho empieza en o después de `n.inicio`
+        _consultar(n.der, a, b, res)
+
+
+def _alguno(n: Optional[_Nodo], a, b, predicado: Optional[Callable[[Any], bool]]) -> bool:
+    # Mismo recorrido que `_consultar`, pero se detiene en el primer solape aceptado
+    if n is None or not (n.max_fin > a):
+        return False
+    if _alguno(n.izq, a, b, predicado):
+        return True
+    if not (n.inicio < b):
+        return False
+    if n.fin > a and (predicado is None or predicado(n.valor)):
+        return True
+    return _alguno(n.der, a, b, predicado)
+
+
+def _construir(items: Iterable[Tuple[Any, int, Any, Any]], azar: random.Random) -> Tuple[Optional[_Nodo], int]:
+    """Treap de `items` ordenados por (inicio, orden) en O(n) (árbol cartesiano con pila).
+
+    Los nodos aún no son visibles para ningún lector, así que se enlazan
+    mutándolos; el fin máximo de cada nodo se calcula al sacarlo de la pila,
+    cuando sus dos subárboles ya están completos.
+    """
+    pila: List[_Nodo] = []
+    n = 0
+
+    def cerrar(nodo: _Nodo) -> _Nodo:
+        m = nodo.fin
+        if nodo.izq is not None and nodo.izq.max_fin > m:
+            m = nodo.izq.max_fin
+        if nodo.der is not None and nodo.der.max_fin > m:
+            m = nodo.der.max_fin
+        nodo.max_fin = m
+        return nodo
+
+    for inicio, orden, fin, valor in items:
+        nodo = _Nodo(inicio, orden, fin, valor, azar.random(), None, None)
+        ultimo = None
+        while pila and pila[-1].prioridad < nodo.prioridad:
+            ultimo = cerrar(pila.pop())
+        nodo.izq = ultimo
+        if pila:
+            pila[-1].der = nodo
+        pila.append(nodo)
+        n += 1
+    # Cada nodo de la pila es hijo derecho del que tiene debajo
+    raiz = None
+    while pila:
+        raiz = cerrar(pila.pop())
+    return raiz, n
+
+
+class ArbolIntervalos:
+    """Árbol de intervalos [inicio, fin) aumentado con fin máximo por subárbol."""
+
+    __slots__ = ("_raiz", "_secuencia", "_tamano", "_azar")
+
+    def __init__(self) -> None:
+        self._raiz: Optional[_Nodo] = None
+        self._secuencia = 0
+        self._tamano = 0
+        self._azar = random.Random()
+
+    def __len__(self) -> int:
+        return self._tamano
+
+    def agregar(self, inicio, fin, valor: Any) -> Tuple[Any, int]:
+        """Inserta un intervalo y devuelve su clave `(inicio, orden)` para bajas."""
+        self._secuencia += 1
+        nodo = _Nodo(inicio, self._secuencia, fin, valor, self._azar.random(), None, None)
+        self._raiz = _insertar(self._raiz, nodo)
+        self._tamano += 1
+        return inicio, self._secuencia
+
+    def cargar(self, items: Iterable[Tuple[Any, int, Any, Any]]) -> None:
+        """Carga en lote un árbol vacío con `(inicio, orden, fin, valor)` ordenados por (inicio, orden).
+
+        Construye el treap en O(n) en lugar de n inserciones de O(log n);
+        las altas posteriores continúan la secuencia desde el mayor `orden`.
+        """
+        if self._raiz is not None:
+            raise ValueError("La carga en lote requiere un árbol vacío")
+        maximo = 0
+
+        def con_maximo():
+            nonlocal maximo
+            for item in items:
+                if item[1] > maximo:
+                    maximo = item[1]
+                yield item
+
+        raiz, n = _construir(con_maximo(), self._azar)
+        self._secuencia = maximo
+        self._tamano = n
+        self._raiz = raiz
+
+    def quitar(self, clave: Tuple[Any, int]) -> bool:
+        raiz, ok = _quitar(self._raiz, clave[0], clave[1])
+        if ok:
+            self._raiz = raiz
+            self._tamano -= 1
+        return ok
+
+    def consultar(self, inicio, fin) -> List[Any]:
+        """Valores cuyos intervalos se solapan con [inicio, fin), ordenados por inicio."""
+        res: List[Any] = []
+        _consultar(self._raiz, inicio, fin, res)
+        return res
+
+    def alguno(self, inicio, fin, predicado: Optional[Callable[[Any], bool]] = None) -> bool:
+        """¿Algún valor cuyo intervalo se solapa con [inicio, fin) cumple `predicado`?
+
+        Sin predicado cuesta O(log n): se detiene en el primer solape.
+        """
+        return _alguno(self._raiz, inicio, fin, predicado)
+
+
+class IndiceOcupacion:
+    """Colección de árboles de intervalos indexados por recurso.
+
+    Los recursos son claves hashables, p. ej. `("empleado", "E1")`,
+    `("equipo", "EQ1")` o `("global", None)`.
+    """
+
+    def __init__(self) -> None:
+        self._arboles: Dict[Hashable, ArbolIntervalos] = {}
+
+    def agregar(self, recurso: Hashable, inicio, fin, valor: Any) -> Tuple[Any, int]:
+        arbol = self._arboles.get(recurso)
+        if arbol is None:
+            arbol = ArbolIntervalos()
+            self._arboles[recurso] = arbol
+        return arbol.agregar(inicio, fin, valor)
+
+    def cargar(self, recurso: Hashable, items: Iterable[Tuple[Any, int, Any, Any]]) -> None:
+        """Carga en lote el árbol (vacío) de `recurso`; ver `ArbolIntervalos.cargar`."""
+        arbol = self._arboles.get(recurso)
+        if arbol is None:
+            arbol = ArbolIntervalos()
+            self._arboles[recurso] = arbol
+        arbol.cargar(items)
+
+    def quitar(self, recurso: Hashable, clave: Tuple[Any, int]) -> bool:
+        arbol = self._arboles.get(recurso)
+        return arbol.quitar(clave) if arbol is not None else False
+
+    def consultar(self, recurso: Hashable, inicio, fin) -> List[Any]:
+        arbol = self._arboles.get(recurso)
+        return arbol.consultar(inicio, fin) if arbol is not None else []
+
+    def alguno(self, recurso: Hashable, inicio, fin, predicado: Optional[Callable[[Any], bool]] = None) -> bool:
+        arbol = self._arboles.get(recurso)
+        return arbol.alguno(inicio, fin, predicado) if arbol is not None else False
@@ -0,0 +1,186 @@
+"""
+Protocolo asíncrono de fuentes de datos del dominio (servicios, horarios y
+ocupaciones) y capa de agrupación de consultas de ocupaciones.
+
+- `ProveedorDatos`: lo que los gerentes asíncronos del adaptador esperan de
+  una fuente de datos. Con una base de datos real, las tres consultas de una
+  solicitud se lanzan a la vez con `asyncio.gather`.
+- `ProveedorSincrono`: adapta las funciones síncronas inyectables de siempre
+  (por defecto las de `mock_db`) al protocolo.
+- `LoteOcupaciones`: vive lo que dura una solicitud. Las llamadas a
+  `get_ocupaciones` que coinciden en el mismo ciclo del bucle de eventos se
+  funden en una sola consulta (unión de empleados, envolvente de rangos), y las
+  posteriores que ya están cubiertas se sirven de memoria. `como_funcion()`
+  expone lo cargado como `get_ocupaciones_fn` síncrona para el motor.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional, Protocol, Tuple
+
+from telensor_engine import mock_db
+
+
+class ProveedorDatos(Protocol):
+    """Fuente asíncrona de servicios, horarios de empleados y ocupaciones."""
+
+    async def get_servicio(self, servicio_id: str) -> Dict[str, Any]: ...
+
+    async def get_horarios_empleados(
+        self,
+        fecha: Any,
+        *,
+        servicio_id: Optional[str] = None,
+        equipo_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]: ...
+
+    async def get_ocupaciones(self, empleados: List[str], fecha_inicio: Any, fecha_fin: Any) -> List[Dict[str, Any]]: ...
+
+
+class ProveedorSincrono:
+    """`ProveedorDatos` sobre funciones síncronas (las de `mock_db` si no se pasan).
+
+    Con `en_hilos=True` cada llamada corre en el pool de hilos del bucle
+    (`asyncio.to_thread`), para funciones que bloquean en E/S; sin él se
+    llaman directamente, lo adecuado para funciones en memoria.
+    """
+
+    def __init__(
+        self,
+        get_servicio_fn: Optional[Callable[[str], Dict[str, Any]]] = None,
+        get_horarios_empleados_fn: Optional[Callable[..., List[Dict[str, Any]]]] = None,
+        get_ocupaciones_fn: Optional[Callable[[List[str], Any, Any], List[Dict[str, Any]]]] = None,
+        *,
+        en_hilos: bool = False,
+    ) -> None:
+        self._get_servicio = get_servicio_fn or mock_db.get_servicio
+        self._get_horarios_empleados = get_horarios_empleados_fn or mock_db.get_horarios_empleados
+        self._get_ocupaciones = get_ocupaciones_fn or mock_db.get_ocupaciones
+        self._en_hilos = en_hilos
+
+    async def _llamar(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if self._en_hilos:
+            return await asyncio.to_thread(fn, *args, **kwargs)
+        return fn(*args, **kwargs)
+
+    async def get_servicio(self, servicio_id: str) -> Dict[str, Any]:
+        return await self._llamar(self._get_servicio, servicio_id)
+
+    async def get_horarios_empleados(
+        self,
+        fecha: Any,
+        *,
+        servicio_id: Optional[str] = None,
+        equipo_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        return await self._llamar(self._get_horarios_empleados, fecha, servicio_id=servicio_id, equipo_id=equipo_id)
+
+    async def get_ocupaciones(self, empleados: List[str], fecha_inicio: Any, fecha_fin: Any) -> List[Dict[str, Any]]:
+        return await self._llamar(self._get_ocupaciones, empleados, fecha_inicio, fecha_fin)
+
+
+# (empleados, inicio, fin, ocupaciones) de una consulta ya hecha al origen
+_Cargada = Tuple[FrozenSet[str], Any, Any, List[Dict[str, Any]]]
+
+
+class LoteOcupaciones:
+    """Agrupa las consultas de ocupaciones de una solicitud en la menor cantidad de viajes.
+
+    Una consulta está cubierta por otra anterior si sus empleados son un
+    subconjunto y su rango cae dentro; se responde con las ocupaciones de esos
+    empleados (puede incluir alguna fuera del rango pedido: el motor recorta
+    todo contra sus ventanas). `consultas` cuenta los viajes al origen.
+    """
+
+    def __init__(self, obtener: Callable[[List[str], Any, Any], Awaitable[List[Dict[str, Any]]]]) -> None:
+        self._obtener = obtener
+        self._cargadas: List[_Cargada] = []
+        self._pendientes: List[Tuple[FrozenSet[str], Any, Any, "asyncio.Future[List[Dict[str, Any]]]"]] = []
+        # Consultas ya lanzadas al origen y aún sin respuesta
+        self._en_curso: List[Tuple[FrozenSet[str], Any, Any, "asyncio.Future[List[Dict[str, Any]]]"]] = []
+        self._despacho: Optional["asyncio.Task[None]"] = None
+        self.consultas = 0
+
+    def _cubierta(self, empleados: FrozenSet[str], inicio: Any, fin: Any) -> Optional[List[Dict[str, Any]]]:
+        for cargados, c_inicio, c_fin, ocupaciones in self._cargadas:
+            if empleados <= cargados and c_inicio <= inicio and fin <= c_fin:
+                return [oc for oc in ocupaciones if oc.get("empleado_id") in empleados]
+        return None
+
+    def _en_curso_que_cubre(self, empleados: FrozenSet[str], inicio: Any, fin: Any):
+        for cargados, c_inicio, c_fin, total in self._en_curso:
+            if empleados <= cargados and c_inicio <= inicio and fin <= c_fin:
+                return total
+        return None
+
+    async def obtener(self, empleados: List[str], inicio: Any, fin: Any) -> List[Dict[str, Any]]:
+        """Ocupaciones de `empleados` en `[inicio, fin)`, compartiendo viaje con llamadas concurrentes."""
+        pedidos = frozenset(empleados)
+        cubierta = self._cubierta(pedidos, inicio, fin)
+        if cubierta is not None:
+            return cubierta
+        en_curso = self._en_curso_que_cubre(pedidos, inicio, fin)
+        if en_curso is not None:
+            return [oc for oc in await asyncio.shield(en_curso) if oc.get("empleado_id") in pedidos]
+        bucle = asyncio.get_running_loop()
+        futuro = bucle.create_future()
+        self._pendientes.append((pedidos, inicio, fin, futuro))
+        if len(self._pendientes) == 1:
+            # Tarea propia: cancelar a quien abrió el lote no deja colgados a los demás
+            self._despacho = bucle.create_task(self._despachar())
+        return await futuro
+
+    async def _despachar(self) -> None:
+        # Cede un ciclo para que se sumen las llamadas lanzadas en el mismo gather
+        await asyncio.sleep(0)
+        lote, self._pendientes = self._pendientes, []
+        todos = frozenset().union(*(p[0] for p in lote))
+        inicio = min(p[1] for p in lote)
+        fin = max(p[2] for p in lote)
+        self.consultas += 1
+        total = asyncio.get_running_loop().create_future()
+        # Sin esperas sobre `total`, su error no debe reportarse como no recuperado
+        total.add_done_callback(lambda f: f.cancelled() or f.exception())
+        registro = (todos, inicio, fin, total)
+        self._en_curso.append(registro)
+        try:
+            ocupaciones = await self._obtener(sorted(todos), inicio, fin)
+        except BaseException as exc:
+            cancelada = isinstance(exc, asyncio.CancelledError)
+            for futuro in [total] + [p[3] for p in lote]:
+                if futuro.done():
+                    continue
+                if cancelada:
+                    futuro.cancel()
+                else:
+                    futuro.set_exception(exc)
+            if cancelada:
+                raise
+            return
+        finally:
+            self._en_curso.remove(registro)
+        total.set_result(ocupaciones)
+        self._cargadas.append((todos, inicio, fin, ocupaciones))
+        for pedidos, _, _, futuro in lote:
+            if not futuro.done():
+                futuro.set_result([oc for oc in ocupaciones if oc.get("empleado_id") in pedidos])
+
+    def como_funcion(
+        self, respaldo: Optional[Callable[[List[str], Any, Any], List[Dict[str, Any]]]] = None
+    ) -> Callable[[List[str], Any, Any], List[Dict[str, Any]]]:
+        """`get_ocupaciones_fn` síncrona servida desde lo ya cargado.
+
+        Una consulta no cubierta va a `respaldo`; sin él es un error de
+        precarga (el gerente asíncrono debe pedir antes todo lo que el motor usa).
+        """
+
+        def get_ocupaciones(empleados: List[str], inicio: Any, fin: Any) -> List[Dict[str, Any]]:
+            cubierta = self._cubierta(frozenset(empleados), inicio, fin)
+            if cubierta is not None:
+                return cubierta
+            if respaldo is None:
+                raise RuntimeError(f"Ocupaciones no precargadas para {sorted(empleados)} en [{inicio}, {fin})")
+            return respaldo(empleados, inicio, fin)
+
+        return get_ocupaciones
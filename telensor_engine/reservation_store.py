@@ -0,0 +1,366 @@
+"""
+Almacén columnar de reservas.
+
+Cada reserva es una fila repartida en columnas paralelas de enteros en lugar
+de un objeto con datetimes y cadenas propias:
+
+- inicio / fin: minutos epoch (UTC) en `array('q')`.
+- creada: microsegundos epoch de la creación; junto con el número de fila
+  determina el `reserva_id` ("R-<timestamp>-<n>"), que no se almacena.
+- servicio, empleado, equipo, escenario, estado: códigos de un diccionario
+  de cadenas internadas (-1 = None) en `array('i')`.
+- version: `array('i')`.
+
+`Reserva` es una vista liviana (almacén, fila) que lee las columnas en cada
+acceso, así que siempre refleja las actualizaciones y solo crea datetimes al
+consultarlos. Los filtros por rango operan vectorizados sobre las columnas.
+
+Las escrituras deben serializarse externamente (candados de `mock_state`):
+el alta (que agranda las columnas) con las demás altas y filtros por rango,
+y las actualizaciones de una fila con las de la misma fila.
+"""
+
+from __future__ import annotations
+
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from telensor_engine.epoch_minutes import minutos_epoch
+
+
+_EPOCA = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NINGUNO = -1
+
+# Columnas del almacén (nombre, typecode de `array`), en el orden de las instantáneas
+COLUMNAS = (
+    ("inicio", "q"),
+    ("fin", "q"),
+    ("creada", "q"),
+    ("servicio", "i"),
+    ("empleado", "i"),
+    ("equipo", "i"),
+    ("escenario", "i"),
+    ("estado", "i"),
+    ("version", "i"),
+)
+
+
+def desde_minutos(minutos: int) -> datetime:
+    return _EPOCA + timedelta(minutes=minutos)
+
+
+def desde_microsegundos(us: int) -> datetime:
+    return _EPOCA + timedelta(microseconds=us)
+
+
+def microsegundos_epoch(dt: datetime) -> int:
+    """Microsegundos epoch de un `datetime` aware."""
+    delta = dt - _EPOCA
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def minuto_exacto(dt: datetime) -> int:
+    """Minuto epoch de `dt`; lanza ValueError si no está alineado al minuto."""
+    if dt.second or dt.microsecond:
+        raise ValueError("Los extremos de la reserva deben estar alineados al minuto")
+    return minutos_epoch(dt)
+
+
+def minuto_techo(dt: datetime) -> int:
+    """Menor minuto epoch >= `dt` (extremo superior de una consulta semiabierta)."""
+    m = minutos_epoch(dt)
+    return m + 1 if (dt.second or dt.microsecond) else m
+
+
+class _Internador:
+    """Cadenas repetidas (ids de empleado, servicio, estados) guardadas una sola vez."""
+
+    __slots__ = ("_valores", "_codigos")
+
+    def __init__(self) -> None:
+        self._valores: List[str] = []
+        self._codigos: Dict[str, int] = {}
+
+    def codigo(self, valor: Optional[str]) -> int:
+        if valor is None:
+            return _NINGUNO
+        c = self._codigos.get(valor)
+        if c is None:
+            c = self._codigos.setdefault(valor, len(self._valores))
+            if c == len(self._valores):
+                self._valores.append(valor)
+        return c
+
+    def valor(self, codigo: int) -> Optional[str]:
+        return None if codigo == _NINGUNO else self._valores[codigo]
+
+    def valores(self) -> List[str]:
+        return list(self._valores)
+
+    @classmethod
+    def desde_valores(cls, valores: List[str]) -> "_Internador":
+        internador = cls()
+        internador._valores = list(valores)
+        internador._codigos = {v: i for i, v in enumerate(internador._valores)}
+        return internador
+
+
+class AlmacenReservas:
+    """Reservas en columnas paralelas; se comporta como una secuencia de `Reserva`."""
+
+    def __init__(self) -> None:
+        self._inicio = array("q")
+        self._fin = array("q")
+        self._creada = array("q")
+        self._servicio = array("i")
+        self._empleado = array("i")
+        self._equipo = array("i")
+        self._escenario = array("i")
+        self._estado = array("i")
+        self._version = array("i")
+        self._cadenas = _Internador()
+
+    # Volcado y carga (instantáneas)
+
+    def exportar(self) -> Tuple[List[str], Dict[str, array]]:
+        """Copia de las cadenas internadas y de cada columna (para instantáneas)."""
+        n = len(self)
+        columnas = {nombre: getattr(self, "_" + nombre)[:n] for nombre, _ in COLUMNAS}
+        return self._cadenas.valores(), columnas
+
+    @classmethod
+    def desde_columnas(cls, cadenas: List[str], columnas: Dict[str, array]) -> "AlmacenReservas":
+        """Almacén con las columnas dadas (de igual largo) y sus cadenas internadas."""
+        almacen = cls()
+        largos = {len(columnas[nombre]) for nombre, _ in COLUMNAS}
+        if len(largos) > 1:
+            raise ValueError("Columnas de distinto largo")
+        for nombre, tipo in COLUMNAS:
+            columna = columnas[nombre]
+            if columna.typecode != tipo:
+                raise ValueError(f"Columna {nombre}: tipo {columna.typecode!r}, se esperaba {tipo!r}")
+            setattr(almacen, "_" + nombre, columna)
+        almacen._cadenas = _Internador.desde_valores(cadenas)
+        return almacen
+
+    # Secuencia de vistas (compatibilidad con la lista de reservas)
+
+    def __len__(self) -> int:
+        return len(self._version)
+
+    def __getitem__(self, fila: int) -> "Reserva":
+        if not 0 <= fila < len(self):
+            raise IndexError(fila)
+        return Reserva(self, fila)
+
+    def __iter__(self) -> Iterator["Reserva"]:
+        return (Reserva(self, fila) for fila in range(len(self)))
+
+    # Escritura
+
+    def agregar(
+        self,
+        *,
+        servicio_id: str,
+        empleado_id: str,
+        equipo_id: Optional[str],
+        inicio_min: int,
+        fin_min: int,
+        creada_us: int,
+        scenario_id: Optional[str] = None,
+        estado: str = "confirmada",
+    ) -> int:
+        """Agrega una fila y devuelve su número."""
+        c = self._cadenas.codigo
+        self._inicio.append(inicio_min)
+        self._fin.append(fin_min)
+        self._creada.append(creada_us)
+        self._servicio.append(c(servicio_id))
+        self._empleado.append(c(empleado_id))
+        self._equipo.append(c(equipo_id))
+        self._escenario.append(c(scenario_id))
+        self._estado.append(c(estado))
+        # La versión se agrega al final: `len` solo cuenta filas completas
+        self._version.append(1)
+        return len(self._version) - 1
+
+    def actualizar(
+        self,
+        fila: int,
+        *,
+        empleado_id: Optional[str] = None,
+        equipo_id: Optional[str] = None,
+        estado: Optional[str] = None,
+    ) -> None:
+        """Actualiza los campos indicados (None = sin cambio) e incrementa la versión."""
+        c = self._cadenas.codigo
+        if empleado_id is not None:
+            self._empleado[fila] = c(empleado_id)
+        if equipo_id is not None:
+            self._equipo[fila] = c(equipo_id)
+        if estado is not None:
+            self._estado[fila] = c(estado)
+        self._version[fila] += 1
+
+    def restaurar(self, fila: int, *, empleado_id: str, equipo_id: Optional[str], estado: str, version: int) -> None:
+        """Fija los campos mutables de una fila tal cual (recuperación desde el log)."""
+        c = self._cadenas.codigo
+        self._empleado[fila] = c(empleado_id)
+        self._equipo[fila] = c(equipo_id)
+        self._estado[fila] = c(estado)
+        self._version[fila] = version
+
+    # Lectura
+
+    def reserva_id(self, fila: int) -> str:
+        ts = desde_microsegundos(self._creada[fila]).strftime("%Y%m%d%H%M%S%f")
+        return f"R-{ts}-{fila + 1}"
+
+    def fila_de_id(self, reserva_id: str) -> Optional[int]:
+        """Fila de un `reserva_id` (O(1): el sufijo es el número de fila)."""
+        try:
+            fila = int(str(reserva_id).rsplit("-", 1)[1]) - 1
+        except (IndexError, ValueError):
+            return None
+        if 0 <= fila < len(self) and self.reserva_id(fila) == reserva_id:
+            return fila
+        return None
+
+    def empleado_id(self, fila: int) -> Optional[str]:
+        return self._cadenas.valor(self._empleado[fila])
+
+    def equipo_id(self, fila: int) -> Optional[str]:
+        return self._cadenas.valor(self._equipo[fila])
+
+    def rango_minutos(self, fila: int) -> tuple:
+        return self._inicio[fila], self._fin[fila]
+
+    def version(self, fila: int) -> int:
+        return self._version[fila]
+
+    def filas_por_recurso(self, campo: str) -> Iterator[Tuple[str, np.ndarray]]:
+        """(id, filas ordenadas por inicio y fila) de cada empleado o equipo (`campo`).
+
+        Agrupa vectorizado sobre las columnas; las filas sin recurso se omiten.
+        """
+        n = len(self)
+        if n == 0:
+            return
+        codigos = np.array(getattr(self, "_" + campo), dtype=np.int64)
+        inicio = np.array(self._inicio, dtype=np.int64)
+        orden = np.lexsort((np.arange(n), inicio, codigos))
+        codigos = codigos[orden]
+        cortes = np.flatnonzero(np.diff(codigos)) + 1
+        for filas, codigo in zip(np.split(orden, cortes), codigos[np.r_[0, cortes]].tolist()):
+            if codigo != _NINGUNO:
+                yield self._cadenas.valor(codigo), filas
+
+    def rangos_minutos(self, filas: np.ndarray) -> Tuple[List[int], List[int]]:
+        """(inicios, fines) en minutos epoch de las `filas` indicadas."""
+        n = len(self)
+        inicio = np.frombuffer(self._inicio, dtype=np.int64, count=n)
+        fin = np.frombuffer(self._fin, dtype=np.int64, count=n)
+        res = inicio[filas].tolist(), fin[filas].tolist()
+        del inicio, fin
+        return res
+
+    def filas_solapadas(self, inicio_min: int, fin_min: int) -> List[int]:
+        """Filas cuyo intervalo se solapa con [inicio_min, fin_min), en orden de inserción.
+
+        Filtro vectorizado sobre las columnas (sin recorrer objetos).
+        """
+        n = len(self)
+        if n == 0:
+            return []
+        inicio = np.frombuffer(self._inicio, dtype=np.int64, count=n)
+        fin = np.frombuffer(self._fin, dtype=np.int64, count=n)
+        filas = np.flatnonzero((inicio < fin_min) & (fin > inicio_min)).tolist()
+        # Liberar las vistas antes de que otra alta necesite agrandar las columnas
+        del inicio, fin
+        return filas
+
+
+class Reserva:
+    """Vista de una reserva almacenada (lee sus columnas en cada acceso).
+
+    Atributos:
+    - reserva_id: identificador único de la reserva
+    - servicio_id: id del servicio reservado
+    - empleado_id: id del empleado asignado
+    - equipo_id: id del equipo asignado (opcional)
+    - inicio_slot: inicio del slot del servicio (UTC)
+    - fin_slot: fin del slot del servicio (UTC)
+    - creada_en: timestamp de creación (UTC)
+    - estado: estado de la reserva ("confirmada", "REASIGNADA", ...)
+    - scenario_id: escenario de pruebas asociado (opcional)
+    - version: número de versión; cada `update_reserva` lo incrementa y admite
+      `expected_version` para actualizaciones compare-and-swap
+    """
+
+    __slots__ = ("_almacen", "_fila")
+
+    def __init__(self, almacen: AlmacenReservas, fila: int) -> None:
+        self._almacen = almacen
+        self._fila = fila
+
+    @property
+    def reserva_id(self) -> str:
+        return self._almacen.reserva_id(self._fila)
+
+    @property
+    def servicio_id(self) -> str:
+        a = self._almacen
+        return a._cadenas.valor(a._servicio[self._fila])
+
+    @property
+    def empleado_id(self) -> str:
+        return self._almacen.empleado_id(self._fila)
+
+    @property
+    def equipo_id(self) -> Optional[str]:
+        return self._almacen.equipo_id(self._fila)
+
+    @property
+    def inicio_slot(self) -> datetime:
+        return desde_minutos(self._almacen._inicio[self._fila])
+
+    @property
+    def fin_slot(self) -> datetime:
+        return desde_minutos(self._almacen._fin[self._fila])
+
+    @property
+    def creada_en(self) -> datetime:
+        return desde_microsegundos(self._almacen._creada[self._fila])
+
+    @property
+    def estado(self) -> str:
+        a = self._almacen
+        return a._cadenas.valor(a._estado[self._fila])
+
+    @property
+    def scenario_id(self) -> Optional[str]:
+        a = self._almacen
+        return a._cadenas.valor(a._escenario[self._fila])
+
+    @property
+    def version(self) -> int:
+        return self._almacen.version(self._fila)
+
+    def __eq__(self, otro: object) -> bool:
+        if not isinstance(otro, Reserva):
+            return NotImplemented
+        return self._almacen is otro._almacen and self._fila == otro._fila
+
+    def __hash__(self) -> int:
+        return hash((id(self._almacen), self._fila))
+
+    def __repr__(self) -> str:
+        return (
+            f"Reserva(reserva_id={self.reserva_id!r}, servicio_id={self.servicio_id!r}, "
+            f"empleado_id={self.empleado_id!r}, equipo_id={self.equipo_id!r}, "
+            f"inicio_slot={self.inicio_slot!r}, fin_slot={self.fin_slot!r}, "
+            f"estado={self.estado!r}, version={self.version!r})"
+        )
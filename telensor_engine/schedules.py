@@ -0,0 +1,139 @@
+"""
+Plantillas de horario semanal compiladas a intervalos absolutos.
+
+Un empleado puede declarar, en lugar (o además) de `horario_trabajo`, una
+plantilla recurrente `horario_semanal`:
+
+    {
+      "dias": {"0": [[540, 780], [840, 1080]], "5": [[600, 840]]},
+      "excepciones": {"2025-11-07": [], "2025-11-08": [[480, 720]]}
+    }
+
+- `dias`: turnos por día de la semana (0 = lunes ... 6 = domingo, como
+  `date.weekday()`), en minutos del día. Un día ausente no tiene turnos.
+  Un turno puede cruzar la medianoche (`fin > 1440`).
+- `excepciones`: fechas ISO cuyo conjunto de turnos reemplaza al del día de
+  la semana (lista vacía = día libre).
+
+La plantilla se compila una vez por (contenido, fecha base, número de días)
+en un `IntervalSet` sobre el eje continuo de la búsqueda (origen en la
+medianoche de la fecha base) y se reutiliza entre solicitudes hasta que el
+contenido de la plantilla cambia. La expansión de la recurrencia queda así
+fuera del camino caliente de cada búsqueda. La huella del contenido de una
+plantilla de solo lectura (las de los escenarios congelados) se calcula una
+sola vez por objeto.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple, Union
+
+from telensor_engine.engine.interval_set import IntervalSet
+from telensor_engine.fixtures import es_solo_lectura
+
+
+# Máximo de compilaciones distintas retenidas en caché
+MAX_PLANTILLAS_EN_CACHE = 4096
+
+
+def validar_plantilla(plantilla: Dict[str, Any]) -> None:
+    """Valida la forma de una plantilla semanal; lanza ValueError si es inválida."""
+    if not isinstance(plantilla, dict):
+        raise ValueError("horario_semanal debe ser un objeto")
+    dias = plantilla.get("dias", {}) or {}
+    excepciones = plantilla.get("excepciones", {}) or {}
+    if not isinstance(dias, dict) or not isinstance(excepciones, dict):
+        raise ValueError("horario_semanal: 'dias' y 'excepciones' deben ser objetos")
+    for clave, turnos in dias.items():
+        if str(clave) not in {str(d) for d in range(7)}:
+            raise ValueError(f"horario_semanal: día de la semana inválido {clave!r}")
+        _validar_turnos(turnos)
+    for fecha, turnos in excepciones.items():
+        try:
+            date.fromisoformat(str(fecha))
+        except ValueError:
+            raise ValueError(f"horario_semanal: fecha de excepción inválida {fecha!r}")
+        _validar_turnos(turnos)
+
+
+def _validar_turnos(turnos: Any) -> None:
+    if not isinstance(turnos, list):
+        raise ValueError("horario_semanal: los turnos deben ser una lista de [ini, fin]")
+    for turno in turnos:
+        if not isinstance(turno, (list, tuple)) or len(turno) != 2:
+            raise ValueError("horario_semanal: turno inválido, se espera [ini, fin]")
+        ini, fin = turno
+        if not (0 <= int(ini) < int(fin) <= 2 * 1440):
+            raise ValueError(f"horario_semanal: turno fuera de rango {turno!r}")
+
+
+# Huellas de plantillas de solo lectura, por identidad: el objeto se retiene
+# junto a su huella, así que su id no puede reutilizarlo otro mientras esté aquí
+_HUELLAS: Dict[int, Tuple[Dict[str, Any], str]] = {}
+
+
+def _serializar(plantilla: Dict[str, Any]) -> str:
+    return json.dumps(plantilla, sort_keys=True, separators=(",", ":"))
+
+
+def _huella(plantilla: Dict[str, Any]) -> str:
+    """Representación canónica de la plantilla; cambia si y solo si cambia el contenido.
+
+    Una plantilla mutable se serializa en cada llamada; una de solo lectura no
+    puede cambiar, así que su huella se memoriza por identidad.
+    """
+    if not es_solo_lectura(plantilla):
+        return _serializar(plantilla)
+    memo = _HUELLAS.get(id(plantilla))
+    if memo is not None and memo[0] is plantilla:
+        return memo[1]
+    huella = _serializar(plantilla)
+    if len(_HUELLAS) >= MAX_PLANTILLAS_EN_CACHE:
+        # Escenarios recargados dejan plantillas viejas: se descartan en bloque
+        _HUELLAS.clear()
+    _HUELLAS[id(plantilla)] = (plantilla, huella)
+    return huella
+
+
+def compilar_horario_semanal(
+    plantilla: Dict[str, Any],
+    fecha_base: Union[date, str],
+    n_dias: int,
+) -> IntervalSet:
+    """Compila la plantilla sobre `n_dias` a partir de `fecha_base` (cacheado).
+
+    Retorna un `IntervalSet` en minutos absolutos relativos a la medianoche de
+    `fecha_base`. Incluye el día anterior para que los turnos nocturnos que
+    cruzan la medianoche aporten su tramo inicial al día 0.
+    """
+    if isinstance(fecha_base, date):
+        fecha_base = fecha_base.isoformat()
+    return _compilar(_huella(plantilla), str(fecha_base), int(n_dias))
+
+
+@lru_cache(maxsize=MAX_PLANTILLAS_EN_CACHE)
+def _compilar(huella: str, fecha_base_iso: str, n_dias: int) -> IntervalSet:
+    plantilla = json.loads(huella)
+    validar_plantilla(plantilla)
+    dias = {str(k): v for k, v in (plantilla.get("dias", {}) or {}).items()}
+    excepciones = plantilla.get("excepciones", {}) or {}
+    base = date.fromisoformat(fecha_base_iso)
+
+    intervalos: List[List[int]] = []
+    for d in range(-1, max(1, n_dias)):
+        dia = base + timedelta(days=d)
+        turnos = excepciones.get(dia.isoformat())
+        if turnos is None:
+            turnos = dias.get(str(dia.weekday()), [])
+        offset = d * 1440
+        intervalos.extend([ini + offset, fin + offset] for ini, fin in turnos)
+    return IntervalSet(intervalos)
+
+
+def limpiar_cache() -> None:
+    """Descarta todas las compilaciones y huellas cacheadas."""
+    _compilar.cache_clear()
+    _HUELLAS.clear()
@@ -0,0 +1,452 @@
+"""
+Repositorio de reservas y bloqueos sobre SQLite.
+
+Implementa la misma interfaz que `mock_state` (`add_reserva`, `has_conflict`,
+`get_reservas_en_rango`, `update_reserva`, `add_bloqueo`,
+`get_bloqueos_intersecting`, ...) y se activa con
+`mock_state.usar_repositorio(RepositorioSQLite(ruta))`: a partir de ahí las
+funciones de `mock_state` delegan en él, así que el adaptador no cambia.
+
+Notas de diseño:
+- Tiempos enteros: reservas en minutos epoch (alineadas al minuto, igual que
+  el almacén en memoria) y bloqueos en microsegundos epoch (sin redondeo).
+- Solapes con predicados indexados: `inicio < fin_q AND fin > ini_q` más la
+  cota `inicio >= ini_q - duración_máxima`, que convierte la búsqueda en un
+  rango acotado sobre los índices `(empleado_id, inicio)`, `(equipo_id, inicio)`
+  e `(inicio)`. La duración máxima vive en la tabla `meta` y se actualiza en
+  cada alta, de modo que otras conexiones (u otros procesos) la ven.
+- Cada bloqueo tiene una fila por objetivo en `bloqueo_alcances`
+  (`objetivo` NULL si no nombra IDs), indexada por `(scope, objetivo, inicio_us)`:
+  las consultas por alcance leen solo los bloqueos de los recursos pedidos.
+- Modo WAL de SQLite, `BEGIN IMMEDIATE` para el chequeo de conflicto y el alta
+  en una misma transacción, sentencias preparadas reutilizadas por la caché
+  de `sqlite3` (SQL constante) y un pool chico de conexiones.
+- Las reservas devueltas son instantáneas (`ReservaSQLite`), no vistas vivas:
+  para ver cambios posteriores hay que volver a leerlas con `get_reserva`.
+"""
+
+from __future__ import annotations
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from telensor_engine.epoch_minutes import minutos_epoch
+from telensor_engine.mock_state import CAMPOS_ALCANCE, ConflictoVersion
+from telensor_engine.reservation_store import (
+    desde_microsegundos,
+    desde_minutos,
+    microsegundos_epoch,
+    minuto_exacto,
+    minuto_techo,
+)
+from telensor_engine.write_ahead_log import a_json, desde_json
+
+TAMANO_POOL = 4
+# Bloqueos decodificados retenidos en memoria (se vacía al superarse)
+MAX_BLOQUEOS_EN_CACHE = 4096
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS reservas (
+    fila INTEGER PRIMARY KEY,
+    reserva_id TEXT NOT NULL UNIQUE,
+    servicio_id TEXT NOT NULL,
+    empleado_id TEXT NOT NULL,
+    equipo_id TEXT,
+    inicio INTEGER NOT NULL,
+    fin INTEGER NOT NULL,
+    creada_us INTEGER NOT NULL,
+    estado TEXT NOT NULL,
+    scenario_id TEXT,
+    version INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reservas_empleado ON reservas (empleado_id, inicio);
+CREATE INDEX IF NOT EXISTS reservas_equipo ON reservas (equipo_id, inicio);
+CREATE INDEX IF NOT EXISTS reservas_inicio ON reservas (inicio);
+CREATE TABLE IF NOT EXISTS bloqueos (
+    orden INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    inicio_us INTEGER,
+    fin_us INTEGER,
+    datos TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bloqueos_inicio ON bloqueos (inicio_us);
+CREATE TABLE IF NOT EXISTS bloqueo_alcances (
+    orden INTEGER NOT NULL REFERENCES bloqueos (orden),
+    scope TEXT NOT NULL,
+    objetivo TEXT,
+    inicio_us INTEGER NOT NULL,
+    fin_us INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bloqueo_alcances_objetivo ON bloqueo_alcances (scope, objetivo, inicio_us, orden);
+CREATE TABLE IF NOT EXISTS meta (
+    clave TEXT PRIMARY KEY,
+    valor INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (clave, valor) VALUES ('max_duracion_reserva', 0), ('max_duracion_bloqueo', 0);
+"""
+
+_COLUMNAS_RESERVA = "reserva_id, servicio_id, empleado_id, equipo_id, inicio, fin, creada_us, estado, scenario_id, version"
+_COTA_RESERVA = "(SELECT valor FROM meta WHERE clave = 'max_duracion_reserva')"
+_COTA_BLOQUEO = "(SELECT valor FROM meta WHERE clave = 'max_duracion_bloqueo')"
+
+# Solape con [ini, fin): parámetros (fin, ini, ini) al final de cada consulta
+_SOLAPE_RESERVA = f"inicio < ? AND inicio >= ? - {_COTA_RESERVA} AND fin > ?"
+_SOLAPE_ALCANCE = f"a.inicio_us < ? AND a.inicio_us >= ? - {_COTA_BLOQUEO} AND a.fin_us > ?"
+
+_SQL_CONFLICTO = f"SELECT 1 FROM reservas WHERE empleado_id = ? AND {_SOLAPE_RESERVA} LIMIT 1"
+_SQL_CONFLICTO_EQUIPO = f"SELECT 1 FROM reservas WHERE empleado_id = ? AND {_SOLAPE_RESERVA} AND equipo_id = ? LIMIT 1"
+_SQL_RANGO = f"SELECT {_COLUMNAS_RESERVA} FROM reservas WHERE {_SOLAPE_RESERVA} ORDER BY fila"
+_SQL_RANGO_EMPLEADO = f"SELECT {_COLUMNAS_RESERVA} FROM reservas WHERE empleado_id = ? AND {_SOLAPE_RESERVA} ORDER BY inicio, fila"
+_SQL_RANGO_EQUIPO = f"SELECT {_COLUMNAS_RESERVA} FROM reservas WHERE equipo_id = ? AND {_SOLAPE_RESERVA} ORDER BY inicio, fila"
+_SQL_POR_ID = f"SELECT {_COLUMNAS_RESERVA} FROM reservas WHERE reserva_id = ?"
+_SQL_TODAS = f"SELECT {_COLUMNAS_RESERVA} FROM reservas ORDER BY fila"
+_SQL_ALTA = (
+    "INSERT INTO reservas (fila, reserva_id, servicio_id, empleado_id, equipo_id, inicio, fin, creada_us, estado, scenario_id, version)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'confirmada', ?, 1)"
+)
+_SQL_ACTUALIZAR = (
+    "UPDATE reservas SET empleado_id = COALESCE(?, empleado_id), equipo_id = COALESCE(?, equipo_id),"
+    " estado = COALESCE(?, estado), version = version + 1 WHERE reserva_id = ?"
+)
+_SQL_ACTUALIZAR_CAS = _SQL_ACTUALIZAR + " AND version = ?"
+_SQL_COTA = "UPDATE meta SET valor = MAX(valor, ?) WHERE clave = ?"
+_SQL_ALTA_BLOQUEO = "INSERT INTO bloqueos (orden, id, inicio_us, fin_us, datos) VALUES (?, ?, ?, ?, ?)"
+_SQL_ALTA_ALCANCE = "INSERT INTO bloqueo_alcances (orden, scope, objetivo, inicio_us, fin_us) VALUES (?, ?, ?, ?, ?)"
+_SQL_BLOQUEOS_RANGO = (
+    f"SELECT orden, datos FROM bloqueos WHERE inicio_us < ? AND inicio_us >= ? - {_COTA_BLOQUEO} AND fin_us > ?"
+    " ORDER BY inicio_us, orden"
+)
+_SQL_BLOQUEOS_OBJETIVO = (
+    "SELECT b.orden, b.datos FROM bloqueo_alcances a JOIN bloqueos b ON b.orden = a.orden"
+    f" WHERE a.scope = ? AND a.objetivo IS ? AND {_SOLAPE_ALCANCE} ORDER BY a.inicio_us, a.orden"
+)
+_SQL_BLOQUEOS_CON_IDS = (
+    "SELECT DISTINCT b.orden, b.datos, a.inicio_us FROM bloqueo_alcances a JOIN bloqueos b ON b.orden = a.orden"
+    f" WHERE a.scope = ? AND a.objetivo IS NOT NULL AND {_SOLAPE_ALCANCE} ORDER BY a.inicio_us, a.orden"
+)
+
+
+@dataclass
+class ReservaSQLite:
+    """Instantánea de una reserva leída de SQLite (mismos atributos que `Reserva`)."""
+
+    reserva_id: str
+    servicio_id: str
+    empleado_id: str
+    equipo_id: Optional[str]
+    inicio_slot: datetime
+    fin_slot: datetime
+    creada_en: datetime
+    estado: str = "confirmada"
+    scenario_id: Optional[str] = None
+    version: int = 1
+
+
+def _reserva(fila: Tuple[Any, ...]) -> ReservaSQLite:
+    reserva_id, servicio_id, empleado_id, equipo_id, inicio, fin, creada_us, estado, scenario_id, version = fila
+    return ReservaSQLite(
+        reserva_id=reserva_id,
+        servicio_id=servicio_id,
+        empleado_id=empleado_id,
+        equipo_id=equipo_id,
+        inicio_slot=desde_minutos(inicio),
+        fin_slot=desde_minutos(fin),
+        creada_en=desde_microsegundos(creada_us),
+        estado=estado,
+        scenario_id=scenario_id,
+        version=version,
+    )
+
+
+def _rango_reservas(inicio_dt: datetime, fin_dt: datetime) -> Tuple[int, int, int]:
+    # Mismo redondeo que las consultas en memoria: piso del inicio, techo del fin
+    ini, fin = minutos_epoch(inicio_dt), minuto_techo(fin_dt)
+    return fin, ini, ini
+
+
+def _us(dt: datetime) -> int:
+    return microsegundos_epoch(dt if dt.tzinfo is not None else dt.replace(tzinfo=timezone.utc))
+
+
+class _PoolConexiones:
+    """Conexiones reutilizables (hasta `tamano`); se crean a demanda."""
+
+    def __init__(self, ruta: Path, tamano: int) -> None:
+        self._ruta = ruta
+        self._tamano = tamano
+        self._libres: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._creadas = 0
+        self._todas: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def _abrir(self) -> sqlite3.Connection:
+        # Autocommit: las transacciones se abren explícitamente con BEGIN IMMEDIATE
+        con = sqlite3.connect(
+            self._ruta, timeout=30.0, isolation_level=None, check_same_thread=False, cached_statements=256
+        )
+        con.execute("PRAGMA synchronous = NORMAL")
+        con.execute("PRAGMA busy_timeout = 30000")
+        return con
+
+    @contextmanager
+    def conexion(self) -> Iterator[sqlite3.Connection]:
+        try:
+            con = self._libres.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                crear = self._creadas < self._tamano
+                if crear:
+                    self._creadas += 1
+            if crear:
+                con = self._abrir()
+                self._todas.append(con)
+            else:
+                con = self._libres.get()
+        try:
+            yield con
+        finally:
+            self._libres.put(con)
+
+    def cerrar(self) -> None:
+        for con in self._todas:
+            con.close()
+        self._todas = []
+
+
+class RepositorioSQLite:
+    """Reservas y bloqueos persistidos en un archivo SQLite (interfaz de `mock_state`)."""
+
+    def __init__(self, ruta: str | Path, *, tamano_pool: int = TAMANO_POOL) -> None:
+        self._ruta = Path(ruta)
+        self._pool = _PoolConexiones(self._ruta, tamano_pool)
+        # Los bloqueos no cambian una vez creados: se decodifican una sola vez
+        self._bloqueos: Dict[int, Dict[str, Any]] = {}
+        with self._pool.conexion() as con:
+            con.execute("PRAGMA journal_mode = WAL")
+            con.executescript(_ESQUEMA)
+
+    def cerrar(self) -> None:
+        self._pool.cerrar()
+
+    @contextmanager
+    def _transaccion(self) -> Iterator[sqlite3.Connection]:
+        """Transacción de escritura: toma el candado de escritura de SQLite al empezar."""
+        with self._pool.conexion() as con:
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                yield con
+                con.execute("COMMIT")
+            except BaseException:
+                # También si falla el COMMIT: la conexión no vuelve al pool con la transacción abierta
+                if con.in_transaction:
+                    con.execute("ROLLBACK")
+                raise
+
+    def reset_state(self) -> None:
+        with self._transaccion() as con:
+            con.execute("DELETE FROM bloqueo_alcances")
+            con.execute("DELETE FROM bloqueos")
+            con.execute("DELETE FROM reservas")
+            con.execute("UPDATE meta SET valor = 0")
+        self._bloqueos = {}
+
+    # Reservas
+
+    def get_reserva(self, reserva_id: str) -> Optional[ReservaSQLite]:
+        with self._pool.conexion() as con:
+            fila = con.execute(_SQL_POR_ID, (reserva_id,)).fetchone()
+        return _reserva(fila) if fila else None
+
+    def list_reservas(self) -> List[ReservaSQLite]:
+        with self._pool.conexion() as con:
+            return [_reserva(f) for f in con.execute(_SQL_TODAS)]
+
+    def get_reservas_en_rango(self, inicio_dt: datetime, fin_dt: datetime) -> List[ReservaSQLite]:
+        with self._pool.conexion() as con:
+            return [_reserva(f) for f in con.execute(_SQL_RANGO, _rango_reservas(inicio_dt, fin_dt))]
+
+    def get_reservas_recurso_en_rango(
+        self,
+        *,
+        empleado_id: Optional[str] = None,
+        equipo_id: Optional[str] = None,
+        inicio_dt: datetime,
+        fin_dt: datetime,
+    ) -> List[ReservaSQLite]:
+        if (empleado_id is None) == (equipo_id is None):
+            raise ValueError("Indicar exactamente uno de empleado_id o equipo_id")
+        sql, recurso = (
+            (_SQL_RANGO_EMPLEADO, empleado_id) if empleado_id is not None else (_SQL_RANGO_EQUIPO, equipo_id)
+        )
+        with self._pool.conexion() as con:
+            return [_reserva(f) for f in con.execute(sql, (recurso, *_rango_reservas(inicio_dt, fin_dt)))]
+
+    def _hay_conflicto(
+        self, con: sqlite3.Connection, empleado_id: str, equipo_id: Optional[str], inicio_dt: datetime, fin_dt: datetime
+    ) -> bool:
+        rango = _rango_reservas(inicio_dt, fin_dt)
+        if equipo_id is None:
+            return con.execute(_SQL_CONFLICTO, (empleado_id, *rango)).fetchone() is not None
+        return con.execute(_SQL_CONFLICTO_EQUIPO, (empleado_id, *rango, equipo_id)).fetchone() is not None
+
+    def has_conflict(
+        self, *, empleado_id: str, equipo_id: Optional[str], inicio_dt: datetime, fin_dt: datetime
+    ) -> bool:
+        with self._pool.conexion() as con:
+            return self._hay_conflicto(con, empleado_id, equipo_id, inicio_dt, fin_dt)
+
+    def add_reserva(
+        self,
+        *,
+        servicio_id: str,
+        empleado_id: str,
+        equipo_id: Optional[str],
+        inicio_slot: datetime,
+        fin_slot: datetime,
+        scenario_id: Optional[str] = None,
+    ) -> ReservaSQLite:
+        if fin_slot <= inicio_slot:
+            raise ValueError("Rango de tiempo inválido para la reserva")
+        inicio_min, fin_min = minuto_exacto(inicio_slot), minuto_exacto(fin_slot)
+        creada = datetime.now(timezone.utc)
+        with self._transaccion() as con:
+            if self._hay_conflicto(con, empleado_id, equipo_id, inicio_slot, fin_slot):
+                raise ValueError("Conflicto: el slot ya no está disponible")
+            fila = con.execute("SELECT COALESCE(MAX(fila), 0) + 1 FROM reservas").fetchone()[0]
+            reserva_id = f"R-{creada.strftime('%Y%m%d%H%M%S%f')}-{fila}"
+            con.execute(
+                _SQL_ALTA,
+                (fila, reserva_id, servicio_id, empleado_id, equipo_id, inicio_min, fin_min, microsegundos_epoch(creada), scenario_id),
+            )
+            con.execute(_SQL_COTA, (fin_min - inicio_min, "max_duracion_reserva"))
+        return ReservaSQLite(
+            reserva_id=reserva_id,
+            servicio_id=servicio_id,
+            empleado_id=empleado_id,
+            equipo_id=equipo_id,
+            inicio_slot=desde_minutos(inicio_min),
+            fin_slot=desde_minutos(fin_min),
+            creada_en=desde_microsegundos(microsegundos_epoch(creada)),
+            scenario_id=scenario_id,
+        )
+
+    def update_reserva(
+        self,
+        *,
+        reserva_id: str,
+        empleado_id: Optional[str] = None,
+        equipo_id: Optional[str] = None,
+        estado: Optional[str] = None,
+        expected_version: Optional[int] = None,
+    ) -> Optional[ReservaSQLite]:
+        with self._transaccion() as con:
+            if expected_version is None:
+                cur = con.execute(_SQL_ACTUALIZAR, (empleado_id, equipo_id, estado, reserva_id))
+            else:
+                cur = con.execute(_SQL_ACTUALIZAR_CAS, (empleado_id, equipo_id, estado, reserva_id, expected_version))
+            fila = con.execute(_SQL_POR_ID, (reserva_id,)).fetchone()
+            if fila is None:
+                return None
+            if cur.rowcount == 0:
+                raise ConflictoVersion(
+                    f"Conflicto de versión: reserva {reserva_id} en v{fila[-1]}, se esperaba v{expected_version}"
+                )
+        return _reserva(fila)
+
+    # Bloqueos
+
+    def add_bloqueo(self, bloqueo: Dict[str, Any]) -> Dict[str, Any]:
+        rec = dict(bloqueo)
+        bi, bf = rec.get("inicio_utc"), rec.get("fin_utc")
+        indexable = isinstance(bi, datetime) and isinstance(bf, datetime)
+        ini_us, fin_us = (_us(bi), _us(bf)) if indexable else (None, None)
+        with self._transaccion() as con:
+            orden = con.execute("SELECT COALESCE(MAX(orden), 0) + 1 FROM bloqueos").fetchone()[0]
+            rec["id"] = f"B-{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S%f')}-{orden}"
+            con.execute(_SQL_ALTA_BLOQUEO, (orden, rec["id"], ini_us, fin_us, a_json(rec)))
+            if indexable:
+                scope = str(rec.get("scope", "")).lower()
+                campo = CAMPOS_ALCANCE.get(scope)
+                objetivos = (list(dict.fromkeys(rec.get(campo, []) or [])) if campo else []) or [None]
+                con.executemany(_SQL_ALTA_ALCANCE, [(orden, scope, o, ini_us, fin_us) for o in objetivos])
+                con.execute(_SQL_COTA, (fin_us - ini_us, "max_duracion_bloqueo"))
+        return rec
+
+    def _decodificar(self, filas: List[Tuple[Any, ...]]) -> List[Tuple[int, Dict[str, Any]]]:
+        """(orden, bloqueo) de cada fila `(orden, datos, ...)`."""
+        cache = self._bloqueos
+        res = []
+        for orden, datos, *_ in filas:
+            rec = cache.get(orden)
+            if rec is None:
+                if len(cache) >= MAX_BLOQUEOS_EN_CACHE:
+                    cache.clear()
+                rec = cache.setdefault(orden, desde_json(datos))
+            res.append((orden, rec))
+        return res
+
+    def _por_objetivo(
+        self, con: sqlite3.Connection, scope: str, objetivo: Optional[str], rango: Tuple[int, int, int]
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        return self._decodificar(con.execute(_SQL_BLOQUEOS_OBJETIVO, (scope, objetivo, *rango)).fetchall())
+
+    def get_bloqueos_en_rango(self, inicio_dt: datetime, fin_dt: datetime) -> List[Dict[str, Any]]:
+        rango = (_us(fin_dt), _us(inicio_dt), _us(inicio_dt))
+        with self._pool.conexion() as con:
+            return [b for _, b in self._decodificar(con.execute(_SQL_BLOQUEOS_RANGO, rango).fetchall())]
+
+    def get_bloqueos_por_alcance(
+        self,
+        inicio_dt: datetime,
+        fin_dt: datetime,
+        *,
+        empleado_ids: Optional[List[str]] = None,
+        equipo_ids: Optional[List[str]] = None,
+        servicio_ids: Optional[List[str]] = None,
+    ) -> Dict[str, Dict[Optional[str], List[Dict[str, Any]]]]:
+        rango = (_us(fin_dt), _us(inicio_dt), _us(inicio_dt))
+        pedidos = {"employee": empleado_ids, "equipment": equipo_ids, "service": servicio_ids}
+        with self._pool.conexion() as con:
+            res: Dict[str, Dict[Optional[str], List[Dict[str, Any]]]] = {
+                "business": {None: [b for _, b in self._por_objetivo(con, "business", None, rango)]}
+            }
+            for scope, ids in pedidos.items():
+                grupo: Dict[Optional[str], List[Dict[str, Any]]] = {}
+                for objetivo in [None, *dict.fromkeys(ids)] if ids else []:
+                    encontrados = self._por_objetivo(con, scope, objetivo, rango)
+                    if encontrados:
+                        grupo[objetivo] = [b for _, b in encontrados]
+                res[scope] = grupo
+        return res
+
+    def get_bloqueos_intersecting(
+        self,
+        inicio_dt: datetime,
+        fin_dt: datetime,
+        recursos: Optional[Dict[str, List[str]]] = None,
+    ) -> List[Dict[str, Any]]:
+        recursos = recursos or {}
+        pedidos = {
+            "employee": recursos.get("empleado_ids", []) or [],
+            "equipment": recursos.get("equipo_ids", []) or [],
+            "service": recursos.get("servicio_ids", []) or [],
+        }
+        rango = (_us(fin_dt), _us(inicio_dt), _us(inicio_dt))
+        res: Dict[int, Dict[str, Any]] = {}
+        with self._pool.conexion() as con:
+            res.update(self._por_objetivo(con, "business", None, rango))
+            for scope, ids in pedidos.items():
+                if not ids:
+                    candidatos = self._decodificar(con.execute(_SQL_BLOQUEOS_CON_IDS, (scope, *rango)).fetchall())
+                else:
+                    candidatos = [c for objetivo in dict.fromkeys(ids) for c in self._por_objetivo(con, scope, objetivo, rango)]
+                for orden, b in candidatos:
+                    res.setdefault(orden, b)
+        # Mismo orden que en memoria: inicio y luego inserción
+        return [b for _, b in sorted(res.items(), key=lambda ob: (ob[1]["inicio_utc"], ob[0]))]
@@ -0,0 +1,383 @@
+"""
+Durabilidad local del estado en memoria: log de escritura anticipada (WAL)
+por segmentos e instantáneas compactas.
+
+Archivos en el directorio de datos:
+- `wal-<n>.log`: segmento n del log. Cada línea es un registro JSON precedido
+  por su CRC32 (`<crc hex>\\t<json>\\n`); una línea truncada o corrupta marca
+  el final de lo durable (escritura interrumpida por una caída).
+- `snapshot-<n>.bin`: estado completo al abrir el segmento n. Una cabecera
+  JSON (cadenas internadas, bloqueos, largo de cada columna) seguida de los
+  bytes crudos de las columnas del almacén de reservas. Se escribe en un
+  temporal y se publica con `os.replace`, así que nunca queda a medias.
+
+Recuperar = cargar la última instantánea y reproducir los segmentos desde el
+suyo en adelante.
+
+Confirmación en grupo (group commit): `anotar` solo encola el registro (se
+llama bajo los candados del estado y define el orden del log); `confirmar`
+espera fuera de esos candados a que el registro llegue al disco. El primer
+hilo que espera escribe y sincroniza todo lo encolado hasta ese momento, de
+modo que escrituras concurrentes comparten un mismo `fsync`.
+
+Políticas de fsync (`POLITICAS_FSYNC`):
+- "siempre": `confirmar` retorna después del `fsync` que cubre el registro.
+- "intervalo": se escribe al sistema operativo en cada confirmación y se
+  sincroniza como mucho cada `intervalo_fsync_s`. Un hilo en segundo plano
+  sincroniza lo escrito y aún no sincronizado cuando vence el intervalo, aunque
+  no lleguen más escrituras (una caída del equipo puede perder ese último
+  intervalo; una caída del proceso no).
+- "nunca": solo se escribe al sistema operativo; el `fsync` queda a su cargo.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+POLITICAS_FSYNC = ("siempre", "intervalo", "nunca")
+
+_MAGIA_INSTANTANEA = b"TELENSOR-SNAPSHOT 1\n"
+_PATRON_SEGMENTO = re.compile(r"^wal-(\d+)\.log$")
+_PATRON_INSTANTANEA = re.compile(r"^snapshot-(\d+)\.bin$")
+
+
+def _ruta_segmento(directorio: Path, n: int) -> Path:
+    return directorio / f"wal-{n:08d}.log"
+
+
+def _ruta_instantanea(directorio: Path, n: int) -> Path:
+    return directorio / f"snapshot-{n:08d}.bin"
+
+
+def _numerados(directorio: Path, patron: "re.Pattern[str]") -> List[int]:
+    return sorted(int(m.group(1)) for m in (patron.match(p.name) for p in directorio.iterdir()) if m)
+
+
+def _sincronizar_directorio(directorio: Path) -> None:
+    # Publica creaciones, renombres y borrados de archivos (no disponible en Windows)
+    try:
+        fd = os.open(directorio, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+# Codificación JSON de registros (los bloqueos llevan datetimes)
+
+
+def _codificar(valor: Any) -> Any:
+    if isinstance(valor, datetime):
+        return {"$dt": valor.isoformat()}
+    raise TypeError(f"Valor no serializable en el log: {type(valor).__name__}")
+
+
+def _decodificar(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and "$dt" in obj:
+        return datetime.fromisoformat(obj["$dt"])
+    return obj
+
+
+# Decodificador reutilizado: `json.loads` con object_hook crea uno por llamada
+_DECODIFICADOR = json.JSONDecoder(object_hook=_decodificar)
+
+
+def a_json(valor: Any) -> str:
+    """JSON compacto; los `datetime` se codifican como `{"$dt": iso}`."""
+    return json.dumps(valor, separators=(",", ":"), ensure_ascii=False, default=_codificar)
+
+
+def desde_json(texto: str) -> Any:
+    """Inverso de `a_json` (restaura los `datetime`)."""
+    return _DECODIFICADOR.decode(texto)
+
+
+def _linea(registro: Dict[str, Any]) -> bytes:
+    cuerpo = a_json(registro).encode("utf-8")
+    return b"%08x\t%s\n" % (zlib.crc32(cuerpo), cuerpo)
+
+
+def leer_segmento(ruta: Path) -> Tuple[List[Dict[str, Any]], int]:
+    """Registros válidos de un segmento y el largo en bytes de ese prefijo válido.
+
+    La lectura se detiene en la primera línea incompleta o con CRC inválido.
+    """
+    registros: List[Dict[str, Any]] = []
+    valido = 0
+    with ruta.open("rb") as f:
+        datos = f.read()
+    decodificar = _DECODIFICADOR.decode
+    crc32 = zlib.crc32
+    for linea in datos.splitlines(keepends=True):
+        if linea[-1:] != b"\n" or linea[8:9] != b"\t":
+            break
+        cuerpo = linea[9:-1]
+        try:
+            if int(linea[:8], 16) != crc32(cuerpo):
+                break
+            registros.append(decodificar(cuerpo.decode("utf-8")))
+        except ValueError:
+            break
+        valido += len(linea)
+    return registros, valido
+
+
+class RegistroEscritura:
+    """Log de escritura anticipada por segmentos con confirmación en grupo."""
+
+    def __init__(
+        self,
+        directorio: Path,
+        segmento: int,
+        *,
+        politica_fsync: str = "siempre",
+        intervalo_fsync_s: float = 0.05,
+    ) -> None:
+        if politica_fsync not in POLITICAS_FSYNC:
+            raise ValueError(f"Política de fsync desconocida: {politica_fsync!r}; opciones: {POLITICAS_FSYNC}")
+        self._directorio = Path(directorio)
+        self._politica = politica_fsync
+        self._intervalo = intervalo_fsync_s
+        self._cond = threading.Condition(threading.Lock())
+        self._pendientes: List[bytes] = []
+        self._anotados = 0  # último número de registro encolado
+        self._inicio_segmento = 0  # `_anotados` al abrir el segmento actual
+        self._durables = 0  # último número de registro escrito según la política
+        self._escribiendo = False
+        # Primer error de escritura: el log queda inutilizable (no se sabe qué llegó al disco)
+        self._error: Optional[OSError] = None
+        self._ultimo_fsync = time.monotonic()
+        self._sin_sincronizar = False  # hay bytes escritos al SO después del último fsync
+        self._detener = False
+        self._segmento = segmento
+        self._archivo = _ruta_segmento(self._directorio, segmento).open("ab")
+        _sincronizar_directorio(self._directorio)
+        self._sincronizador: Optional[threading.Thread] = None
+        if politica_fsync == "intervalo":
+            self._sincronizador = threading.Thread(
+                target=self._sincronizar_periodicamente, name="telensor-wal-fsync", daemon=True
+            )
+            self._sincronizador.start()
+
+    @property
+    def segmento(self) -> int:
+        return self._segmento
+
+    @property
+    def fallido(self) -> bool:
+        """¿Falló alguna escritura? Desde entonces ningún registro puede volverse durable."""
+        return self._error is not None
+
+    @property
+    def anotados_en_segmento(self) -> int:
+        return self._anotados - self._inicio_segmento
+
+    def anotar(self, registro: Dict[str, Any]) -> int:
+        """Encola un registro y devuelve su número (bajo los candados del estado)."""
+        linea = _linea(registro)
+        with self._cond:
+            self._pendientes.append(linea)
+            self._anotados += 1
+            return self._anotados
+
+    def confirmar(self, numero: int) -> None:
+        """Espera a que el registro `numero` sea durable según la política de fsync."""
+        with self._cond:
+            while self._durables < numero:
+                if self._error is not None:
+                    raise OSError("El log de escritura anticipada falló; el registro no es durable") from self._error
+                if self._escribiendo:
+                    self._cond.wait()
+                    continue
+                # Este hilo escribe el lote de todos los registros encolados hasta ahora
+                lote, hasta = self._pendientes, self._anotados
+                self._pendientes = []
+                self._escribiendo = True
+                self._cond.release()
+                error = None
+                try:
+                    self._escribir(lote, forzar_fsync=False)
+                except OSError as exc:
+                    error = exc
+                finally:
+                    self._cond.acquire()
+                    self._escribiendo = False
+                    self._cond.notify_all()
+                if error is not None:
+                    self._error = error
+                else:
+                    self._durables = hasta
+
+    def _escribir(self, lote: List[bytes], *, forzar_fsync: bool) -> None:
+        self._archivo.write(b"".join(lote))
+        self._archivo.flush()
+        ahora = time.monotonic()
+        if forzar_fsync or self._politica == "siempre" or (
+            self._politica == "intervalo" and ahora - self._ultimo_fsync >= self._intervalo
+        ):
+            os.fsync(self._archivo.fileno())
+            self._ultimo_fsync = ahora
+            self._sin_sincronizar = False
+        else:
+            self._sin_sincronizar = True
+
+    def _sincronizar_periodicamente(self) -> None:
+        """Hilo de la política "intervalo": `fsync` de lo pendiente al vencer el intervalo.
+
+        Toma el turno de escritura (`_escribiendo`) mientras sincroniza, así
+        que no se cruza con un lote en curso ni con `rotar`/`cerrar`, y sin
+        retener `_cond`, así que `anotar` nunca espera a un `fsync`.
+        """
+        with self._cond:
+            while not self._detener and self._error is None:
+                if self._escribiendo or not self._sin_sincronizar:
+                    # Despierta con el `notify_all` que sigue a cada lote
+                    self._cond.wait()
+                    continue
+                restante = self._ultimo_fsync + self._intervalo - time.monotonic()
+                if restante > 0:
+                    self._cond.wait(restante)
+                    continue
+                self._escribiendo = True
+                self._cond.release()
+                error = None
+                try:
+                    os.fsync(self._archivo.fileno())
+                except OSError as exc:
+                    error = exc
+                finally:
+                    self._cond.acquire()
+                    self._escribiendo = False
+                    self._cond.notify_all()
+                if error is not None:
+                    self._error = error
+                else:
+                    self._ultimo_fsync = time.monotonic()
+                    self._sin_sincronizar = False
+
+    def _vaciar(self) -> None:
+        """Escribe y sincroniza todo lo encolado (con `_cond` tomado)."""
+        while self._escribiendo:
+            self._cond.wait()
+        if self._error is not None:
+            raise OSError("El log de escritura anticipada falló") from self._error
+        lote, self._pendientes = self._pendientes, []
+        self._escribir(lote, forzar_fsync=self._politica != "nunca")
+        self._durables = self._anotados
+        self._cond.notify_all()
+
+    def rotar(self) -> int:
+        """Cierra el segmento actual (vaciándolo) y abre el siguiente; devuelve su número.
+
+        Debe llamarse con las escrituras del estado detenidas, para que el corte
+        entre segmentos coincida con el estado que se vuelca en la instantánea.
+        """
+        with self._cond:
+            self._vaciar()
+            self._archivo.close()
+            self._segmento += 1
+            self._inicio_segmento = self._anotados
+            self._archivo = _ruta_segmento(self._directorio, self._segmento).open("ab")
+        _sincronizar_directorio(self._directorio)
+        return self._segmento
+
+    def cerrar(self) -> None:
+        with self._cond:
+            self._detener = True
+            self._cond.notify_all()
+        if self._sincronizador is not None:
+            self._sincronizador.join()
+        with self._cond:
+            if self._archivo.closed:
+                return
+            try:
+                # Un log fallido no tiene nada que vaciar con garantías: solo se cierra
+                if self._error is None:
+                    self._vaciar()
+            finally:
+                self._archivo.close()
+
+
+def escribir_instantanea(
+    directorio: Path,
+    segmento: int,
+    cadenas: List[str],
+    columnas: Dict[str, array],
+    bloqueos: List[Dict[str, Any]],
+) -> Path:
+    """Publica atómicamente la instantánea del estado al abrir `segmento`."""
+    directorio = Path(directorio)
+    cabecera = {
+        "segmento": segmento,
+        "cadenas": cadenas,
+        "bloqueos": bloqueos,
+        "columnas": [[nombre, col.typecode, col.itemsize, len(col)] for nombre, col in columnas.items()],
+    }
+    cuerpo = a_json(cabecera).encode("utf-8")
+    ruta = _ruta_instantanea(directorio, segmento)
+    temporal = ruta.with_suffix(".tmp")
+    with temporal.open("wb") as f:
+        f.write(_MAGIA_INSTANTANEA)
+        f.write(b"%d\n" % len(cuerpo))
+        f.write(cuerpo)
+        for col in columnas.values():
+            col.tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+    _sincronizar_directorio(directorio)
+    return ruta
+
+
+def leer_instantanea(ruta: Path) -> Tuple[int, List[str], Dict[str, array], List[Dict[str, Any]]]:
+    """(segmento, cadenas, columnas, bloqueos) de una instantánea."""
+    with Path(ruta).open("rb") as f:
+        if f.readline() != _MAGIA_INSTANTANEA:
+            raise ValueError(f"{ruta}: no es una instantánea válida")
+        largo = int(f.readline())
+        cabecera = desde_json(f.read(largo).decode("utf-8"))
+        columnas: Dict[str, array] = {}
+        for nombre, tipo, tamano, n in cabecera["columnas"]:
+            col = array(tipo)
+            if col.itemsize != tamano:
+                raise ValueError(f"{ruta}: columna {nombre} con elementos de {tamano} bytes (aquí {col.itemsize})")
+            col.fromfile(f, n)
+            columnas[nombre] = col
+    return cabecera["segmento"], cabecera["cadenas"], columnas, cabecera["bloqueos"]
+
+
+def ultima_instantanea(directorio: Path) -> Optional[Path]:
+    numeros = _numerados(Path(directorio), _PATRON_INSTANTANEA)
+    return _ruta_instantanea(Path(directorio), numeros[-1]) if numeros else None
+
+
+def segmentos_desde(directorio: Path, desde: int) -> Iterator[Tuple[int, Path]]:
+    """Segmentos del log con número >= `desde`, en orden."""
+    for n in _numerados(Path(directorio), _PATRON_SEGMENTO):
+        if n >= desde:
+            yield n, _ruta_segmento(Path(directorio), n)
+
+
+def podar(directorio: Path, segmento: int) -> None:
+    """Borra los segmentos e instantáneas anteriores a la instantánea de `segmento`."""
+    directorio = Path(directorio)
+    for n in _numerados(directorio, _PATRON_SEGMENTO):
+        if n < segmento:
+            _ruta_segmento(directorio, n).unlink(missing_ok=True)
+    for n in _numerados(directorio, _PATRON_INSTANTANEA):
+        if n < segmento:
+            _ruta_instantanea(directorio, n).unlink(missing_ok=True)
+    _sincronizar_directorio(directorio)
@@ -0,0 +1,20 @@
+import pytest
+
+from telensor_engine.api import adapter
+
+# Tres empleados intercambiables para SVC (07:00-18:00), sin ocupaciones
+ESCENARIO_TRES_EMPLEADOS = {
+    "servicios": {"SVC": {"duracion": 50, "buffer_previo": 5, "buffer_posterior": 5}},
+    "empleados": [
+        {"empleado_id": eid, "horario_trabajo": [420, 1080], "servicios_asignados": ["SVC"]}
+        for eid in ("E1", "E2", "E3")
+    ],
+    "ocupaciones": [],
+}
+
+
+@pytest.fixture
+def escenario_tres_empleados(monkeypatch):
+    """`load_scenario` del adaptador devuelve `ESCENARIO_TRES_EMPLEADOS` para cualquier id."""
+    monkeypatch.setattr(adapter, "load_scenario", lambda _sid: ESCENARIO_TRES_EMPLEADOS)
+    return ESCENARIO_TRES_EMPLEADOS
@@ -128,3 +128,99 @@ def test_bloqueo_negocio_reagenda_todo():
     estados = {r.reserva_id: r.estado for r in res if r.reserva_id in rids}
     assert all(v == "PENDIENTE_REAGENDA" for v in estados.values())
 
+
+def test_cascada_en_lote_consume_capacidad(escenario_tres_empleados):
+    from telensor_engine.api import adapter
+
+    mock_state.reset_state()
+
+    inicio = pendulum.parse("2025-11-06T09:00:00Z")
+    fin = inicio.add(minutes=60)
+    r1 = mock_state.add_reserva(
+        servicio_id="SVC", empleado_id="E1", equipo_id=None, inicio_slot=inicio, fin_slot=fin, scenario_id="tres"
+    )
+    r2 = mock_state.add_reserva(
+        servicio_id="SVC", empleado_id="E2", equipo_id=None, inicio_slot=inicio, fin_slot=fin, scenario_id="tres"
+    )
+
+    resultado = adapter.gestionar_creacion_bloqueo(
+        {"inicio_utc": inicio, "fin_utc": fin, "motivo": "Capacitación", "scope": "employee", "empleado_ids": ["E1", "E2"]}
+    )
+
+    # Una sola plaza libre (E3): la primera reserva la consume y la segunda queda pendiente
+    estados = {p["reserva_id"]: p for p in resultado["procesadas"]}
+    assert estados[r1.reserva_id]["estado"] == "REASIGNADA"
+    assert estados[r1.reserva_id]["empleado_id"] == "E3"
+    assert estados[r2.reserva_id]["estado"] == "PENDIENTE_REAGENDA"
+    assert set(resultado["tiempos_ms"]) == {"recoleccion", "instantanea", "resolucion", "aplicacion", "total"}
+
+
+def test_cascada_entre_servicios_comparte_capacidad(monkeypatch):
+    from telensor_engine.api import adapter
+
+    # Dos servicios en grupos distintos de la cascada, los mismos tres empleados
+    escenario = {
+        "servicios": {s: {"duracion": 50, "buffer_previo": 5, "buffer_posterior": 5} for s in ("A", "B")},
+        "empleados": [
+            {"empleado_id": eid, "horario_trabajo": [420, 1080], "servicios_asignados": ["A", "B"]}
+            for eid in ("E1", "E2", "E3")
+        ],
+        "ocupaciones": [],
+    }
+    monkeypatch.setattr(adapter, "load_scenario", lambda _sid: escenario)
+    mock_state.reset_state()
+
+    inicio = pendulum.parse("2025-11-06T09:00:00Z")
+    fin = inicio.add(minutes=60)
+    ra = mock_state.add_reserva(
+        servicio_id="A", empleado_id="E1", equipo_id=None, inicio_slot=inicio, fin_slot=fin, scenario_id="dos"
+    )
+    rb = mock_state.add_reserva(
+        servicio_id="B", empleado_id="E2", equipo_id=None, inicio_slot=inicio, fin_slot=fin, scenario_id="dos"
+    )
+    resultado = adapter.gestionar_creacion_bloqueo(
+        {"inicio_utc": inicio, "fin_utc": fin, "motivo": "Capacitación", "scope": "employee", "empleado_ids": ["E1", "E2"]}
+    )
+
+    # E3 queda tomado por la primera reasignación aunque la segunda sea de otro servicio
+    estados = {p["reserva_id"]: p for p in resultado["procesadas"]}
+    assert (estados[ra.reserva_id]["estado"], estados[ra.reserva_id]["empleado_id"]) == ("REASIGNADA", "E3")
+    assert estados[rb.reserva_id]["estado"] == "PENDIENTE_REAGENDA"
+    en_e3 = mock_state.get_reservas_recurso_en_rango(empleado_id="E3", inicio_dt=inicio, fin_dt=fin)
+    assert [r.reserva_id for r in en_e3] == [ra.reserva_id]
+
+
+def test_cascada_reintenta_ante_conflicto_de_version(escenario_tres_empleados, monkeypatch):
+    from telensor_engine.api import adapter
+
+    mock_state.reset_state()
+
+    inicio = pendulum.parse("2025-11-06T09:00:00Z")
+    fin = inicio.add(minutes=60)
+    movida = mock_state.add_reserva(
+        servicio_id="SVC", empleado_id="E1", equipo_id=None, inicio_slot=inicio, fin_slot=fin, scenario_id="tres"
+    )
+    sigue = mock_state.add_reserva(
+        servicio_id="SVC", empleado_id="E1", equipo_id=None, inicio_slot=fin, fin_slot=fin.add(minutes=60), scenario_id="tres"
+    )
+
+    # Escritura concurrente durante la planificación de la primera reserva: la mueve a E3
+    decidir = adapter._decidir_reasignacion
+    concurrentes = []
+
+    def _decidir_con_carrera(r, *args):
+        if r == movida and not concurrentes:
+            concurrentes.append(mock_state.update_reserva(reserva_id=r.reserva_id, empleado_id="E3"))
+        return decidir(r, *args)
+
+    monkeypatch.setattr(adapter, "_decidir_reasignacion", _decidir_con_carrera)
+    resultado = adapter.gestionar_creacion_bloqueo(
+        {"inicio_utc": inicio, "fin_utc": fin.add(minutes=60), "motivo": "Baja", "scope": "employee", "empleado_ids": ["E1"]}
+    )
+
+    # El CAS falla, la reserva ya no está en el alcance y no se toca; la otra se reasigna
+    procesadas = {p["reserva_id"]: p for p in resultado["procesadas"]}
+    assert movida.reserva_id not in procesadas
+    assert (movida.empleado_id, movida.estado, movida.version) == ("E3", "confirmada", 2)
+    assert procesadas[sigue.reserva_id]["estado"] == "REASIGNADA"
+    assert procesadas[sigue.reserva_id]["empleado_id"] == "E2"
@@ -0,0 +1,35 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pendulum
+
+from telensor_engine.api.adapter import _to_minute_range
+from telensor_engine.epoch_minutes import minutos_epoch
+
+
+def _ruta_pendulum(base, valor):
+    dt = (
+        pendulum.instance(valor).in_timezone("UTC")
+        if isinstance(valor, datetime)
+        else pendulum.parse(str(valor)).in_timezone("UTC")
+    )
+    return int((dt - base).total_seconds() // 60)
+
+
+def test_equivale_a_la_ruta_pendulum():
+    rng = random.Random(5)
+    base = pendulum.datetime(2025, 11, 6, tz="UTC")
+    zonas = [timezone.utc, timezone(timedelta(hours=-5)), timezone(timedelta(hours=5, minutes=30)), None]
+    for _ in range(2000):
+        dt = datetime(2025, 11, 6) + timedelta(seconds=rng.randrange(-3 * 86400, 3 * 86400))
+        tz = rng.choice(zonas)
+        if tz is not None:
+            dt = dt.replace(tzinfo=tz)
+        for valor in (dt, dt.isoformat(), dt.isoformat().replace("+00:00", "Z")):
+            assert minutos_epoch(valor) - minutos_epoch(base) == _ruta_pendulum(base, valor)
+
+
+def test_to_minute_range_con_cadenas_y_datetimes():
+    base = pendulum.datetime(2025, 11, 6, tz="UTC")
+    assert _to_minute_range(base, "2025-11-06T06:55:00Z", datetime(2025, 11, 6, 7, 55, tzinfo=timezone.utc)) == [415, 475]
+    assert _to_minute_range(base, "2025-11-05T23:00:00-01:00", "2025-11-07T00:00:30Z") == [0, 1440]
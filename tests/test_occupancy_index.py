@@ -0,0 +1,112 @@
+import random
+
+import pendulum
+
+from telensor_engine import mock_state
+from telensor_engine.occupancy_index import ArbolIntervalos
+
+
+def test_arbol_consulta_equivale_a_barrido():
+    rng = random.Random(11)
+    arbol = ArbolIntervalos()
+    vivos = {}
+    for i in range(2000):
+        s = rng.randrange(0, 100_000)
+        e = s + rng.randrange(1, 3000)
+        vivos[arbol.agregar(s, e, i)] = (s, e, i)
+        if i % 7 == 0:
+            clave = rng.choice(list(vivos))
+            assert arbol.quitar(clave)
+            del vivos[clave]
+    assert len(arbol) == len(vivos)
+    for _ in range(200):
+        a = rng.randrange(0, 100_000)
+        b = a + rng.randrange(1, 5000)
+        esperado = sorted(v for s, e, v in vivos.values() if s < b and e > a)
+        assert sorted(arbol.consultar(a, b)) == esperado
+
+
+def test_carga_en_lote_equivale_a_inserciones():
+    rng = random.Random(17)
+    items = sorted((rng.randrange(0, 10_000), i + 1) for i in range(3000))
+    items = [(s, orden, s + rng.randrange(1, 400), orden) for s, orden in items]
+    arbol = ArbolIntervalos()
+    arbol.cargar(items)
+    assert len(arbol) == len(items)
+    for _ in range(200):
+        a = rng.randrange(0, 10_000)
+        b = a + rng.randrange(1, 800)
+        assert arbol.consultar(a, b) == [v for s, _, e, v in items if s < b and e > a]
+    # Altas y bajas posteriores siguen funcionando sobre el árbol cargado
+    clave = arbol.agregar(5, 10, "nuevo")
+    assert clave[1] == len(items) + 1 and "nuevo" in arbol.consultar(0, 6)
+    assert arbol.quitar(clave) and arbol.quitar(items[0][:2])
+    assert len(arbol) == len(items) - 1
+
+
+def test_indice_sigue_reasignaciones_de_reservas():
+    mock_state.reset_state()
+    ini = pendulum.parse("2025-11-06T09:00:00Z")
+    fin = ini.add(minutes=45)
+    r = mock_state.add_reserva(
+        servicio_id="SVC2", empleado_id="E1", equipo_id="EQ1", inicio_slot=ini, fin_slot=fin
+    )
+    assert mock_state.get_reservas_recurso_en_rango(empleado_id="E1", inicio_dt=ini, fin_dt=fin) == [r]
+    assert mock_state.get_reservas_recurso_en_rango(equipo_id="EQ1", inicio_dt=ini, fin_dt=fin) == [r]
+
+    mock_state.update_reserva(reserva_id=r.reserva_id, empleado_id="E2", estado="REASIGNADA")
+    assert mock_state.get_reservas_recurso_en_rango(empleado_id="E1", inicio_dt=ini, fin_dt=fin) == []
+    assert mock_state.get_reservas_recurso_en_rango(empleado_id="E2", inicio_dt=ini, fin_dt=fin) == [r]
+    # Fuera de rango (semiabierto)
+    assert mock_state.get_reservas_recurso_en_rango(empleado_id="E2", inicio_dt=fin, fin_dt=fin.add(hours=1)) == []
+
+
+def test_conflictos_y_rango_equivalen_a_barrido():
+    mock_state.reset_state()
+    rng = random.Random(5)
+    base = pendulum.parse("2025-11-06T00:00:00Z")
+    for _ in range(600):
+        ini = base.add(minutes=rng.randrange(0, 5 * 1440))
+        fin = ini.add(minutes=rng.randrange(10, 120))
+        try:
+            mock_state.add_reserva(
+                servicio_id="SVC",
+                empleado_id=f"E{rng.randrange(8)}",
+                equipo_id=rng.choice([None, "EQ1", "EQ2"]),
+                inicio_slot=ini,
+                fin_slot=fin,
+            )
+        except ValueError:
+            pass
+    reservas = mock_state.list_reservas()
+    for _ in range(300):
+        a = base.add(minutes=rng.randrange(0, 5 * 1440))
+        b = a.add(minutes=rng.randrange(1, 240))
+        assert mock_state.get_reservas_en_rango(a, b) == [r for r in reservas if a < r.fin_slot and b > r.inicio_slot]
+        emp, eq = f"E{rng.randrange(8)}", rng.choice([None, "EQ1", "EQ2"])
+        esperado = any(
+            r.empleado_id == emp and (eq is None or r.equipo_id == eq) and a < r.fin_slot and b > r.inicio_slot
+            for r in reservas
+        )
+        assert mock_state.has_conflict(empleado_id=emp, equipo_id=eq, inicio_dt=a, fin_dt=b) is esperado
+
+
+def test_bloqueos_por_alcance_solo_recursos_pedidos():
+    mock_state.reset_state()
+    ini = pendulum.parse("2025-11-06T09:00:00Z")
+    fin = ini.add(hours=2)
+    # Historial irrelevante: otros empleados y días anteriores
+    for i in range(200):
+        mock_state.add_bloqueo(
+            {"inicio_utc": ini.subtract(days=30), "fin_utc": ini.subtract(days=29), "scope": "employee", "empleado_ids": ["E1"]}
+        )
+        mock_state.add_bloqueo({"inicio_utc": ini, "fin_utc": fin, "scope": "employee", "empleado_ids": [f"X{i}"]})
+    propio = mock_state.add_bloqueo({"inicio_utc": ini, "fin_utc": fin, "scope": "employee", "empleado_ids": ["E1", "E2"]})
+    todos = mock_state.add_bloqueo({"inicio_utc": ini, "fin_utc": fin, "scope": "equipment", "equipo_ids": []})
+    negocio = mock_state.add_bloqueo({"inicio_utc": ini, "fin_utc": fin, "scope": "business"})
+
+    res = mock_state.get_bloqueos_por_alcance(ini, fin, empleado_ids=["E1"], equipo_ids=["EQ1"])
+    assert res["business"] == {None: [negocio]}
+    assert res["employee"] == {"E1": [propio]}
+    assert res["equipment"] == {None: [todos]}
+    assert res["service"] == {}
@@ -0,0 +1,104 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from telensor_engine import mock_state
+from telensor_engine.api import adapter
+from telensor_engine.main import SolicitudDisponibilidad, SolicitudReserva
+from telensor_engine.providers import LoteOcupaciones, ProveedorSincrono
+
+
+class _ProveedorLento(ProveedorSincrono):
+    """mock_db con latencia; registra llamadas y cuántas hubo en vuelo a la vez."""
+
+    def __init__(self):
+        super().__init__()
+        self.llamadas = []
+        self._en_vuelo = 0
+        self.max_en_vuelo = 0
+
+    async def _llamar(self, fn, *args, **kwargs):
+        self.llamadas.append(fn.__name__)
+        self._en_vuelo += 1
+        self.max_en_vuelo = max(self.max_en_vuelo, self._en_vuelo)
+        try:
+            await asyncio.sleep(0.01)
+            return fn(*args, **kwargs)
+        finally:
+            self._en_vuelo -= 1
+
+
+def test_lote_funde_consultas_concurrentes_y_sirve_las_cubiertas():
+    pedidos = []
+
+    async def origen(empleados, inicio, fin):
+        pedidos.append((empleados, inicio, fin))
+        await asyncio.sleep(0)
+        return [{"empleado_id": e, "inicio": inicio, "fin": fin} for e in empleados]
+
+    async def escenario():
+        lote = LoteOcupaciones(origen)
+        a, b, c = await asyncio.gather(
+            lote.obtener(["E1"], 0, 60), lote.obtener(["E2", "E1"], 30, 90), lote.obtener(["E3"], 10, 20)
+        )
+        assert pedidos == [(["E1", "E2", "E3"], 0, 90)]
+        assert [oc["empleado_id"] for oc in a] == ["E1"]
+        assert [oc["empleado_id"] for oc in b] == ["E1", "E2"]
+        assert [oc["empleado_id"] for oc in c] == ["E3"]
+        # Cubiertas por lo ya cargado: sin nuevos viajes, también desde el motor síncrono
+        assert await lote.obtener(["E2"], 40, 50) == [{"empleado_id": "E2", "inicio": 0, "fin": 90}]
+        assert len(lote.como_funcion()(["E1", "E3"], 0, 90)) == 2
+        assert lote.consultas == 1
+        # No cubierta: nuevo viaje; en el motor síncrono, error de precarga
+        await lote.obtener(["E4"], 0, 10)
+        assert lote.consultas == 2
+        with pytest.raises(RuntimeError):
+            lote.como_funcion()(["E5"], 0, 10)
+
+    asyncio.run(escenario())
+
+
+def test_lote_propaga_errores_del_origen_a_todo_el_lote():
+    async def origen(empleados, inicio, fin):
+        raise ConnectionError("sin base de datos")
+
+    async def escenario():
+        lote = LoteOcupaciones(origen)
+        resultados = await asyncio.gather(lote.obtener(["E1"], 0, 10), lote.obtener(["E2"], 0, 10), return_exceptions=True)
+        assert [type(r) for r in resultados] == [ConnectionError, ConnectionError]
+        assert lote.consultas == 1
+
+    asyncio.run(escenario())
+
+
+def test_gerentes_async_piden_en_paralelo_y_equivalen_a_los_sincronos():
+    mock_state.reset_state()
+    inicio = datetime(2025, 11, 6, 8, 0, tzinfo=timezone.utc)
+    busqueda = SolicitudDisponibilidad(
+        servicio_id="SVC2", fecha_inicio_utc=inicio, fecha_fin_utc=inicio + timedelta(hours=12)
+    )
+    proveedor = _ProveedorLento()
+    slots = asyncio.run(adapter.gestionar_busqueda_disponibilidad_async(busqueda, proveedor=proveedor))
+    assert slots == adapter.gestionar_busqueda_disponibilidad(busqueda)
+    # Pool general: servicio y horarios a la vez; ocupaciones una sola vez tras los horarios
+    assert sorted(proveedor.llamadas) == ["get_horarios_empleados", "get_ocupaciones", "get_servicio"]
+    assert proveedor.max_en_vuelo == 2
+
+    # Reserva: empleado nombrado, las tres consultas a la vez
+    slot = next(s for s in slots if s["empleado_id_asignado"] == "E2")
+    reserva = SolicitudReserva(
+        servicio_id="SVC2",
+        empleado_id="E2",
+        equipo_id=slot["equipo_id_asignado"],
+        inicio_slot=slot["inicio_slot"],
+        fin_slot=slot["fin_slot"],
+    )
+    proveedor = _ProveedorLento()
+    creada = asyncio.run(adapter.gestionar_creacion_reserva_async(reserva, proveedor=proveedor))
+    assert (creada["empleado_id"], creada["inicio_slot"]) == ("E2", slot["inicio_slot"])
+    assert sorted(proveedor.llamadas) == ["get_horarios_empleados", "get_ocupaciones", "get_servicio"]
+    assert proveedor.max_en_vuelo == 3
+    with pytest.raises(ValueError, match="Conflicto"):
+        asyncio.run(adapter.gestionar_creacion_reserva_async(reserva, proveedor=ProveedorSincrono()))
+    mock_state.reset_state()
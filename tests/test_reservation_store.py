@@ -0,0 +1,42 @@
+import pendulum
+import pytest
+
+from telensor_engine import mock_state
+
+
+def test_vistas_reflejan_actualizaciones_del_almacen():
+    mock_state.reset_state()
+    ini = pendulum.parse("2025-11-06T09:00:00Z")
+    r = mock_state.add_reserva(
+        servicio_id="SVC2", empleado_id="E1", equipo_id=None, inicio_slot=ini, fin_slot=ini.add(minutes=45), scenario_id="s"
+    )
+    assert (r.servicio_id, r.empleado_id, r.equipo_id, r.scenario_id, r.estado) == ("SVC2", "E1", None, "s", "confirmada")
+    assert r.inicio_slot == ini and r.fin_slot == ini.add(minutes=45)
+    assert r.reserva_id.startswith("R-") and r.reserva_id.endswith("-1")
+
+    mock_state.update_reserva(reserva_id=r.reserva_id, empleado_id="E2", equipo_id="EQ1", estado="REASIGNADA")
+    # Cualquier vista de la fila (la devuelta por el alta o una nueva) ve el cambio
+    assert (r.empleado_id, r.equipo_id, r.estado, r.version) == ("E2", "EQ1", "REASIGNADA", 2)
+    assert mock_state.get_reserva(r.reserva_id) == r == mock_state.list_reservas()[0]
+    assert mock_state.get_reserva("R-inexistente-1") is None
+    assert mock_state.get_reserva(r.reserva_id[:-1] + "2") is None
+
+
+def test_rangos_con_segundos_y_extremos_no_alineados():
+    mock_state.reset_state()
+    ini = pendulum.parse("2025-11-06T09:00:00Z")
+    r = mock_state.add_reserva(servicio_id="SVC", empleado_id="E1", equipo_id="EQ1", inicio_slot=ini, fin_slot=ini.add(minutes=30))
+
+    # Consultas semiabiertas con segundos: el redondeo al minuto no cambia el solape
+    assert mock_state.get_reservas_en_rango(ini.add(minutes=29, seconds=59), ini.add(hours=1)) == [r]
+    assert mock_state.get_reservas_en_rango(ini.add(minutes=30), ini.add(hours=1)) == []
+    assert mock_state.get_reservas_en_rango(ini.subtract(minutes=5), ini.add(seconds=1)) == [r]
+    assert mock_state.get_reservas_en_rango(ini.subtract(minutes=5), ini) == []
+    assert mock_state.has_conflict(empleado_id="E1", equipo_id="EQ1", inicio_dt=ini.add(minutes=29, seconds=30), fin_dt=ini.add(hours=1))
+    assert not mock_state.has_conflict(empleado_id="E1", equipo_id="EQ2", inicio_dt=ini, fin_dt=ini.add(hours=1))
+
+    with pytest.raises(ValueError):
+        mock_state.add_reserva(
+            servicio_id="SVC", empleado_id="E2", equipo_id=None, inicio_slot=ini.add(seconds=30), fin_slot=ini.add(minutes=30)
+        )
+    assert len(mock_state.list_reservas()) == 1
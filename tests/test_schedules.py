@@ -0,0 +1,93 @@
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from telensor_engine import schedules
+from telensor_engine.fixtures import load_scenario
+from telensor_engine.main import app
+from telensor_engine.schedules import compilar_horario_semanal, limpiar_cache
+
+
+client = TestClient(app)
+
+# 2025-11-06 es jueves (weekday 3)
+PLANTILLA = {
+    "dias": {"3": [[540, 600], [840, 900]], "4": [[1380, 1500]]},
+    "excepciones": {"2025-11-08": [[540, 600]]},
+}
+
+
+def test_compila_turnos_por_dia_excepciones_y_cruce_de_medianoche():
+    compilado = compilar_horario_semanal(PLANTILLA, date(2025, 11, 6), 3)
+    assert compilado == [
+        [540, 600],
+        [840, 900],
+        # Viernes 23:00 → sábado 01:00 (turno nocturno)
+        [1440 + 1380, 1440 + 1500],
+        # Sábado: la excepción reemplaza el día (sin turnos en plantilla)
+        [2880 + 540, 2880 + 600],
+    ]
+
+
+def test_turno_nocturno_del_dia_anterior_aporta_al_dia_cero():
+    # Base sábado: el turno del viernes se compila con offset -1440
+    compilado = compilar_horario_semanal({"dias": {"4": [[1380, 1500]]}}, "2025-11-08", 1)
+    assert compilado == [[-60, 60]]
+
+
+def test_cache_reutiliza_hasta_que_cambia_la_plantilla():
+    limpiar_cache()
+    a = compilar_horario_semanal(PLANTILLA, date(2025, 11, 6), 7)
+    b = compilar_horario_semanal({k: dict(v) for k, v in PLANTILLA.items()}, date(2025, 11, 6), 7)
+    assert a is b
+    modificada = {"dias": {"3": [[600, 660]]}}
+    c = compilar_horario_semanal(modificada, date(2025, 11, 6), 7)
+    assert c is not a and c == [[600, 660]]
+
+
+def test_huella_de_plantilla_congelada_se_calcula_una_vez(monkeypatch):
+    limpiar_cache()
+    serializadas = []
+    serializar = schedules._serializar
+    monkeypatch.setattr(schedules, "_serializar", lambda p: serializadas.append(p) or serializar(p))
+    congelada = next(e for e in load_scenario("weekly_rota")["empleados"] if e["empleado_id"] == "E_R1")["horario_semanal"]
+    for fecha in ("2025-11-06", "2025-11-07", "2025-11-06"):
+        compilar_horario_semanal(congelada, fecha, 3)
+    assert len(serializadas) == 1
+    # Una plantilla mutable puede cambiar entre llamadas: se serializa siempre
+    mutable = {"dias": {"3": [[540, 600]]}}
+    compilar_horario_semanal(mutable, "2025-11-06", 1)
+    mutable["dias"]["3"] = [[600, 660]]
+    assert compilar_horario_semanal(mutable, "2025-11-06", 1) == [[600, 660]]
+    assert len(serializadas) == 3
+
+
+def test_plantilla_invalida():
+    with pytest.raises(ValueError):
+        compilar_horario_semanal({"dias": {"9": [[0, 60]]}}, date(2025, 11, 6), 1)
+    with pytest.raises(ValueError):
+        compilar_horario_semanal({"dias": {"0": [[600, 500]]}}, date(2025, 11, 6), 1)
+
+
+def test_api_usa_horario_semanal():
+    payload = {
+        "servicio_id": "SVC_R",
+        "scenario_id": "weekly_rota",
+        "empleado_id": "E_R1",
+        "fecha_inicio_utc": "2025-11-06T00:00:00Z",
+        "fecha_fin_utc": "2025-11-09T00:00:00Z",
+    }
+    resp = client.post("/api/v1/disponibilidad", json=payload)
+    assert resp.status_code == 200
+    inicios = [s["inicio_slot"] for s in resp.json()["horarios_disponibles"]]
+    assert inicios == [
+        "2025-11-06T09:00:00Z",
+        "2025-11-06T09:30:00Z",
+        "2025-11-06T14:00:00Z",
+        "2025-11-06T14:30:00Z",
+        "2025-11-07T10:00:00Z",
+        "2025-11-07T10:30:00Z",
+        "2025-11-08T09:00:00Z",
+        "2025-11-08T09:30:00Z",
+    ]
@@ -0,0 +1,160 @@
+import random
+import sqlite3
+import threading
+
+import pendulum
+import pytest
+
+from telensor_engine import mock_state
+from telensor_engine.sqlite_store import RepositorioSQLite
+
+
+@pytest.fixture
+def repositorio(tmp_path):
+    repo = RepositorioSQLite(tmp_path / "telensor.db")
+    yield repo
+    mock_state.usar_repositorio(None)
+    repo.cerrar()
+
+
+def _poblar(rng, base):
+    """Mismas operaciones contra el backend activo; devuelve los resultados observables."""
+    mock_state.reset_state()
+    observado = []
+    ids = []
+    for _ in range(300):
+        ini = base.add(minutes=rng.randrange(0, 3 * 1440))
+        try:
+            r = mock_state.add_reserva(
+                servicio_id="SVC",
+                empleado_id=f"E{rng.randrange(6)}",
+                equipo_id=rng.choice([None, "EQ1", "EQ2"]),
+                inicio_slot=ini,
+                fin_slot=ini.add(minutes=rng.randrange(10, 120)),
+            )
+            ids.append(r.reserva_id)
+            observado.append("ok")
+        except ValueError as e:
+            observado.append(str(e))
+    for _ in range(40):
+        rid = rng.choice(ids)
+        mock_state.update_reserva(reserva_id=rid, empleado_id=f"E{rng.randrange(6)}", estado="REASIGNADA")
+    for _ in range(30):
+        ini = base.add(minutes=rng.randrange(0, 3 * 1440))
+        scope = rng.choice(["business", "employee", "equipment", "service"])
+        mock_state.add_bloqueo(
+            {
+                "inicio_utc": ini,
+                "fin_utc": ini.add(minutes=rng.randrange(30, 600)),
+                "motivo": "x",
+                "scope": scope,
+                "empleado_ids": rng.sample(["E0", "E1", "E2"], rng.randrange(0, 3)) if scope == "employee" else [],
+                "equipo_ids": rng.sample(["EQ1", "EQ2"], rng.randrange(0, 2)) if scope == "equipment" else [],
+                "servicio_ids": ["SVC"] if scope == "service" and rng.random() < 0.5 else [],
+            }
+        )
+    campos = lambda r: (r.servicio_id, r.empleado_id, r.equipo_id, r.inicio_slot, r.fin_slot, r.estado, r.version)
+    sin_id = lambda b: {k: v for k, v in b.items() if k != "id"}
+    observado.append([campos(r) for r in mock_state.list_reservas()])
+    for _ in range(100):
+        a = base.add(minutes=rng.randrange(0, 3 * 1440))
+        b = a.add(minutes=rng.randrange(1, 300))
+        emp, eq = f"E{rng.randrange(6)}", rng.choice([None, "EQ1", "EQ2"])
+        observado.append(
+            (
+                [campos(r) for r in mock_state.get_reservas_en_rango(a, b)],
+                [campos(r) for r in mock_state.get_reservas_recurso_en_rango(empleado_id=emp, inicio_dt=a, fin_dt=b)],
+                mock_state.has_conflict(empleado_id=emp, equipo_id=eq, inicio_dt=a, fin_dt=b),
+                [sin_id(x) for x in mock_state.get_bloqueos_intersecting(a, b)],
+                [sin_id(x) for x in mock_state.get_bloqueos_intersecting(a, b, {"empleado_ids": [emp], "equipo_ids": ["EQ1"]})],
+                {
+                    scope: {k: [sin_id(x) for x in v] for k, v in grupo.items()}
+                    for scope, grupo in mock_state.get_bloqueos_por_alcance(
+                        a, b, empleado_ids=[emp, "E1"], equipo_ids=["EQ2"], servicio_ids=["SVC"]
+                    ).items()
+                },
+            )
+        )
+    return observado
+
+
+def test_sqlite_equivale_al_estado_en_memoria(repositorio):
+    base = pendulum.parse("2025-11-06T00:00:00Z")
+    en_memoria = _poblar(random.Random(9), base)
+    mock_state.usar_repositorio(repositorio)
+    en_sqlite = _poblar(random.Random(9), base)
+    assert en_sqlite == en_memoria
+
+
+def test_sqlite_altas_concurrentes_y_cas(repositorio):
+    mock_state.usar_repositorio(repositorio)
+    mock_state.reset_state()
+    ini = pendulum.parse("2025-11-06T09:00:00Z")
+    resultados = []
+
+    def alta():
+        try:
+            resultados.append(
+                mock_state.add_reserva(
+                    servicio_id="SVC", empleado_id="E1", equipo_id=None, inicio_slot=ini, fin_slot=ini.add(minutes=45)
+                )
+            )
+        except ValueError:
+            resultados.append(None)
+
+    hilos = [threading.Thread(target=alta) for _ in range(8)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    creadas = [r for r in resultados if r is not None]
+    assert len(creadas) == 1 and len(mock_state.list_reservas()) == 1
+
+    r = creadas[0]
+    assert mock_state.update_reserva(reserva_id=r.reserva_id, estado="REASIGNADA", expected_version=1).version == 2
+    with pytest.raises(mock_state.ConflictoVersion):
+        mock_state.update_reserva(reserva_id=r.reserva_id, estado="PENDIENTE_REAGENDA", expected_version=1)
+    assert mock_state.update_reserva(reserva_id="R-inexistente-9", estado="X") is None
+    # Persistente: otra instancia sobre el mismo archivo ve el estado
+    otra = RepositorioSQLite(repositorio._ruta)
+    assert otra.get_reserva(r.reserva_id) == mock_state.get_reserva(r.reserva_id)
+    otra.cerrar()
+
+
+def test_commit_fallido_no_deja_la_conexion_en_transaccion(tmp_path):
+    repo = RepositorioSQLite(tmp_path / "telensor.db", tamano_pool=1)
+    with repo._pool.conexion() as con:
+        con.execute("PRAGMA foreign_keys = ON")
+        con.execute("CREATE TABLE padre (id INTEGER PRIMARY KEY)")
+        con.execute("CREATE TABLE hijo (padre_id INTEGER REFERENCES padre(id) DEFERRABLE INITIALLY DEFERRED)")
+    # La clave foránea diferida hace fallar el COMMIT, no la inserción
+    with pytest.raises(sqlite3.IntegrityError):
+        with repo._transaccion() as con:
+            con.execute("INSERT INTO hijo VALUES (1)")
+    ini = pendulum.parse("2025-11-06T09:00:00Z")
+    r = repo.add_reserva(servicio_id="SVC", empleado_id="E1", equipo_id=None, inicio_slot=ini, fin_slot=ini.add(minutes=30))
+    assert repo.get_reserva(r.reserva_id) == r
+    repo.cerrar()
+
+
+def test_cascada_de_bloqueo_sobre_sqlite(repositorio, escenario_tres_empleados):
+    from telensor_engine.api import adapter
+
+    mock_state.usar_repositorio(repositorio)
+    mock_state.reset_state()
+
+    inicio = pendulum.parse("2025-11-06T09:00:00Z")
+    fin = inicio.add(minutes=60)
+    r1 = mock_state.add_reserva(
+        servicio_id="SVC", empleado_id="E1", equipo_id=None, inicio_slot=inicio, fin_slot=fin, scenario_id="tres"
+    )
+    r2 = mock_state.add_reserva(
+        servicio_id="SVC", empleado_id="E2", equipo_id=None, inicio_slot=inicio, fin_slot=fin, scenario_id="tres"
+    )
+    resultado = adapter.gestionar_creacion_bloqueo(
+        {"inicio_utc": inicio, "fin_utc": fin, "motivo": "Capacitación", "scope": "employee", "empleado_ids": ["E1", "E2"]}
+    )
+    estados = {p["reserva_id"]: p for p in resultado["procesadas"]}
+    assert (estados[r1.reserva_id]["estado"], estados[r1.reserva_id]["empleado_id"]) == ("REASIGNADA", "E3")
+    assert estados[r2.reserva_id]["estado"] == "PENDIENTE_REAGENDA"
+    assert mock_state.get_reserva(r1.reserva_id).empleado_id == "E3"
@@ -0,0 +1,178 @@
+import threading
+import time
+
+import pendulum
+import pytest
+
+from telensor_engine import mock_state
+from telensor_engine import write_ahead_log as wal
+
+
+def _foto():
+    return [
+        (r.reserva_id, r.servicio_id, r.empleado_id, r.equipo_id, r.inicio_slot, r.fin_slot, r.estado, r.version)
+        for r in mock_state.list_reservas()
+    ]
+
+
+def test_recupera_instantanea_y_log_tras_reinicio(tmp_path):
+    mock_state.reset_state()
+    mock_state.activar_durabilidad(tmp_path, registros_por_instantanea=None)
+    base = pendulum.parse("2025-11-06T09:00:00Z")
+    reservas = [
+        mock_state.add_reserva(
+            servicio_id="SVC",
+            empleado_id=f"E{i % 3}",
+            equipo_id="EQ1" if i % 2 else None,
+            inicio_slot=base.add(hours=i),
+            fin_slot=base.add(hours=i, minutes=45),
+        )
+        for i in range(6)
+    ]
+    bloqueo = mock_state.add_bloqueo(
+        {"inicio_utc": base, "fin_utc": base.add(hours=1), "motivo": "Baja", "scope": "employee", "empleado_ids": ["E0"]}
+    )
+    mock_state.tomar_instantanea()
+    # Posteriores a la instantánea: quedan solo en el log
+    mock_state.update_reserva(reserva_id=reservas[0].reserva_id, empleado_id="E9", estado="REASIGNADA")
+    mock_state.add_reserva(
+        servicio_id="SVC", empleado_id="E1", equipo_id=None, inicio_slot=base.add(days=1), fin_slot=base.add(days=1, minutes=30)
+    )
+    esperado = _foto()
+    mock_state.desactivar_durabilidad()
+
+    # Caída a mitad de una escritura: línea final incompleta
+    segmento = sorted(tmp_path.glob("wal-*.log"))[-1]
+    with segmento.open("ab") as f:
+        f.write(b'0badc0de\t{"op":"alta_res')
+
+    mock_state.reset_state()
+    stats = mock_state.activar_durabilidad(tmp_path, registros_por_instantanea=None)
+    assert (stats["reservas"], stats["bloqueos"], stats["registros_reproducidos"]) == (7, 1, 2)
+    assert _foto() == esperado
+    # Índices reconstruidos
+    assert mock_state.has_conflict(empleado_id="E9", equipo_id=None, inicio_dt=base, fin_dt=base.add(minutes=10))
+    assert not mock_state.has_conflict(empleado_id="E0", equipo_id=None, inicio_dt=base, fin_dt=base.add(minutes=10))
+    assert [b["id"] for b in mock_state.get_bloqueos_intersecting(base, base.add(minutes=5), {"empleado_ids": ["E0"]})] == [
+        bloqueo["id"]
+    ]
+    # Las escrituras continúan la numeración de filas
+    nueva = mock_state.add_reserva(
+        servicio_id="SVC", empleado_id="E0", equipo_id=None, inicio_slot=base.add(days=2), fin_slot=base.add(days=2, minutes=30)
+    )
+    assert nueva.reserva_id.endswith("-8")
+    mock_state.reset_state()
+
+
+def test_escrituras_concurrentes_con_confirmacion_en_grupo(tmp_path):
+    mock_state.reset_state()
+    mock_state.activar_durabilidad(tmp_path, politica_fsync="siempre", registros_por_instantanea=25)
+    base = pendulum.parse("2025-11-06T00:00:00Z")
+
+    def alta(hilo):
+        for i in range(20):
+            r = mock_state.add_reserva(
+                servicio_id="SVC",
+                empleado_id=f"E{hilo}",
+                equipo_id=None,
+                inicio_slot=base.add(hours=i),
+                fin_slot=base.add(hours=i, minutes=30),
+            )
+            mock_state.update_reserva(reserva_id=r.reserva_id, estado="CONFIRMADA", expected_version=1)
+
+    hilos = [threading.Thread(target=alta, args=(h,)) for h in range(8)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    # Instantánea explícita: espera a cualquiera que esté en curso en segundo plano
+    mock_state.tomar_instantanea()
+    esperado = _foto()
+    mock_state.desactivar_durabilidad()
+
+    mock_state.reset_state()
+    mock_state.activar_durabilidad(tmp_path, registros_por_instantanea=None)
+    assert len(esperado) == 160
+    assert _foto() == esperado
+    assert {r.version for r in mock_state.list_reservas()} == {2}
+    mock_state.reset_state()
+
+
+def test_fallo_del_log_deja_el_estado_en_solo_lectura(tmp_path):
+    mock_state.reset_state()
+    mock_state.activar_durabilidad(tmp_path, registros_por_instantanea=None)
+    base = pendulum.parse("2025-11-06T09:00:00Z")
+    previa = mock_state.add_reserva(
+        servicio_id="SVC", empleado_id="E1", equipo_id=None, inicio_slot=base, fin_slot=base.add(minutes=30)
+    )
+
+    def _disco_lleno(lote, *, forzar_fsync):
+        raise OSError(28, "No space left on device")
+
+    mock_state._WAL._escribir = _disco_lleno
+    alta = dict(servicio_id="SVC", equipo_id=None, inicio_slot=base.add(hours=1), fin_slot=base.add(hours=1, minutes=30))
+    with pytest.raises(OSError):
+        mock_state.add_reserva(empleado_id="E2", **alta)
+    visibles = len(mock_state.list_reservas())
+
+    # Nada más se aplica en memoria: ni altas, ni actualizaciones, ni bloqueos
+    with pytest.raises(OSError, match="solo lectura"):
+        mock_state.add_reserva(empleado_id="E3", **alta)
+    with pytest.raises(OSError, match="solo lectura"):
+        mock_state.update_reserva(reserva_id=previa.reserva_id, estado="REASIGNADA")
+    with pytest.raises(OSError, match="solo lectura"):
+        mock_state.add_bloqueo({"inicio_utc": base, "fin_utc": base.add(hours=1), "motivo": "x", "scope": "business"})
+    assert len(mock_state.list_reservas()) == visibles
+    assert previa.version == 1 and mock_state.get_bloqueos_en_rango(base, base.add(hours=1)) == []
+
+    # Al reiniciar solo queda lo durable
+    mock_state.reset_state()
+    mock_state.activar_durabilidad(tmp_path, registros_por_instantanea=None)
+    assert [r.reserva_id for r in mock_state.list_reservas()] == [previa.reserva_id]
+    mock_state.reset_state()
+
+
+def test_una_sola_instantanea_en_segundo_plano_por_cruce_del_umbral(tmp_path, monkeypatch):
+    mock_state.reset_state()
+    mock_state.activar_durabilidad(tmp_path, registros_por_instantanea=1)
+    liberar = threading.Event()
+    llamadas = []
+    original = mock_state.tomar_instantanea
+
+    def _instantanea_lenta(**kwargs):
+        llamadas.append(kwargs)
+        liberar.wait(5)
+        return original(**kwargs)
+
+    monkeypatch.setattr(mock_state, "tomar_instantanea", _instantanea_lenta)
+    base = pendulum.parse("2025-11-06T09:00:00Z")
+    for i in range(5):
+        mock_state.add_reserva(
+            servicio_id="SVC", empleado_id="E1", equipo_id=None, inicio_slot=base.add(hours=i), fin_slot=base.add(hours=i, minutes=30)
+        )
+    liberar.set()
+    for hilo in [h for h in threading.enumerate() if h.name == "telensor-instantanea"]:
+        hilo.join(5)
+    assert len(llamadas) == 1
+    mock_state.reset_state()
+
+
+def test_politica_intervalo_sincroniza_el_ultimo_lote_sin_mas_escrituras(tmp_path, monkeypatch):
+    sincronizados = []
+    fsync_real = wal.os.fsync
+
+    def _fsync(fd):
+        sincronizados.append(fd)
+        fsync_real(fd)
+
+    monkeypatch.setattr(wal.os, "fsync", _fsync)
+    registro = wal.RegistroEscritura(tmp_path, 1, politica_fsync="intervalo", intervalo_fsync_s=0.05)
+    # Recién abierto: el intervalo no venció, el lote solo llega al sistema operativo
+    registro.confirmar(registro.anotar({"op": "x"}))
+    previos = len(sincronizados)
+    limite = time.monotonic() + 2
+    while len(sincronizados) == previos and time.monotonic() < limite:
+        time.sleep(0.01)
+    assert len(sincronizados) > previos
+    registro.cerrar()
+    assert not registro._sincronizador.is_alive()